@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+单个基准用例（由 bench_background.py 在独立进程中启动）
+- 以指定配置运行 FullScreenPromptApp，开启 --profile 追踪并写入 --trace
+- --engine numpy 时屏蔽 Pillow，PPM/PGM 走 NumPy 精确缩放；--engine tk 时同时屏蔽 NumPy，
+  走 tk.PhotoImage zoom/subsample 回退路径
+- --run-seconds 为 0 时首次绘制完成即退出，否则运行指定秒数（用于测量时钟/闪烁的 CPU 开销），
+  退出前把渐变闪烁的帧率/CPU 统计写入工作目录的 blink_stats.json
+- --frosted 时使用毛玻璃背景（启动前截取当前屏幕）
+- 配置目录指向工作目录（FSP_CONFIG_DIR），按参数生成其中的 config.json：不读用户的 config.json，
+  config.cache、背景缓存与错误日志都写在工作目录
+"""
+
+import argparse
+import json
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+
+def write_config(folder, config):
+    """在 folder 中生成 config.json 并把它设为配置目录（须在导入 fullscreen_prompt_tool 之前调用）"""
+    with open(os.path.join(folder, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    os.environ["FSP_CONFIG_DIR"] = folder
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", default="")
+    parser.add_argument("--engine", choices=("pil", "numpy", "tk"), default="pil")
+    parser.add_argument("--workdir", required=True)
+    parser.add_argument("--trace", required=True)
+    parser.add_argument("--run-seconds", type=float, default=0)
+    parser.add_argument("--cache", action="store_true")
+    parser.add_argument("--blink", action="store_true")
+    parser.add_argument("--blink-style", choices=("fade", "toggle"), default="fade")
+    parser.add_argument("--memory-budget-mb", type=int, default=0)
+    parser.add_argument("--frosted", action="store_true")
+    args = parser.parse_args()
+
+    if args.engine in ("numpy", "tk"):
+        # import PIL 将抛出 ImportError，等同于未安装 Pillow
+        sys.modules["PIL"] = None
+    if args.engine == "tk":
+        sys.modules["numpy"] = None
+
+    write_config(args.workdir, {
+        "background_image_path": args.image,
+        "bg_cache_enabled": args.cache,
+        "bg_memory_budget_mb": args.memory_budget_mb,
+        "message_blink_enabled": args.blink,
+        "blink_style": args.blink_style,
+        "background_frosted": args.frosted,
+        "config_hot_reload": False,
+    })
+
+    import startup_profile
+    startup_profile.enable(args.trace)
+
+    import fullscreen_prompt_tool as fpt
+
+    app = fpt.FullScreenPromptApp(exit_after_paint=args.run_seconds <= 0)
+    if args.run_seconds > 0:
+        def finish():
+            with open(os.path.join(args.workdir, "blink_stats.json"), "w", encoding="utf-8") as f:
+                json.dump(app.status().get("blink"), f)
+            app._quit()
+        app.root.after(int(args.run_seconds * 1000), finish)
+    app.run()
+
+
+if __name__ == "__main__":
+    main()
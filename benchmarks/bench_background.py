@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+背景图与定时刷新基准测试（Linux，无需 GPU，可在 Xvfb 下运行）
+
+用法：
+    python benchmarks/bench_background.py                       # 全部用例，结果写入 bench_results.json
+    python benchmarks/bench_background.py --sizes 1080p 4k --formats jpeg --repeat 5
+    python benchmarks/bench_background.py --baseline old.json   # 与历史结果对比，退化超出容差时返回码为 1
+
+- 合成 JPEG/PNG/GIF/PPM 背景图：1080p、4K、8K、全景（16000x4000）
+- 每个用例在独立进程中运行 FullScreenPromptApp（开启 --profile 追踪），记录：
+  首次绘制时间、解码、缩放、PhotoImage 转换耗时、进程峰值 RSS
+- 分别测量 Pillow 路径、无 Pillow 时的 NumPy 路径（仅 PPM）与 tk.PhotoImage zoom/subsample 回退路径；
+  Pillow 路径另测缓存命中（warm）
+- 毛玻璃背景：截屏、缩小、模糊、放大、转换各阶段与从截屏到画到屏幕上的总耗时
+- 时钟/闪烁：空跑指定秒数，扣除启动开销后折算为每小时 CPU 秒数（含 X 服务器的 CPU）
+- 未设置 DISPLAY 时自动启动 Xvfb（需安装 xvfb）
+- 依赖 Pillow（用于生成测试图片）
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_CHILD = os.path.join(_HERE, "_bench_child.py")
+
+SIZES = {
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+    "8k": (7680, 4320),
+    "panorama": (16000, 4000),
+}
+FORMATS = ("jpeg", "png", "gif", "ppm")
+ENGINES = ("pil", "numpy", "tk")
+_EXT = {"jpeg": ".jpg", "png": ".png", "gif": ".gif", "ppm": ".ppm"}
+
+# 对比基线时参与判断的指标（越小越好）
+_REGRESSION_METRICS = ("first_paint_ms", "decode_ms", "resize_ms", "convert_ms", "tile_max_ms", "peak_rss_mb",
+                       "cpu_s_per_hour", "frosted_total_ms")
+# 毛玻璃各阶段（追踪中的 "frosted <阶段>" 区间）
+_FROSTED_STAGES = ("grab", "downsample", "blur", "upscale", "convert", "total")
+
+
+# -----------------------------------------------------------------------------
+# 显示环境
+# -----------------------------------------------------------------------------
+
+def start_xvfb(screen):
+    """启动 Xvfb，返回 (进程, DISPLAY)"""
+    if shutil.which("Xvfb") is None:
+        raise SystemExit("未设置 DISPLAY 且未找到 Xvfb，请安装 xvfb 或在图形环境中运行")
+    read_fd, write_fd = os.pipe()
+    proc = subprocess.Popen(
+        ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", f"{screen}x24", "-nolisten", "tcp"],
+        pass_fds=(write_fd,),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        number = f.readline().strip()
+    if not number:
+        proc.kill()
+        raise SystemExit("Xvfb 启动失败")
+    return proc, ":" + number
+
+
+def _proc_cpu_seconds(pid):
+    """读取 /proc/<pid>/stat 中的用户态+内核态 CPU 时间"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            fields = f.read().rsplit(b")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+
+# -----------------------------------------------------------------------------
+# 测试图片
+# -----------------------------------------------------------------------------
+
+def generate_image(path, size, fmt):
+    """合成带渐变与噪声的测试图（压缩率接近真实照片）"""
+    from PIL import Image
+    w, h = size
+    gradient = Image.linear_gradient("L").resize((w, h))
+    noise = Image.effect_noise((max(1, w // 4), max(1, h // 4)), 48).resize((w, h))
+    mirrored = gradient.transpose(Image.FLIP_LEFT_RIGHT)
+    img = Image.merge("RGB", (gradient, noise, mirrored))
+    if fmt == "jpeg":
+        img.save(path, "JPEG", quality=90)
+    elif fmt == "png":
+        img.save(path, "PNG", compress_level=6)
+    elif fmt == "ppm":
+        img.save(path, "PPM")
+    else:
+        img.convert("P", palette=Image.ADAPTIVE, colors=256).save(path, "GIF")
+
+
+# -----------------------------------------------------------------------------
+# 运行用例
+# -----------------------------------------------------------------------------
+
+def run_child(env, workdir, image="", engine="pil", cache=False, run_seconds=0, blink=False,
+              memory_budget_mb=0, x_pid=None, timeout=600, blink_style="fade", frosted=False):
+    """运行一次子进程，返回原始测量结果"""
+    trace = os.path.join(workdir, "trace.json")
+    if os.path.exists(trace):
+        os.remove(trace)
+    error_file = os.path.join(workdir, "bg_load_error.txt")
+    if os.path.exists(error_file):
+        os.remove(error_file)
+    cmd = [sys.executable, _CHILD, "--workdir", workdir, "--trace", trace, "--engine", engine,
+           "--image", image, "--run-seconds", str(run_seconds), "--memory-budget-mb", str(memory_budget_mb)]
+    if cache:
+        cmd.append("--cache")
+    if blink:
+        cmd.extend(["--blink", "--blink-style", blink_style])
+    if frosted:
+        cmd.append("--frosted")
+
+    x_cpu_before = _proc_cpu_seconds(x_pid) if x_pid else 0.0
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env)
+    deadline = started + timeout
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            break
+        if time.perf_counter() > deadline:
+            proc.kill()
+            pid, status, usage = os.wait4(proc.pid, 0)
+            break
+        time.sleep(0.005)
+    proc.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, "waitstatus_to_exitcode") else status
+    wall = time.perf_counter() - started
+
+    result = {
+        "wall_ms": wall * 1000.0,
+        "exit_code": proc.returncode,
+        # Linux 下 ru_maxrss 单位为 KB
+        "peak_rss_mb": usage.ru_maxrss / 1024.0,
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        "x_cpu_s": (_proc_cpu_seconds(x_pid) - x_cpu_before) if x_pid else 0.0,
+    }
+    if os.path.exists(error_file):
+        with open(error_file, encoding="utf-8") as f:
+            result["error"] = f.read().strip()
+    try:
+        with open(trace, encoding="utf-8") as f:
+            data = json.load(f)
+        summary = data["metadata"]["summary"]
+    except (OSError, ValueError, KeyError):
+        data, summary = {}, {}
+    # 分块显示时每块的转换耗时（毫秒）
+    tile_ms = [e["dur"] / 1000.0 for e in data.get("traceEvents", []) if e.get("name") == "tile convert"]
+    durations = summary.get("durations_ms", {})
+    marks = summary.get("marks_ms", {})
+    result.update({
+        "first_paint_ms": marks.get("first_background_paint", marks.get("first_mainloop_idle")),
+        "decode_ms": durations.get("decode"),
+        "reduce_ms": durations.get("reduce"),
+        "resize_ms": durations.get("resize"),
+        "convert_ms": durations.get("PhotoImage convert"),
+        "tiles": len(tile_ms),
+        "tile_total_ms": sum(tile_ms) if tile_ms else None,
+        "tile_max_ms": max(tile_ms) if tile_ms else None,
+        "tick_lateness": summary.get("tick_lateness", {}),
+    })
+    for stage in _FROSTED_STAGES:
+        result[f"frosted_{stage}_ms"] = durations.get(f"frosted {stage}")
+    return result
+
+
+def _median_result(runs):
+    """多次运行取中位数；任何一次出错即视为出错"""
+    errors = [r["error"] for r in runs if r.get("error")]
+    if errors:
+        return {"status": "error", "error": errors[0]}
+    merged = {"status": "ok", "runs": len(runs)}
+    for key in ("wall_ms", "first_paint_ms", "decode_ms", "reduce_ms", "resize_ms", "convert_ms",
+                "tile_total_ms", "tile_max_ms", "peak_rss_mb"):
+        values = [r[key] for r in runs if r.get(key) is not None]
+        merged[key] = round(statistics.median(values), 3) if values else None
+    return merged
+
+
+def bench_images(env, tmp, args, x_pid):
+    cases = []
+    image_dir = os.path.join(tmp, "images")
+    os.makedirs(image_dir, exist_ok=True)
+    for size_name in args.sizes:
+        for fmt in args.formats:
+            path = os.path.join(image_dir, f"{size_name}{_EXT[fmt]}")
+            t0 = time.perf_counter()
+            generate_image(path, SIZES[size_name], fmt)
+            print(f"[gen] {os.path.basename(path)} {os.path.getsize(path) / 1e6:.1f}MB "
+                  f"({time.perf_counter() - t0:.1f}s)", flush=True)
+            for engine in args.engines:
+                if engine == "numpy" and fmt != "ppm":
+                    # NumPy 路径只处理 PPM/PGM，其他格式与 tk 回退路径相同
+                    continue
+                variants = (("cold", False), ("warm", True)) if engine == "pil" else (("cold", False),)
+                for cache_state, use_cache in variants:
+                    workdir = tempfile.mkdtemp(dir=tmp)
+                    runs = []
+                    for _ in range(args.repeat):
+                        shutil.rmtree(os.path.join(workdir, "bg_cache"), ignore_errors=True)
+                        if use_cache:
+                            # 预热：先跑一次填充缓存，再测缓存命中
+                            run_child(env, workdir, path, engine, cache=True,
+                                      memory_budget_mb=args.memory_budget_mb)
+                        runs.append(run_child(env, workdir, path, engine, cache=use_cache,
+                                              memory_budget_mb=args.memory_budget_mb, x_pid=x_pid))
+                    case = {"kind": "background", "size": size_name, "resolution": list(SIZES[size_name]),
+                            "format": fmt, "engine": engine, "cache": cache_state,
+                            "file_mb": round(os.path.getsize(path) / 1e6, 2)}
+                    case.update(_median_result(runs))
+                    cases.append(case)
+                    print(f"[bench] {size_name:8s} {fmt:4s} {engine:3s} {cache_state:4s} "
+                          f"paint={case.get('first_paint_ms')}ms rss={case.get('peak_rss_mb')}MB "
+                          f"{case['status']}", flush=True)
+            os.remove(path)
+    return cases
+
+
+def bench_frosted(env, tmp, args, x_pid):
+    """毛玻璃背景：各阶段耗时取多次运行的中位数；截屏内容为 Xvfb 当前画面"""
+    workdir = tempfile.mkdtemp(dir=tmp)
+    runs = [run_child(env, workdir, frosted=True, x_pid=x_pid) for _ in range(args.repeat)]
+    errors = [r["error"] for r in runs if r.get("error")]
+    case = {"kind": "frosted", "resolution": args.screen, "status": "error" if errors else "ok"}
+    if errors:
+        case["error"] = errors[0]
+    for key in ["first_paint_ms"] + [f"frosted_{stage}_ms" for stage in _FROSTED_STAGES]:
+        values = [r[key] for r in runs if r.get(key) is not None]
+        case[key] = round(statistics.median(values), 3) if values else None
+    stages = " ".join(f"{stage}={case[f'frosted_{stage}_ms']}" for stage in _FROSTED_STAGES)
+    print(f"[bench] frosted {args.screen} {stages} (ms) {case['status']}", flush=True)
+    return [case]
+
+
+def bench_ticks(env, tmp, args, x_pid):
+    """时钟/闪烁循环 CPU 开销：运行 N 秒的 CPU 减去仅启动的 CPU，折算为每小时与占用百分比"""
+    cases = []
+    workdir = tempfile.mkdtemp(dir=tmp)
+    for style in (None, "toggle", "fade"):
+        blink = style is not None
+        stats_file = os.path.join(workdir, "blink_stats.json")
+        if os.path.exists(stats_file):
+            os.remove(stats_file)
+        base = run_child(env, workdir, blink=blink, blink_style=style or "fade", x_pid=x_pid)
+        run = run_child(env, workdir, blink=blink, blink_style=style or "fade",
+                        run_seconds=args.tick_seconds, x_pid=x_pid)
+        loop_cpu = max(0.0, run["cpu_s"] - base["cpu_s"])
+        x_cpu = max(0.0, run["x_cpu_s"] - base["x_cpu_s"])
+        factor = 3600.0 / args.tick_seconds
+        try:
+            with open(stats_file, encoding="utf-8") as f:
+                blink_stats = json.load(f)
+        except (OSError, ValueError):
+            blink_stats = None
+        case = {
+            "kind": "ticks",
+            "blink": style or False,
+            "seconds": args.tick_seconds,
+            "status": "ok",
+            "cpu_s_per_hour": round(loop_cpu * factor, 3),
+            "cpu_percent": round(loop_cpu / args.tick_seconds * 100, 3),
+            "x_server_cpu_s_per_hour": round(x_cpu * factor, 3),
+            "tick_lateness": run.get("tick_lateness", {}),
+            "blink_stats": blink_stats,
+        }
+        cases.append(case)
+        fps = f" fps={blink_stats['fps_achieved']}" if blink_stats else ""
+        print(f"[bench] ticks blink={case['blink']} cpu={case['cpu_s_per_hour']}s/h "
+              f"({case['cpu_percent']}%){fps} xserver={case['x_server_cpu_s_per_hour']}s/h", flush=True)
+    return cases
+
+
+# -----------------------------------------------------------------------------
+# 基线对比
+# -----------------------------------------------------------------------------
+
+def _case_id(case):
+    if case["kind"] == "ticks":
+        return ("ticks", case["blink"])
+    if case["kind"] == "frosted":
+        return ("frosted", case["resolution"])
+    return (case["size"], case["format"], case["engine"], case["cache"])
+
+
+def compare(results, baseline, tolerance):
+    """返回退化列表：指标比基线差超过 tolerance（比例）的用例"""
+    old = {_case_id(c): c for c in baseline.get("cases", [])}
+    regressions = []
+    for case in results["cases"]:
+        prev = old.get(_case_id(case))
+        if not prev or case.get("status") != "ok" or prev.get("status") != "ok":
+            continue
+        for metric in _REGRESSION_METRICS:
+            new_value, old_value = case.get(metric), prev.get(metric)
+            if new_value is None or old_value is None or old_value <= 0:
+                continue
+            if new_value > old_value * (1 + tolerance):
+                regressions.append({"case": list(_case_id(case)), "metric": metric,
+                                    "baseline": old_value, "current": new_value})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="背景图与定时刷新基准测试")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--screen", default="3840x2160", help="Xvfb 屏幕分辨率")
+    parser.add_argument("--tick-seconds", type=float, default=60)
+    parser.add_argument("--memory-budget-mb", type=int, default=0, help="0=不限制，便于测出全部尺寸")
+    parser.add_argument("--skip-ticks", action="store_true")
+    parser.add_argument("--skip-frosted", action="store_true")
+    parser.add_argument("--baseline", help="历史结果文件，用于检测性能退化")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的退化比例")
+    args = parser.parse_args()
+
+    try:
+        import PIL
+    except ImportError:
+        raise SystemExit("生成测试图片需要 Pillow：pip install Pillow")
+
+    env = dict(os.environ)
+    xvfb = None
+    x_pid = None
+    if not env.get("DISPLAY"):
+        xvfb, env["DISPLAY"] = start_xvfb(args.screen)
+        x_pid = xvfb.pid
+
+    results = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "display": "xvfb " + args.screen if xvfb else env["DISPLAY"],
+        "cases": [],
+    }
+    try:
+        with tempfile.TemporaryDirectory(prefix="fsp_bench_") as tmp:
+            results["cases"].extend(bench_images(env, tmp, args, x_pid))
+            if not args.skip_frosted:
+                results["cases"].extend(bench_frosted(env, tmp, args, x_pid))
+            if not args.skip_ticks:
+                results["cases"].extend(bench_ticks(env, tmp, args, x_pid))
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results["regressions"] = regressions
+        for r in regressions:
+            print(f"[regression] {r['case']} {r['metric']}: {r['baseline']} -> {r['current']}")
+        exit_code = 1 if regressions else 0
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.out}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准：从启动进程到首次绘制完成（冷启动 / 热启动）
+
+用法：
+    python benchmarks/bench_startup.py                          # 源码运行 + dist/ 下已打包的两种 exe
+    python benchmarks/bench_startup.py --repeat 10 --image photo.jpg --out startup_results.json
+    python benchmarks/bench_startup.py --variant onefile=dist/FullScreenPromptTool.exe \\
+        --variant onedir=dist/FullScreenPromptTool_fast
+
+- 变体：source（python main.py）、onefile（build_exe.spec 打出的单文件 exe）、
+  onedir（build_exe_fast.spec 打出的目录，可传目录或其中的 exe）；dist/ 下没有的变体自动跳过
+- 每个变体复制到临时目录中运行并写入独立的 config.json，不影响项目目录与 dist/ 中的文件
+- 每次运行：python main.py --fullscreen --exit-after-paint --profile <trace>；
+  启动到首次绘制 = 追踪中的进程启动时刻 + 首次绘制标记 − 本脚本启动子进程的时刻
+  （单文件 exe 的引导进程解压耗时也包含在内，追踪本身只能看到解压之后的 Python 进程；
+  Linux 上进程启动时刻取自 /proc，精度约 10ms）
+- 冷启动：每次运行前删除 config.cache，并尝试清空系统页缓存（Linux 需 root，写 /proc/sys/vm/drop_caches）；
+  无法清空时冷启动只代表“首次运行”，结果中 page_cache_dropped 为 false
+- 热启动：先空跑一次，再连续运行 --repeat 次取中位数
+- Linux 未设置 DISPLAY 时自动启动 Xvfb（需安装 xvfb）
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_ROOT = os.path.dirname(_HERE)
+_EXE_SUFFIX = ".exe" if sys.platform == "win32" else ""
+
+# dist/ 下的默认打包产物
+DEFAULT_VARIANTS = {
+    "onefile": os.path.join(_ROOT, "dist", "FullScreenPromptTool" + _EXE_SUFFIX),
+    "onedir": os.path.join(_ROOT, "dist", "FullScreenPromptTool_fast"),
+}
+_METRICS = ("launch_to_paint_ms", "in_process_ms", "wall_ms")
+
+
+def drop_page_cache():
+    """清空系统页缓存，成功返回 True（仅 Linux root）"""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+def prepare_variant(name, path, workdir, image):
+    """把变体复制到 workdir/name，写入 config.json，返回 (命令, 程序目录)"""
+    target = os.path.join(workdir, name)
+    if path is None:
+        # 源码运行：只复制根目录下的模块
+        os.makedirs(target)
+        for fname in os.listdir(_ROOT):
+            if fname.endswith(".py"):
+                shutil.copy2(os.path.join(_ROOT, fname), target)
+        command = [sys.executable, os.path.join(target, "main.py")]
+    elif os.path.isdir(path):
+        shutil.copytree(path, target)
+        command = [os.path.join(target, "FullScreenPromptTool" + _EXE_SUFFIX)]
+    elif os.path.isfile(path) and os.path.isdir(os.path.join(os.path.dirname(path), "_internal")):
+        # 传入的是目录模式中的 exe
+        shutil.copytree(os.path.dirname(path), target)
+        command = [os.path.join(target, os.path.basename(path))]
+    else:
+        os.makedirs(target)
+        shutil.copy2(path, target)
+        command = [os.path.join(target, os.path.basename(path))]
+    with open(os.path.join(target, "config.json"), "w", encoding="utf-8") as f:
+        json.dump({"background_image_path": image}, f, ensure_ascii=False)
+    return command, target
+
+
+def run_once(command, app_dir, env, timeout):
+    """运行一次，返回测量结果"""
+    trace = os.path.join(app_dir, "startup_trace.json")
+    if os.path.exists(trace):
+        os.remove(trace)
+    launched = time.time()
+    started = time.perf_counter()
+    try:
+        proc = subprocess.run(command + ["--fullscreen", "--exit-after-paint", "--profile", trace],
+                              env=env, timeout=timeout, cwd=app_dir)
+        exit_code = proc.returncode
+    except subprocess.TimeoutExpired:
+        exit_code = None
+    result = {"wall_ms": round((time.perf_counter() - started) * 1000.0, 1), "exit_code": exit_code}
+    try:
+        with open(trace, encoding="utf-8") as f:
+            metadata = json.load(f)["metadata"]
+        marks = metadata["summary"]["marks_ms"]
+        paint_ms = marks.get("first_background_paint", marks.get("first_mainloop_idle"))
+        process_start = metadata.get("process_start")
+    except (OSError, ValueError, KeyError):
+        paint_ms = process_start = None
+    result["in_process_ms"] = paint_ms
+    result["launch_to_paint_ms"] = (
+        round((process_start + paint_ms / 1000.0 - launched) * 1000.0, 1)
+        if paint_ms is not None and process_start is not None else None
+    )
+    return result
+
+
+def _median(runs):
+    summary = {}
+    for key in _METRICS:
+        values = [r[key] for r in runs if r.get(key) is not None]
+        summary[key] = round(statistics.median(values), 1) if values else None
+    summary["runs"] = runs
+    return summary
+
+
+def bench_variant(name, command, app_dir, env, repeat, timeout):
+    cold_runs = []
+    dropped = True
+    for _ in range(repeat):
+        cache = os.path.join(app_dir, "config.cache")
+        if os.path.exists(cache):
+            os.remove(cache)
+        dropped = drop_page_cache() and dropped
+        cold_runs.append(run_once(command, app_dir, env, timeout))
+        if not dropped:
+            # 无法清空页缓存时只有第一次算冷启动
+            break
+    run_once(command, app_dir, env, timeout)
+    warm_runs = [run_once(command, app_dir, env, timeout) for _ in range(repeat)]
+    result = {"command": command, "page_cache_dropped": dropped,
+              "cold": _median(cold_runs), "warm": _median(warm_runs)}
+    print(f"[{name}] cold={result['cold']['launch_to_paint_ms']}ms warm={result['warm']['launch_to_paint_ms']}ms "
+          f"(进程内 {result['warm']['in_process_ms']}ms)", flush=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动到首次绘制耗时（冷/热启动）")
+    parser.add_argument("--variant", action="append", default=[], metavar="NAME=PATH",
+                        help="打包产物：单文件 exe，或目录模式的目录 / exe；可重复；缺省使用 dist/ 下的两种产物")
+    parser.add_argument("--skip-source", action="store_true", help="不测源码运行")
+    parser.add_argument("--image", default="", help="背景图路径（缺省为纯色背景）")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--screen", default="1920x1080", help="Xvfb 屏幕分辨率")
+    parser.add_argument("--out", default="startup_results.json")
+    args = parser.parse_args()
+
+    variants = {} if args.skip_source else {"source": None}
+    if args.variant:
+        for spec in args.variant:
+            name, sep, path = spec.partition("=")
+            if not sep:
+                parser.error(f"--variant 应为 NAME=PATH：{spec}")
+            variants[name] = os.path.abspath(path)
+    else:
+        for name, path in DEFAULT_VARIANTS.items():
+            if os.path.exists(path):
+                variants[name] = path
+            else:
+                print(f"[{name}] 未找到 {os.path.relpath(path, _ROOT)}，跳过", file=sys.stderr)
+    image = os.path.abspath(args.image) if args.image else ""
+
+    env = dict(os.environ)
+    xvfb = None
+    if sys.platform.startswith("linux") and not env.get("DISPLAY"):
+        sys.path.insert(0, _HERE)
+        from bench_background import start_xvfb
+        xvfb, env["DISPLAY"] = start_xvfb(args.screen)
+
+    results = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "image": image,
+        "repeat": args.repeat,
+        "variants": {},
+    }
+    try:
+        with tempfile.TemporaryDirectory(prefix="fsp_startup_") as tmp:
+            for name, path in variants.items():
+                command, app_dir = prepare_variant(name, path, tmp, image)
+                results["variants"][name] = bench_variant(name, command, app_dir, env, args.repeat, args.timeout)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+"""
+无显示环境下的 tkinter 替身：只供 soak_test.py --headless 使用，让长时间运行测试在没有 X 服务器的机器（CI）上也能跑
+- 定时器与空闲回调由真实的事件循环驱动（先执行到期的定时器，没有时再执行空闲回调）
+- PhotoImage 登记在解释器的图像表中（弱引用：Python 对象回收即从表中删除，与真实 Tk 相同），
+  after 回调登记在定时器表中，因此 after info / image names 反映的是应用实际持有的数量
+- 画布项、字体测量、窗口管理只做最简单的记录或估算，不绘制任何内容；
+  因此 headless 模式能发现 Python 侧的泄漏（定时器、图像对象、线程、堆），但测不到 Tk 自身的像素内存
+- 回调抛出异常时直接结束主循环，避免异常被吞掉后测试仍然“通过”
+"""
+
+import itertools
+import re
+import threading
+import time
+import traceback
+import weakref
+
+HEADLESS = True
+
+TclError = type("TclError", (Exception,), {})
+BOTH = X = Y = "both"
+LEFT, RIGHT, TOP, BOTTOM = "left", "right", "top", "bottom"
+NW, CENTER = "nw", "center"
+
+_ids = itertools.count(1)
+_NAMED_COLORS = {"white": "#ffffff", "black": "#000000", "red": "#ff0000", "green": "#008000", "blue": "#0000ff"}
+_ROOTS = []
+
+
+class _Interp:
+    """Tcl 解释器的最小替身：定时器表、图像表与 call() 中用到的几个命令"""
+
+    def __init__(self):
+        self.afters = {}
+        self.images = weakref.WeakValueDictionary()
+        self.lock = threading.RLock()
+
+    def eval(self, script):
+        if script == "info exists tcl_platform(threaded)":
+            return "1"
+        raise TclError(f"不支持的脚本: {script}")
+
+    def splitlist(self, value):
+        return tuple(value)
+
+    def call(self, *args):
+        args = [str(a) for a in args]
+        if args[:2] == ["after", "info"]:
+            with self.lock:
+                return tuple(self.afters)
+        if args[:2] == ["image", "names"]:
+            return tuple(self.images.keys())
+        if args[:2] == ["tk", "windowingsystem"]:
+            return "x11"
+        image = self.images.get(args[0])
+        if image is not None and len(args) > 2 and args[1] == "copy":
+            source = self.images[args[2]]
+            factor = int(args[4]) if len(args) > 4 and args[3] == "-zoom" else 1
+            image._size = (source._size[0] * factor, source._size[1] * factor)
+            return ""
+        raise TclError(f"不支持的命令: {args}")
+
+
+def _default_interp():
+    return _ROOTS[-1]._interp
+
+
+class Misc:
+    """各控件共用的方法"""
+
+    def _interp_of(self):
+        widget = self
+        while getattr(widget, "master", None) is not None:
+            widget = widget.master
+        return widget._interp
+
+    def after(self, ms, func=None, *args):
+        interp = self._interp_of()
+        after_id = f"after#{next(_ids)}"
+        with interp.lock:
+            interp.afters[after_id] = (time.monotonic() + max(0, int(ms)) / 1000.0, lambda: func(*args))
+        return after_id
+
+    def after_idle(self, func, *args):
+        interp = self._interp_of()
+        after_id = f"after#{next(_ids)}"
+        with interp.lock:
+            interp.afters[after_id] = (None, lambda: func(*args))
+        return after_id
+
+    def after_cancel(self, after_id):
+        interp = self._interp_of()
+        with interp.lock:
+            interp.afters.pop(after_id, None)
+
+    def bind(self, *args, **kwargs):
+        return f"bind{next(_ids)}"
+
+    def bind_all(self, *args, **kwargs):
+        return f"bind{next(_ids)}"
+
+    def unbind_all(self, *args):
+        pass
+
+    def configure(self, **kwargs):
+        self._options.update(kwargs)
+
+    config = configure
+
+    def cget(self, key):
+        return self._options.get(key)
+
+    def winfo_screenwidth(self):
+        return 1920
+
+    def winfo_screenheight(self):
+        return 1080
+
+    def winfo_width(self):
+        return 1920
+
+    def winfo_height(self):
+        return 1080
+
+    def winfo_fpixels(self, spec):
+        return 96.0 / 72.0 if str(spec).endswith("p") else 1.0
+
+    def winfo_toplevel(self):
+        return self
+
+    def winfo_exists(self):
+        return 1
+
+    def winfo_id(self):
+        return 1
+
+    def winfo_rgb(self, color):
+        value = _NAMED_COLORS.get(color.strip().lower(), color.strip())
+        m = re.fullmatch(r"#([0-9a-fA-F]{3}|[0-9a-fA-F]{6}|[0-9a-fA-F]{12})", value)
+        if m is None:
+            raise TclError(f'unknown color name "{color}"')
+        digits = m.group(1)
+        n = len(digits) // 3
+        scale = {1: 0x1111, 2: 0x101, 4: 1}[n]
+        return tuple(int(digits[i * n:(i + 1) * n], 16) * scale for i in range(3))
+
+    def update_idletasks(self):
+        pass
+
+    def update(self):
+        pass
+
+    def focus_force(self):
+        pass
+
+    def focus_set(self):
+        pass
+
+    def pack(self, **kwargs):
+        pass
+
+    def place(self, **kwargs):
+        pass
+
+    def destroy(self):
+        pass
+
+    def __str__(self):
+        return self._name
+
+
+class Wm:
+    """窗口管理：只记录是否映射"""
+
+    def title(self, *args):
+        pass
+
+    def attributes(self, *args):
+        return ""
+
+    def overrideredirect(self, *args):
+        pass
+
+    def geometry(self, *args):
+        pass
+
+    def deiconify(self):
+        self.mapped = True
+
+    def withdraw(self):
+        self.mapped = False
+
+    def iconify(self):
+        self.mapped = False
+
+    def lift(self, *args):
+        pass
+
+    def protocol(self, *args):
+        pass
+
+    def minsize(self, *args):
+        pass
+
+    def resizable(self, *args):
+        pass
+
+
+class Tk(Misc, Wm):
+    def __init__(self, *args, **kwargs):
+        self.master = None
+        self._name = "."
+        self._options = dict(kwargs)
+        self._interp = _Interp()
+        self.tk = self._interp
+        self._quit = False
+        self.mapped = True
+        _ROOTS.append(self)
+
+    def quit(self):
+        self._quit = True
+
+    def report_callback_exception(self, exc, value, tb):
+        traceback.print_exception(exc, value, tb)
+        raise SystemExit("回调中出现异常（headless 主循环已停止）")
+
+    def mainloop(self, n=0):
+        interp = self._interp
+        while not self._quit:
+            now = time.monotonic()
+            with interp.lock:
+                timers = sorted((due, after_id) for after_id, (due, _cb) in interp.afters.items()
+                                if due is not None and due <= now)
+                idle = [after_id for after_id, (due, _cb) in interp.afters.items() if due is None]
+            # 先执行到期的定时器，没有时再执行空闲回调（执行期间新加入的空闲回调留到下一轮）
+            batch = [after_id for _due, after_id in timers] or idle
+            if not batch:
+                with interp.lock:
+                    dues = [due for due, _cb in interp.afters.values() if due is not None]
+                time.sleep(min(0.005, max(0.0, min(dues) - time.monotonic())) if dues else 0.005)
+                continue
+            for after_id in batch:
+                with interp.lock:
+                    entry = interp.afters.pop(after_id, None)
+                if entry is None:
+                    continue
+                try:
+                    entry[1]()
+                except SystemExit:
+                    raise
+                except Exception as e:
+                    self.report_callback_exception(type(e), e, e.__traceback__)
+                if self._quit:
+                    return
+
+
+class Toplevel(Misc, Wm):
+    def __init__(self, master=None, **kwargs):
+        self.master = master
+        self._name = f".top{next(_ids)}"
+        self._options = dict(kwargs)
+        self.mapped = True
+
+
+class Frame(Misc):
+    def __init__(self, master=None, **kwargs):
+        self.master = master
+        self._name = f".frame{next(_ids)}"
+        self._options = dict(kwargs)
+
+
+class Canvas(Misc):
+    """画布：只记录各项的类型、坐标、标签与选项"""
+
+    def __init__(self, master=None, **kwargs):
+        self.master = master
+        self._name = f".canvas{next(_ids)}"
+        self._options = dict(kwargs)
+        self.items = {}
+
+    def _create(self, kind, coords, kwargs):
+        item = next(_ids)
+        tags = kwargs.get("tags", ())
+        self.items[item] = {"kind": kind, "coords": coords,
+                            "tags": {tags} if isinstance(tags, str) else set(tags), "options": dict(kwargs)}
+        return item
+
+    def create_image(self, *coords, **kwargs):
+        return self._create("image", coords, kwargs)
+
+    def create_text(self, *coords, **kwargs):
+        return self._create("text", coords, kwargs)
+
+    def create_rectangle(self, *coords, **kwargs):
+        return self._create("rectangle", coords, kwargs)
+
+    def _find(self, tag):
+        if tag == "all":
+            return list(self.items)
+        if isinstance(tag, int):
+            return [tag] if tag in self.items else []
+        return [item for item, info in self.items.items() if tag in info["tags"]]
+
+    def find_withtag(self, tag):
+        return tuple(self._find(tag))
+
+    def itemconfig(self, tag, **kwargs):
+        for item in self._find(tag):
+            self.items[item]["options"].update(kwargs)
+
+    itemconfigure = itemconfig
+
+    def coords(self, tag, *coords):
+        for item in self._find(tag):
+            self.items[item]["coords"] = coords
+
+    def delete(self, *tags):
+        for tag in tags:
+            for item in self._find(tag):
+                del self.items[item]
+
+    def tag_lower(self, *args):
+        pass
+
+    def tag_raise(self, *args):
+        pass
+
+    def bbox(self, *args):
+        return (0, 0, 0, 0)
+
+    def move(self, *args):
+        pass
+
+
+class PhotoImage:
+    """只记录尺寸；登记在图像表中直到 Python 对象被回收"""
+
+    def __init__(self, name=None, cnf={}, master=None, **kwargs):
+        self.name = f"pyimage{next(_ids)}"
+        self.tk = _default_interp()
+        self._size = (int(kwargs.get("width", 0)), int(kwargs.get("height", 0)))
+        data = kwargs.get("data")
+        if data is not None:
+            if isinstance(data, str):
+                data = data.encode("latin-1")
+            header = data[:64].split(b"\n", 3)
+            self._size = tuple(int(v) for v in header[1].split())
+        if kwargs.get("file"):
+            from PIL import Image
+            with Image.open(kwargs["file"]) as img:
+                self._size = img.size
+        self.tk.images[self.name] = self
+
+    def __str__(self):
+        return self.name
+
+    def width(self):
+        return self._size[0]
+
+    def height(self):
+        return self._size[1]
+
+    def _derived(self, size):
+        photo = PhotoImage()
+        photo._size = size
+        return photo
+
+    def zoom(self, x, y=None):
+        return self._derived((self._size[0] * x, self._size[1] * (y or x)))
+
+    def subsample(self, x, y=None):
+        return self._derived((max(1, self._size[0] // x), max(1, self._size[1] // (y or x))))
+
+    def copy(self):
+        return self._derived(self._size)
+
+    def put(self, *args, **kwargs):
+        pass
+
+    def blank(self):
+        pass
+
+
+class PilPhotoImage(PhotoImage):
+    """替代 PIL.ImageTk.PhotoImage（真实实现需要 Tk 的图像扩展）"""
+
+    def __init__(self, image=None, size=None, **kwargs):
+        super().__init__()
+        if image is not None and hasattr(image, "size"):
+            self._size = tuple(image.size)
+        elif size is not None:
+            self._size = tuple(size)
+
+    def paste(self, image, *args, **kwargs):
+        pass
+
+
+class Variable:
+    def __init__(self, master=None, value=None):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+
+    def trace_add(self, *args):
+        pass
+
+
+StringVar = BooleanVar = IntVar = Variable
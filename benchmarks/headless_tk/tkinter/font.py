@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""headless 模式的 tkinter.font 替身：按字号估算文字宽高"""
+
+
+class Font:
+    def __init__(self, root=None, family="", size=12, weight="normal", **kwargs):
+        self._size = size
+
+    def configure(self, **kwargs):
+        self._size = kwargs.get("size", self._size)
+
+    config = configure
+
+    def measure(self, text):
+        return int(len(text) * abs(self._size) * 0.9)
+
+    def metrics(self, key=None):
+        return int(abs(self._size) * 1.4)
+
+    def actual(self, key=None):
+        return {"family": "headless", "size": self._size}
+
+
+def families(root=None):
+    return ("Microsoft YaHei UI",)
+
+
+def nametofont(name):
+    return Font()
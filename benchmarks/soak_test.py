@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+长时间运行（soak）测试：用虚拟时钟把一整天的定时刷新压缩到几分钟内跑完，检查定时器与内存是否泄漏
+
+用法：
+    python benchmarks/soak_test.py                         # 模拟 24 小时，结果写入 soak_results.json
+    python benchmarks/soak_test.py --hours 72 --out soak.json
+    python benchmarks/soak_test.py --headless --hours 16      # 无 X 服务器（CI）：用 headless_tk 替身
+
+- 在本进程中运行 FullScreenPromptApp（未设置 DISPLAY 时自动启动 Xvfb）
+- --headless：改用 benchmarks/headless_tk 中的 tkinter 替身，不需要显示环境；能发现 Python 侧的泄漏
+  （定时器、图像对象、线程、堆），但替身不绘制像素，测不到 Tk 自身的图像内存，正式结论仍以真实 Tk 为准
+- 虚拟时钟：调度器的 clock 与 root 换成虚拟版本，定时器不等待，在 Tk 空闲时立即触发并把虚拟时间
+  推进到到期时刻；画布更新、PhotoImage、工作线程、UiDispatcher 投递等其余部分都是真实的
+  （因此 _update_time、_toggle_blink / _fade_blink、轮播、节能查询都按虚拟时间的频率执行）
+- 每个虚拟小时结束时先采样，再按轮换表切换下一组配置（提示语、颜色、闪烁方式、适配方式，
+  背景在 JPEG / 平铺 PNG / 动图 / 文件夹轮播 / 纯色之间切换，触发背景重新加载）
+- 采样项：Tcl 待执行的 after 数、Tk 图像数、Python 中的 PhotoImage 对象数、线程数、
+  Python 堆（已分配内存块数）与 RSS，以及这一小时内各调度任务的触发次数与背景加载次数
+- 第一轮配置为预热（缓存填充），第二轮为基线；之后每个采样与基线中同一组配置的采样比较
+  （RSS 与整个基线轮的最大值比较：分配器的高水位在基线轮中途才到达），超出容差即判定为泄漏
+- 同时检查虚拟时钟确实驱动了应用：每小时时钟任务至少触发 3000 次，启用闪烁时闪烁任务、
+  轮播配置时轮播任务都有触发，且每次切换配置都重新加载了背景；Tk 回调中抛出的异常也算失败
+- 任一检查失败返回码为 1；依赖 Pillow（生成测试图片）
+- 状态：已用 --headless 完整运行（结果见 README“长时间运行测试”），真实 Tk（Xvfb / Windows）下尚未运行
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import Counter
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(_HERE))
+
+import memory_probe  # noqa: E402
+from _bench_child import write_config  # noqa: E402
+from bench_background import generate_image, start_xvfb  # noqa: E402
+
+_HOUR_MS = 3600 * 1000
+_MIN_CLOCK_TICKS = 3000
+
+
+def use_headless_tk():
+    """让之后的 import tkinter 得到 headless_tk 中的替身，并替换需要真实 Tk 的 ImageTk.PhotoImage"""
+    if "tkinter" in sys.modules:
+        raise RuntimeError("--headless 必须在导入 tkinter 之前启用")
+    sys.path.insert(0, os.path.join(_HERE, "headless_tk"))
+    import tkinter
+    from PIL import ImageTk
+    ImageTk.PhotoImage = tkinter.PilPhotoImage
+
+
+class VirtualClock:
+    """虚拟时间（秒）；只由 VirtualRoot 在定时器触发时向前推进"""
+
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+class VirtualRoot:
+    """
+    交给 TickScheduler 的 root：after(delay) 改为 after_idle，触发时把虚拟时间推进到到期时刻
+    用空闲回调而不是 after(0)：after 0 链会一直占着定时器事件，画布重绘等空闲回调永远轮不到
+    """
+
+    def __init__(self, root, clock):
+        self.root = root
+        self.clock = clock
+
+    def after(self, delay_ms, callback):
+        due = self.clock.now + delay_ms / 1000.0
+
+        def fire():
+            self.clock.now = max(self.clock.now, due)
+            callback()
+
+        return self.root.after_idle(fire)
+
+    def after_cancel(self, after_id):
+        self.root.after_cancel(after_id)
+
+
+def make_assets(folder):
+    """生成测试背景：JPEG、平铺用 PNG、动图 GIF、轮播文件夹"""
+    from PIL import Image
+    assets = {
+        "jpeg": os.path.join(folder, "photo.jpg"),
+        "png": os.path.join(folder, "pattern.png"),
+        "gif": os.path.join(folder, "animated.gif"),
+        "slides": os.path.join(folder, "slides"),
+    }
+    generate_image(assets["jpeg"], (2560, 1440), "jpeg")
+    generate_image(assets["png"], (300, 200), "png")
+    frames = [Image.new("RGB", (640, 360), (i * 30, 80, 255 - i * 30)) for i in range(8)]
+    frames[0].save(assets["gif"], save_all=True, append_images=frames[1:], duration=100, loop=0)
+    os.makedirs(assets["slides"])
+    for i in range(3):
+        generate_image(os.path.join(assets["slides"], f"slide{i}.jpg"), (1920 + i * 160, 1080), "jpeg")
+    return assets
+
+
+def make_phases(assets):
+    """每个虚拟小时切换一组配置（在基础配置上覆盖）"""
+    return [
+        {"background_image_path": assets["jpeg"], "background_fit_mode": "cover", "blink_style": "toggle"},
+        {"background_image_path": assets["png"], "background_fit_mode": "tile", "blink_style": "fade",
+         "message_text": "马上回来\n请稍候", "message_color": "#ffcc00"},
+        {"background_image_path": assets["gif"], "background_fit_mode": "contain", "blink_style": "toggle",
+         "message_prerender": True, "time_font_size": 48},
+        {"background_image_path": assets["slides"], "slideshow_interval_s": 300, "blink_style": "fade",
+         "blink_interval_ms": 1500},
+        {"background_image_path": "", "background_color": "#203040", "message_blink_enabled": False,
+         "message_text": "会议中"},
+    ]
+
+
+def _photo_types():
+    import tkinter as tk
+    types = [tk.PhotoImage]
+    try:
+        from PIL import ImageTk
+        types.append(ImageTk.PhotoImage)
+    except ImportError:
+        pass
+    return tuple(types)
+
+
+def sample(app, hour, phase, started, ticks, bg_loads):
+    """采样一次（在调度器回调中执行，此时不在任何后台加载的回调中间）"""
+    gc.collect()
+    tcl = app.root.tk
+    photo_types = _photo_types()
+    rss = memory_probe.current_rss()
+    return {
+        "hour": hour,
+        "phase": phase,
+        "wall_s": round(time.perf_counter() - started, 2),
+        "wakeups": app.scheduler.wakeups,
+        "after_pending": len(tcl.splitlist(tcl.call("after", "info"))),
+        "tk_images": len(tcl.splitlist(tcl.call("image", "names"))),
+        "photo_objects": sum(1 for obj in gc.get_objects() if isinstance(obj, photo_types)),
+        "threads": threading.active_count(),
+        "heap_blocks": sys.getallocatedblocks(),
+        "rss_mb": round(rss / (1024 * 1024), 1) if rss is not None else None,
+        "ticks": dict(ticks),
+        "bg_loads": bg_loads,
+    }
+
+
+def run_soak(workdir, assets, hours):
+    """运行应用并按虚拟小时采样，返回采样列表"""
+    # 配置、缓存、错误日志、离开时段记录都在临时工作目录（不读用户的 config.json）
+    write_config(workdir, {"config_hot_reload": False, "bg_cache_enabled": True})
+    import fullscreen_prompt_tool as fpt
+    base = dict(fpt.CONFIG)
+    phases = make_phases(assets)
+
+    app = fpt.FullScreenPromptApp()
+    clock = VirtualClock(time.time())
+    app.scheduler.stop()
+    app.scheduler.clock = clock
+    app.scheduler.root = VirtualRoot(app.root, clock)
+
+    # 采样逐行写入临时文件而不是留在列表里：测试自身的记录不应计入被测的 Python 堆
+    samples_path = os.path.join(workdir, "soak_samples.jsonl")
+    errors = []
+    ticks = Counter()
+    started = time.perf_counter()
+    state = {"hour": 0, "bg_job": app._bg_job}
+
+    def on_tick(name, lateness_ms):
+        ticks[name] += 1
+
+    def on_error(exc, value, tb):
+        errors.append("".join(traceback.format_exception(exc, value, tb)))
+        traceback.print_exception(exc, value, tb)
+
+    app.scheduler.on_tick = on_tick
+    app.root.report_callback_exception = on_error
+
+    def apply_phase(index):
+        config = dict(base)
+        config.update(phases[index % len(phases)])
+        app.apply_config(config)
+
+    def on_hour(now):
+        state["hour"] += 1
+        hour = state["hour"]
+        phase = (hour - 1) % len(phases)
+        ticks.pop("soak", None)
+        s = sample(app, hour, phase, started, ticks, app._bg_job - state["bg_job"])
+        ticks.clear()
+        with open(samples_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(s) + "\n")
+        print(f"[{hour:3d}h] phase={phase} after={s['after_pending']} images={s['tk_images']} "
+              f"photos={s['photo_objects']} threads={s['threads']} heap={s['heap_blocks']} "
+              f"rss={s['rss_mb']}MB ticks={s['ticks']} loads={s['bg_loads']} wall={s['wall_s']}s", flush=True)
+        if hour >= hours:
+            app._quit()
+            return
+        state["bg_job"] = app._bg_job
+        apply_phase(hour)
+
+    apply_phase(0)
+    app.scheduler.add("soak", _HOUR_MS, on_hour)
+    app.scheduler.start()
+    app.run()
+    with open(samples_path, encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f]
+    return samples, phases, errors
+
+
+def check_driven(samples, phases):
+    """检查虚拟时钟确实驱动了时钟、闪烁、轮播与背景重新加载，返回未达到的项"""
+    failures = []
+    for s in samples:
+        # 第一个“小时”只到下一个整点（调度器按边界对齐），背景也由启动时加载，不参与检查
+        if s["hour"] == 1:
+            continue
+        phase = phases[s["phase"]]
+        expected = {"clock": _MIN_CLOCK_TICKS}
+        if phase.get("message_blink_enabled", True):
+            expected["blink"] = 1
+        if "slides" in os.path.basename(phase.get("background_image_path", "")):
+            expected["slideshow"] = 1
+        for task, minimum in expected.items():
+            if s["ticks"].get(task, 0) < minimum:
+                failures.append({"hour": s["hour"], "phase": s["phase"], "metric": f"ticks.{task}",
+                                 "baseline": minimum, "current": s["ticks"].get(task, 0)})
+        if phase.get("background_image_path") and s["bg_loads"] < 1:
+            failures.append({"hour": s["hour"], "phase": s["phase"], "metric": "bg_loads",
+                             "baseline": 1, "current": s["bg_loads"]})
+    return failures
+
+
+def check(samples, phase_count, count_tolerance, heap_tolerance, rss_tolerance_mb):
+    """与基线（第二轮）中同一组配置的采样比较，返回超出容差的项"""
+    baseline = {s["phase"]: s for s in samples if phase_count < s["hour"] <= 2 * phase_count}
+    rss_values = [s["rss_mb"] for s in baseline.values() if s["rss_mb"] is not None]
+    rss_baseline = max(rss_values) if rss_values else None
+    failures = []
+    for s in samples:
+        if s["hour"] <= 2 * phase_count:
+            continue
+        base = baseline[s["phase"]]
+        limits = {
+            "after_pending": base["after_pending"] + count_tolerance,
+            "tk_images": base["tk_images"] + count_tolerance,
+            "photo_objects": base["photo_objects"] + count_tolerance,
+            "threads": base["threads"] + count_tolerance,
+            "heap_blocks": base["heap_blocks"] * (1 + heap_tolerance),
+        }
+        baselines = {metric: base[metric] for metric in limits}
+        if rss_baseline is not None and s["rss_mb"] is not None:
+            limits["rss_mb"] = rss_baseline + rss_tolerance_mb
+            baselines["rss_mb"] = rss_baseline
+        for metric, limit in limits.items():
+            if s[metric] > limit:
+                failures.append({"hour": s["hour"], "phase": s["phase"], "metric": metric,
+                                 "baseline": baselines[metric], "current": s[metric]})
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="长时间运行泄漏测试（虚拟时钟）")
+    parser.add_argument("--hours", type=int, default=24, help="模拟的小时数")
+    parser.add_argument("--out", default="soak_results.json")
+    parser.add_argument("--screen", default="1920x1080", help="Xvfb 屏幕分辨率")
+    parser.add_argument("--headless", action="store_true", help="使用 headless_tk 替身，不需要显示环境")
+    parser.add_argument("--count-tolerance", type=int, default=2, help="after/图像/对象/线程数允许的增量")
+    parser.add_argument("--heap-tolerance", type=float, default=0.02, help="Python 堆允许增长的比例")
+    parser.add_argument("--rss-tolerance-mb", type=float, default=16, help="RSS 允许增长的 MB 数")
+    args = parser.parse_args()
+
+    try:
+        import PIL
+    except ImportError:
+        raise SystemExit("生成测试图片需要 Pillow：pip install Pillow")
+
+    xvfb = None
+    if sys.platform.startswith("linux") and "MALLOC_ARENA_MAX" not in os.environ:
+        print("提示：Linux 上建议设置 MALLOC_ARENA_MAX=2，否则多线程解码造成的 RSS 波动可能被误报为泄漏",
+              file=sys.stderr)
+    if args.headless:
+        use_headless_tk()
+    elif not os.environ.get("DISPLAY"):
+        xvfb, os.environ["DISPLAY"] = start_xvfb(args.screen)
+    try:
+        with tempfile.TemporaryDirectory(prefix="fsp_soak_") as tmp:
+            assets = make_assets(tmp)
+            samples, phases, errors = run_soak(tmp, assets, args.hours)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    phase_count = len(phases)
+    failures = check_driven(samples, phases)
+    if args.hours <= 2 * phase_count:
+        print(f"至少需要模拟 {2 * phase_count + 1} 小时才能与基线比较", file=sys.stderr)
+    else:
+        failures += check(samples, phase_count, args.count_tolerance, args.heap_tolerance, args.rss_tolerance_mb)
+    if errors:
+        failures.append({"hour": None, "phase": None, "metric": "callback_errors", "baseline": 0,
+                         "current": len(errors)})
+    for f in failures:
+        print(f"[leak] {f['hour']}h phase={f['phase']} {f['metric']}: {f['baseline']} -> {f['current']}")
+
+    results = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "pillow": PIL.__version__,
+        "tk": "headless" if args.headless else "real",
+        "hours": args.hours,
+        "wall_s": samples[-1]["wall_s"] if samples else None,
+        "samples": samples,
+        "failures": failures,
+        "callback_errors": errors,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.out}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+动画背景（GIF / APNG / WebP 动图）
+- 解码线程：按顺序逐帧解码并缩放，放入有界预取队列（队列满时等待，不会无限占用内存）
+- Tk 线程：按每帧时长用 root.after 播放，取到的帧转换为 PhotoImage 后放入环形缓存；
+  缓存按内存预算淘汰最久未用的帧，全部帧都能放下时解码线程停止，之后只循环播放缓存
+- 解码跟不上时直接丢帧（播放进度按时间推进），不会阻塞主循环
+- 多块分辨率不同的屏幕：每帧只解码一次，按每种分辨率各缩放一份
+- frames_rendered / frames_dropped 计数可通过 stats() 查看
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+import bg_pipeline
+
+# 帧时长缺省值与下限（毫秒）；与浏览器一致，过短的时长按 100ms 处理
+DEFAULT_FRAME_MS = 100
+MIN_FRAME_MS = 20
+# 预取队列长度（已解码、尚未转换的帧数）
+PREFETCH_FRAMES = 4
+
+
+def _frame_duration(info):
+    duration = info.get("duration") or DEFAULT_FRAME_MS
+    return DEFAULT_FRAME_MS if duration < MIN_FRAME_MS else int(duration)
+
+
+class AnimatedBackground:
+    """动画背景播放器；on_frame(photos) 在 Tk 线程中被调用以显示新帧，photos 为 {(宽, 高): PhotoImage}"""
+
+    def __init__(self, root, path, target_sizes, on_frame, on_error=None, memory_budget=128 * 1024 * 1024,
+                 fit_mode="contain"):
+        self.root = root
+        self.path = path
+        self.target_sizes = [tuple(size) for size in target_sizes]
+        self.fit_mode = fit_mode
+        self.on_frame = on_frame
+        self.on_error = on_error
+        self.memory_budget = memory_budget
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+        self.frame_count = None
+        self.error = None
+
+        self._durations = {}
+        self._ring = OrderedDict()
+        self._ring_bytes = 0
+        self._decoded = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._complete = False
+        self._paused = False
+        self._pos = -1
+        self._next_due = None
+        self._after_id = None
+
+    # ------------------------------------------------------------------ 控制
+
+    def start(self):
+        threading.Thread(target=self._decode_loop, name="bg-animation", daemon=True).start()
+        self._after_id = self.root.after(1, self._tick)
+
+    def stop(self):
+        self._stopped = True
+        with self._cond:
+            self._decoded.clear()
+            self._cond.notify_all()
+        self._cancel()
+        self._ring.clear()
+        self._ring_bytes = 0
+
+    def pause(self):
+        """窗口隐藏时暂停播放（解码线程在预取队列满后自然停下）"""
+        self._paused = True
+        self._cancel()
+
+    def resume(self):
+        if not self._paused or self._stopped:
+            return
+        self._paused = False
+        if self._next_due is not None:
+            # 从当前时刻继续播放，暂停期间不计丢帧
+            self._next_due = time.monotonic() * 1000.0
+        self._after_id = self.root.after(1, self._tick)
+
+    def stats(self):
+        return {
+            "frame_count": self.frame_count,
+            "frames_rendered": self.frames_rendered,
+            "frames_dropped": self.frames_dropped,
+            "cached_frames": len(self._ring),
+            "cached_mb": round(self._ring_bytes / (1024 * 1024), 1),
+        }
+
+    def _cancel(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    # ------------------------------------------------------------------ 解码线程
+
+    def _decode_loop(self):
+        """工作线程：不得调用 Tk 接口"""
+        try:
+            from PIL import Image
+            with open(self.path, "rb") as f:
+                img = Image.open(f)
+                count = getattr(img, "n_frames", 1)
+                bilinear = bg_pipeline.resample_filter("BILINEAR")
+                self.frame_count = count
+                while not self._stopped and not self._complete:
+                    for index in range(count):
+                        if self._stopped or self._complete:
+                            return
+                        img.seek(index)
+                        self._durations[index] = _frame_duration(img.info)
+                        if index in self._ring:
+                            # 已在缓存中，无需重复缩放
+                            continue
+                        rgb = img.convert("RGB")
+                        frame = {
+                            target: bg_pipeline.fit_image(rgb, target, self.fit_mode, bilinear)
+                            for target in self.target_sizes
+                        }
+                        with self._cond:
+                            while len(self._decoded) >= PREFETCH_FRAMES and not (self._stopped or self._complete):
+                                self._cond.wait()
+                            if self._stopped or self._complete:
+                                return
+                            self._decoded.append((index, frame))
+        except Exception as e:
+            self.error = f"动画背景解码失败: {e}\n路径: {self.path}"
+
+    # ------------------------------------------------------------------ Tk 线程
+
+    def _duration(self, index):
+        return self._durations.get(index, DEFAULT_FRAME_MS)
+
+    def _tick(self):
+        self._after_id = None
+        if self._stopped or self._paused:
+            return
+        if self.error is not None:
+            # 解码失败：停在最后显示的帧
+            if self.on_error is not None:
+                self.on_error(self.error)
+            return
+        now = time.monotonic() * 1000.0
+        count = self.frame_count
+
+        if self._next_due is None:
+            # 首帧就绪后才开始计时，启动阶段不计丢帧
+            photo = self._take(0) if count else None
+            if photo is None:
+                self._after_id = self.root.after(15, self._tick)
+                return
+            self._pos = 0
+            self.on_frame(photo)
+            self.frames_rendered += 1
+            self._next_due = now + self._duration(0)
+            self._after_id = self.root.after(max(1, int(self._next_due - now)), self._tick)
+            return
+
+        # 按时间推进播放进度；落后超过一整帧的帧直接跳过
+        self._pos = (self._pos + 1) % count
+        while self._next_due + self._duration(self._pos) <= now:
+            self._next_due += self._duration(self._pos)
+            self._pos = (self._pos + 1) % count
+            self.frames_dropped += 1
+
+        photo = self._take(self._pos)
+        if photo is not None:
+            self.on_frame(photo)
+            self.frames_rendered += 1
+        else:
+            # 解码跟不上：保留上一帧，不等待
+            self.frames_dropped += 1
+
+        self._next_due += self._duration(self._pos)
+        self._after_id = self.root.after(max(1, int(self._next_due - now)), self._tick)
+
+    def _take(self, index):
+        """取第 index 帧（各分辨率的 PhotoImage）：先查环形缓存，再从预取队列转换"""
+        photo = self._ring.get(index)
+        if photo is not None:
+            self._ring.move_to_end(index)
+            return photo[0]
+
+        count = self.frame_count
+        frame = None
+        with self._cond:
+            while self._decoded:
+                head = self._decoded[0][0]
+                distance = (head - index) % count
+                if distance == 0:
+                    frame = self._decoded.popleft()[1]
+                    break
+                if distance <= count // 2:
+                    # 队首帧还没轮到播放
+                    break
+                # 队首帧已过期，丢弃
+                self._decoded.popleft()
+            self._cond.notify_all()
+        if frame is None:
+            return None
+
+        from PIL import ImageTk
+        photo = {target: ImageTk.PhotoImage(img) for target, img in frame.items()}
+        nbytes = sum(img.size[0] * img.size[1] * 4 for img in frame.values())
+        self._ring[index] = (photo, nbytes)
+        self._ring_bytes += nbytes
+        while self._ring_bytes > self.memory_budget and len(self._ring) > 1:
+            _index, (_photo, evicted) = self._ring.popitem(last=False)
+            self._ring_bytes -= evicted
+        if len(self._ring) == count:
+            # 全部帧已缓存：通知解码线程退出，释放预取队列
+            with self._cond:
+                self._complete = True
+                self._decoded.clear()
+                self._cond.notify_all()
+        return photo
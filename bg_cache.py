@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+背景图缩放结果磁盘缓存
+- 缓存目录位于 config.json 同目录下的 bg_cache/
+- 以「源文件路径 + 大小 + 修改时间 + 目标分辨率 + 适配模式」为键
+- 以原始 PPM（P6）格式保存已缩放好的 RGB 图像，tk.PhotoImage 可直接读入，无需解码/重采样
+- 总大小超过上限时按最近使用时间（LRU）淘汰
+- 加载线程、预设预加载线程与配置界面预览进程可能同时写入同一项，临时文件名按进程与线程区分
+"""
+
+import os
+import threading
+import time
+
+CACHE_DIR_NAME = "bg_cache"
+_SUFFIX = ".ppm"
+_TMP_SUFFIX = ".tmp"
+# 超过该时长（秒）仍未替换的临时文件视为崩溃遗留，淘汰时删除
+_STALE_TMP_S = 3600
+
+
+def cache_key(path, target_size, fit_mode):
+    """计算缓存键；源文件不存在时抛出 OSError"""
+    # hashlib 会加载 OpenSSL，只在实际加载背景图时导入
+    import hashlib
+    st = os.stat(path)
+    parts = (
+        os.path.normcase(os.path.abspath(path)),
+        str(st.st_size),
+        str(st.st_mtime_ns),
+        "%dx%d" % tuple(target_size),
+        fit_mode,
+    )
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def ppm_header(width, height):
+    """生成 P6 格式 PPM 文件头"""
+    return b"P6\n%d %d\n255\n" % (width, height)
+
+
+def parse_ppm_header(data):
+    """解析 ppm_header 生成的文件头，返回 (宽, 高, 像素数据偏移)；格式不符时返回 None"""
+    parts = data[:64].split(b"\n", 3)
+    if len(parts) < 4 or parts[0] != b"P6" or parts[2] != b"255":
+        return None
+    try:
+        width, height = (int(v) for v in parts[1].split())
+    except ValueError:
+        return None
+    offset = len(parts[0]) + len(parts[1]) + len(parts[2]) + 3
+    if len(data) < offset + width * height * 3:
+        return None
+    return width, height, offset
+
+
+class BackgroundCache:
+    """已缩放背景图的磁盘 LRU 缓存（以文件 mtime 记录最近使用时间）"""
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max(0, int(max_bytes))
+
+    def _path_for(self, key):
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+    def get(self, key):
+        """读取缓存的 PPM 数据；未命中返回 None"""
+        path = self._path_for(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        # 命中即刷新 mtime，作为 LRU 的最近使用时间
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, img):
+        """写入缓存：img 为 PIL RGB 图像"""
+        if self.max_bytes <= 0:
+            return
+        width, height = img.size
+        self._write(key, (ppm_header(width, height), img.tobytes()))
+
+    def put_data(self, key, data):
+        """写入缓存：data 为含文件头的完整 PPM 数据"""
+        if self.max_bytes <= 0:
+            return
+        self._write(key, (data,))
+
+    def _write(self, key, chunks):
+        """先写临时文件再原子替换，避免半截文件；失败时删除临时文件"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}{_TMP_SUFFIX}"
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        self.evict()
+
+    def discard(self, key):
+        """删除损坏或无效的缓存项"""
+        try:
+            os.remove(self._path_for(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        """总大小超过上限时，按最近使用时间从旧到新删除；顺带删除崩溃遗留的临时文件"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        entries = []
+        total = 0
+        stale_before = time.time() - _STALE_TMP_S
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(_TMP_SUFFIX):
+                # 其他线程/进程正在写的临时文件较新，不删
+                try:
+                    if os.stat(path).st_mtime < stale_before:
+                        os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(_SUFFIX):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+背景图加载流水线
+- 只做文件读取、解码与缩放，不调用任何 Tk 接口，可在工作线程中运行
+- 先查磁盘缓存，命中直接返回已缩放的 PPM 数据
+- 未命中时先产出低分辨率预览（JPEG draft 解码 / 最近邻缩放），再做 LANCZOS 高质量缩放
+- 控制峰值内存：JPEG 用 draft 按比例缩小解码，其他格式解码后立即 reduce 整数倍缩小，
+  不再保留多份全尺寸副本；预计峰值超出内存预算时拒绝加载
+- 多块分辨率不同的屏幕：源图只解码一次，每种分辨率各缩放一次
+- 适配模式 contain / cover / stretch / center / tile：先确定可见的源图区域，只对该区域重采样；
+  tile 输出一个图块，由 Tk 侧在画布上重复摆放
+"""
+
+import bg_cache
+import startup_profile
+
+# 预览图边长约为最终尺寸的 1/PREVIEW_FACTOR，Tk 侧用 zoom 放大
+PREVIEW_FACTOR = 4
+
+# reduce 整数倍缩小后，至少再留 REDUCING_GAP 倍交给 LANCZOS，保证画质
+REDUCING_GAP = 2.0
+
+# 默认峰值内存预算（字节）
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# 背景图适配模式：完整显示 / 铺满裁剪 / 拉伸 / 原尺寸居中 / 平铺
+FIT_MODES = ("contain", "cover", "stretch", "center", "tile")
+
+# 平铺时过小的图块先拼成不小于该边长的大图块，减少画布上的图像项数量
+MIN_TILE_SIZE = 256
+
+# 解码后可以直接 reduce 缩小的模式；其余（调色板、1 位、CMYK、16 位等）先整幅转换为 RGB
+_REDUCE_MODES = ("RGB", "RGBA", "L", "LA", "I", "F")
+
+
+class BackgroundLoadError(Exception):
+    """背景图加载失败，消息会写入 bg_load_error.txt"""
+
+
+class LoadedBackground:
+    """
+    加载结果
+    kind:
+      "ppm" —— payload 为缓存中的 PPM 数据
+      "pil" —— payload 为 PIL 缩放后的 RGB 图像
+      "tk"  —— 未安装 PIL（且无法用 NumPy 缩放），payload 为文件路径，由 Tk 线程用 tk.PhotoImage 加载
+    """
+
+    def __init__(self, kind, payload, cache_key=None):
+        self.kind = kind
+        self.payload = payload
+        self.cache_key = cache_key
+
+
+def contain_size(src_w, src_h, dst_w, dst_h):
+    """contain 模式：保持比例完整放入目标区域后的尺寸"""
+    scale = min(dst_w / src_w, dst_h / src_h)
+    return max(1, int(src_w * scale)), max(1, int(src_h * scale))
+
+
+def scaled_size(src_w, src_h, dst_w, dst_h, fit_mode):
+    """整幅源图缩放后的尺寸（cover 为裁剪前的尺寸；center / tile 不缩放），用于决定缩小解码的程度"""
+    if fit_mode == "cover":
+        scale = max(dst_w / src_w, dst_h / src_h)
+        return max(1, round(src_w * scale)), max(1, round(src_h * scale))
+    if fit_mode == "stretch":
+        return dst_w, dst_h
+    if fit_mode in ("center", "tile"):
+        return src_w, src_h
+    return contain_size(src_w, src_h, dst_w, dst_h)
+
+
+def fit_geometry(src_w, src_h, dst_w, dst_h, fit_mode):
+    """
+    返回 (box, out_size)
+    box：需要用到的源图区域，按源图宽高的比例表示 (左, 上, 右, 下)；out_size：输出图尺寸
+    """
+    if fit_mode == "cover":
+        # 只保留居中的可见部分，裁掉的像素不参与重采样
+        scale = max(dst_w / src_w, dst_h / src_h)
+        vis_w = min(1.0, dst_w / scale / src_w)
+        vis_h = min(1.0, dst_h / scale / src_h)
+        left, top = (1.0 - vis_w) / 2, (1.0 - vis_h) / 2
+        return (left, top, left + vis_w, top + vis_h), (dst_w, dst_h)
+    if fit_mode == "stretch":
+        return (0.0, 0.0, 1.0, 1.0), (dst_w, dst_h)
+    if fit_mode in ("center", "tile"):
+        out_w, out_h = min(src_w, dst_w), min(src_h, dst_h)
+        if fit_mode == "tile":
+            # 平铺从左上角开始，超出屏幕的部分用不到
+            return (0.0, 0.0, out_w / src_w, out_h / src_h), (out_w, out_h)
+        left, top = (src_w - out_w) / 2 / src_w, (src_h - out_h) / 2 / src_h
+        return (left, top, left + out_w / src_w, top + out_h / src_h), (out_w, out_h)
+    return (0.0, 0.0, 1.0, 1.0), contain_size(src_w, src_h, dst_w, dst_h)
+
+
+def _tile_block(img):
+    """小图块按整数倍重复拼大，拼接后仍可无缝平铺"""
+    w, h = img.size
+    nx, ny = -(-MIN_TILE_SIZE // w), -(-MIN_TILE_SIZE // h)
+    if nx <= 1 and ny <= 1:
+        return img
+    from PIL import Image
+    block = Image.new(img.mode, (w * nx, h * ny))
+    for y in range(ny):
+        for x in range(nx):
+            block.paste(img, (x * w, y * h))
+    return block
+
+
+def fit_image(img, target_size, fit_mode, resample, src_size=None):
+    """
+    按适配模式生成输出图：先裁出可见区域（resize 的 box 参数），再对该区域重采样
+    img 可以是源图按比例缩小解码后的结果，此时 src_size 传源图原始尺寸
+    """
+    src_w, src_h = src_size or img.size
+    box, out_size = fit_geometry(src_w, src_h, target_size[0], target_size[1], fit_mode)
+    w, h = img.size
+    pixel_box = (box[0] * w, box[1] * h, box[2] * w, box[3] * h)
+    region = (round(pixel_box[2] - pixel_box[0]), round(pixel_box[3] - pixel_box[1]))
+    if region == out_size:
+        # 无需缩放（center / tile，或尺寸恰好相等）：只裁剪
+        if region != img.size:
+            img = img.crop(tuple(round(v) for v in pixel_box))
+    else:
+        img = img.resize(out_size, resample, box=pixel_box)
+    if fit_mode == "tile":
+        img = _tile_block(img)
+    return img
+
+
+def resample_filter(name):
+    """兼容新旧版本 Pillow 的重采样常量"""
+    from PIL import Image
+    return getattr(Image.Resampling, name) if hasattr(Image, "Resampling") else getattr(Image, name)
+
+
+def is_animated(path):
+    """是否为多帧动图（GIF / APNG / WebP）；未安装 Pillow 或无法识别时返回 False"""
+    try:
+        from PIL import Image
+        with open(path, "rb") as f:
+            img = Image.open(f)
+            return bool(getattr(img, "is_animated", False)) and getattr(img, "n_frames", 1) > 1
+    except Exception:
+        return False
+
+
+def _bytes_per_pixel(mode):
+    """PIL 内部每像素占用字节数（RGB、LA、PA 都按 4 字节存储）"""
+    if mode in ("1", "L", "P"):
+        return 1
+    if mode.startswith("I;16"):
+        return 2
+    return 4
+
+
+def reduce_factor(decoded_size, new_size):
+    """解码后 reduce 整数倍缩小的倍数（小于 2 时不缩小）"""
+    return int(min(decoded_size[0] / new_size[0], decoded_size[1] / new_size[1]) / REDUCING_GAP)
+
+
+def _decode_peak_bytes(decoded_size, mode, factor):
+    """
+    解码与转换为 RGB 阶段的峰值：转换时原图与 RGB 副本（4 字节/像素）同时存在
+    不能直接 reduce 的模式（如调色板图）整幅转换；LA 等先 reduce，缩小后再转换，不缩小时同样是整幅转换；
+    带透明通道的 LA / RGBA 在 reduce 前还会整幅转换为预乘透明度的副本（Pillow 的实现）
+    """
+    dec_w, dec_h = decoded_size
+    bpp = _bytes_per_pixel(mode)
+    full = dec_w * dec_h * bpp
+    if mode == "RGB":
+        return full
+    rgb = dec_w * dec_h * _bytes_per_pixel("RGB")
+    if mode not in _REDUCE_MODES or factor < 2:
+        return full + rgb
+    reduced = (dec_w // factor) * (dec_h // factor)
+    premultiplied = full if mode in ("LA", "RGBA") else 0
+    return max(full + premultiplied + reduced * bpp, reduced * (bpp + _bytes_per_pixel("RGB")))
+
+
+def estimate_peak_bytes(decoded_size, mode, new_size, factor=1):
+    """
+    估算加载峰值内存：解码与转换阶段 + LANCZOS 中间图（先横向后纵向）+ 结果图
+    factor：解码后 reduce 的倍数（见 reduce_factor）
+    """
+    dec_w, dec_h = decoded_size
+    new_w, new_h = new_size
+    return _decode_peak_bytes(decoded_size, mode, factor) + new_w * dec_h * 4 + new_w * new_h * 4
+
+
+def _preview_size(size):
+    w, h = size
+    return max(1, -(-w // PREVIEW_FACTOR)), max(1, -(-h // PREVIEW_FACTOR))
+
+
+def _jpeg_preview(path, target_size, fit_mode="contain"):
+    """JPEG 快速预览：draft 模式按 1/2~1/8 比例直接解码，成本远低于完整解码"""
+    from PIL import Image
+    with open(path, "rb") as f:
+        img = Image.open(f)
+        if img.format != "JPEG":
+            return None
+        src_size = img.size
+        preview_target = _preview_size(target_size)
+        img.draft("RGB", scaled_size(src_size[0], src_size[1], *preview_target, fit_mode))
+        img = img.convert("RGB")
+    return fit_image(img, preview_target, fit_mode, resample_filter("NEAREST"), src_size)
+
+
+def _decode_reduced(path, target_size, memory_budget, fit_mode="contain"):
+    """
+    按目标尺寸缩小解码，返回 (RGB 图像, 源图尺寸)
+    - JPEG：draft 让解码器直接按 1/2、1/4、1/8 输出
+    - 其他格式：完整解码后立即 reduce 整数倍缩小，原图随即释放
+    """
+    from PIL import Image
+    try:
+        # 用二进制流打开，避免中文路径/文件名编码问题（Windows 常见）
+        with open(path, "rb") as f:
+            img = Image.open(f)
+            src_w, src_h = img.size
+            if src_w <= 0 or src_h <= 0:
+                raise BackgroundLoadError(f"图片尺寸无效: {src_w}x{src_h}\n路径: {path}")
+            new_size = scaled_size(src_w, src_h, target_size[0], target_size[1], fit_mode)
+            if img.format == "JPEG":
+                img.draft("RGB", new_size)
+            # center / tile 只裁剪不缩放，峰值按裁剪结果估算
+            out_size = new_size
+            if fit_mode in ("center", "tile"):
+                out_size = fit_geometry(src_w, src_h, target_size[0], target_size[1], fit_mode)[1]
+            factor = reduce_factor(img.size, new_size)
+            peak = estimate_peak_bytes(img.size, img.mode, out_size, factor)
+            if memory_budget and peak > memory_budget:
+                raise BackgroundLoadError(
+                    f"图片过大: {src_w}x{src_h}，预计占用 {peak // (1024 * 1024)} MB，"
+                    f"超出内存预算 {memory_budget // (1024 * 1024)} MB\n路径: {path}"
+                )
+            # 文件关闭前完成解码，无需再 copy 一份
+            with startup_profile.measure("decode", format=img.format, size=list(img.size)):
+                img.load()
+    except BackgroundLoadError:
+        raise
+    except Exception as e:
+        raise BackgroundLoadError(f"PIL加载失败: {e}\n路径: {path}")
+
+    try:
+        if img.mode not in _REDUCE_MODES:
+            img = img.convert("RGB")
+        if factor >= 2:
+            with startup_profile.measure("reduce", factor=factor):
+                img = img.reduce(factor)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+    except Exception as e:
+        raise BackgroundLoadError(f"PIL缩放/转换失败: {e}\n路径: {path}")
+    return img, (src_w, src_h)
+
+
+def _load_netpbm(path, target_sizes, fit_mode, cache, keys):
+    """未安装 PIL 时用 NumPy 缩放 PPM/PGM，返回 {(宽, 高): LoadedBackground}；不适用时返回空字典"""
+    try:
+        with startup_profile.measure("import numpy"):
+            import ppm_resample
+    except ImportError:
+        return {}
+    if not ppm_resample.is_netpbm(path):
+        return {}
+    try:
+        with startup_profile.measure("decode", engine="numpy"):
+            src = ppm_resample.open_netpbm(path)
+    except (OSError, ValueError):
+        # 例如 16 位 PPM：交给 tk.PhotoImage
+        return {}
+    results = {}
+    for size in target_sizes:
+        with startup_profile.measure("resize", engine="numpy", src=[src.shape[1], src.shape[0]],
+                                     dst=list(size), mode=fit_mode):
+            data = ppm_resample.fit_netpbm(src, size, fit_mode)
+        if cache is not None:
+            try:
+                with startup_profile.measure("cache_write"):
+                    cache.put_data(keys[size], data)
+            except OSError:
+                pass
+        # tk.PhotoImage 只接受 bytes，这里是唯一一次整幅复制
+        results[size] = LoadedBackground("ppm", bytes(data), keys.get(size))
+    return results
+
+
+def load_background(path, target_size, fit_mode="contain", cache=None, on_preview=None,
+                    memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    加载并缩放背景图，返回 LoadedBackground；无法加载时抛出 BackgroundLoadError
+    on_preview(img)：可选，产出低分辨率预览时回调，img 约为最终尺寸的 1/PREVIEW_FACTOR
+    memory_budget：峰值内存预算（字节），0 表示不限制
+    """
+    target_size = tuple(target_size)
+    return load_backgrounds(path, [target_size], fit_mode, cache, on_preview, memory_budget)[target_size]
+
+
+def load_backgrounds(path, target_sizes, fit_mode="contain", cache=None, on_preview=None,
+                     memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    为多种屏幕分辨率加载背景图，返回 {(宽, 高): LoadedBackground}
+    源图最多解码一次（按所有未命中缓存的分辨率中最大的宽、高缩小解码），每种分辨率各缩放一次；
+    预览按第一个分辨率生成；center / tile 不缩放，无需预览
+    """
+    sizes = []
+    for size in target_sizes:
+        size = tuple(size)
+        if size not in sizes:
+            sizes.append(size)
+    results = {}
+
+    # 1. 磁盘缓存（按分辨率分别命中）
+    keys = {}
+    if cache is not None:
+        try:
+            keys = {size: bg_cache.cache_key(path, size, fit_mode) for size in sizes}
+        except OSError:
+            cache = None
+    if cache is not None:
+        for size in sizes:
+            with startup_profile.measure("cache_read"):
+                data = cache.get(keys[size])
+            if data:
+                results[size] = LoadedBackground("ppm", data, keys[size])
+    missing = [size for size in sizes if size not in results]
+    if not missing:
+        return results
+
+    try:
+        with startup_profile.measure("import PIL"):
+            import PIL.Image  # 仅检测 Pillow 是否可用
+    except ImportError:
+        # PPM/PGM 且装有 NumPy 时缩放到精确尺寸，否则交给 Tk 线程按整数倍缩放
+        loaded = _load_netpbm(path, missing, fit_mode, cache, keys)
+        for size in missing:
+            results[size] = loaded.get(size) or LoadedBackground("tk", path)
+        return results
+
+    # 2. JPEG 先出 draft 预览，再完整解码
+    if fit_mode in ("center", "tile"):
+        on_preview = None
+    previewed = False
+    if on_preview is not None:
+        try:
+            with startup_profile.measure("preview_decode"):
+                preview = _jpeg_preview(path, missing[0], fit_mode)
+        except Exception:
+            preview = None
+        if preview is not None:
+            on_preview(preview)
+            previewed = True
+
+    # 包住所有分辨率的外框：按它缩小解码后，对每种分辨率都仍不小于最终尺寸
+    bounds = (max(w for w, _h in missing), max(h for _w, h in missing))
+    decoded, src_size = _decode_reduced(path, bounds, memory_budget, fit_mode)
+
+    for size in missing:
+        try:
+            # 非 JPEG：已完整解码，先用最近邻出一张预览，再做高质量缩放
+            if on_preview is not None and not previewed:
+                on_preview(fit_image(decoded, _preview_size(size), fit_mode, resample_filter("NEAREST"), src_size))
+                previewed = True
+
+            # 使用 PIL 缩放（支持任意比例，质量更好）；只重采样可见区域
+            with startup_profile.measure("resize", src=list(decoded.size), dst=list(size), mode=fit_mode):
+                img = fit_image(decoded, size, fit_mode, resample_filter("LANCZOS"), src_size)
+        except Exception as e:
+            raise BackgroundLoadError(f"PIL缩放/转换失败: {e}\n路径: {path}")
+
+        # 写入缓存失败不影响显示
+        if cache is not None:
+            try:
+                with startup_profile.measure("cache_write"):
+                    cache.put(keys[size], img)
+            except OSError:
+                pass
+        results[size] = LoadedBackground("pil", img, keys.get(size))
+    return results
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+目录轮播背景
+- background_image_path 指向文件夹时，按文件名顺序循环显示其中的图片
+- 内存中最多只有两张已缩放好的图：当前显示的一张 + 后台预取好的下一张；
+  切换时只需一次 itemconfig(image=...)，不在 Tk 线程中解码
+- 已缩放结果写入 bg_cache 磁盘缓存（有总大小上限），下一轮直接读取缓存
+- 每轮回到第一张时重新列目录，增删的图片在下一轮生效
+"""
+
+import os
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp", ".tif", ".tiff", ".ppm", ".pgm")
+
+
+def list_images(folder):
+    """列出目录中的图片文件（不递归），按文件名排序；目录不可读时返回空列表"""
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return []
+    paths = []
+    for name in names:
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        path = os.path.join(folder, name)
+        if os.path.isfile(path):
+            paths.append(path)
+    paths.sort(key=lambda p: os.path.basename(p).casefold())
+    return paths
+
+
+class Slideshow:
+    """轮播状态（只在 Tk 线程中访问）"""
+
+    def __init__(self, folder, paths):
+        self.folder = folder
+        self.paths = paths
+        self.index = 0
+        # 已预取好的下一张：(序号, PhotoImage)
+        self.prefetched = None
+        # 正在后台预取的序号
+        self.pending = None
+        # 到点时下一张尚未就绪：预取完成后立即切换
+        self.switch_when_ready = False
+        self.switches = 0
+        self.late_switches = 0
+
+    def next_index(self):
+        return (self.index + 1) % len(self.paths)
+
+    def refresh(self):
+        """回到第一张前重新列目录；目录已清空时保留原列表（当前序号随之更新）"""
+        paths = list_images(self.folder)
+        if not paths:
+            return
+        current = self.paths[self.index] if self.index < len(self.paths) else None
+        self.paths = paths
+        self.index = paths.index(current) if current in paths else len(paths) - 1
+
+    def stats(self):
+        return {
+            "folder": self.folder,
+            "image_count": len(self.paths),
+            "index": self.index,
+            "next_ready": self.prefetched is not None,
+            "switches": self.switches,
+            "late_switches": self.late_switches,
+        }
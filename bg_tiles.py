@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+超大背景图分块显示（高分屏 / 8K）
+- 整幅转换为一个 PhotoImage 时，Tk 侧副本与 PIL 图像同时占用内存，且一次转换、一次 create_image
+  会长时间阻塞主循环
+- 分块：把已缩放好的图像切成固定大小的图块，在空闲回调中由中心向外逐块转换为 PhotoImage，
+  每块作为单独的画布项摆放；每次空闲回调只占用约 TILE_BUDGET_MS 毫秒，时间、闪烁与 ESC 不受影响
+- 全部图块转换完成后释放源图像；每块的转换耗时记录在 tile_ms 中，可通过 stats() 查看
+- 某一块转换失败（如内存不足）时停止其余图块，释放源图像与已转换的图块，通知订阅者的 on_error
+"""
+
+from collections import deque
+
+import tkinter as tk
+
+import startup_profile
+
+# 默认图块边长（像素）
+DEFAULT_TILE_SIZE = 512
+# 超过该像素数（约 4K）的背景图才分块显示
+TILED_MIN_PIXELS = 3840 * 2160
+# 每次空闲回调最多占用的时间（毫秒），至少转换一块
+TILE_BUDGET_MS = 8.0
+
+
+def tile_rects(width, height, tile_size):
+    """切分为 (左, 上, 右, 下) 图块，按图块中心到图像中心的距离排序"""
+    cx, cy = width / 2, height / 2
+    rects = [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in range(0, height, tile_size)
+        for x in range(0, width, tile_size)
+    ]
+    rects.sort(key=lambda r: ((r[0] + r[2]) / 2 - cx) ** 2 + ((r[1] + r[3]) / 2 - cy) ** 2)
+    return rects
+
+
+class TiledImage:
+    """分块转换中的背景图（PIL 图像）；同分辨率的屏幕共用一个实例"""
+
+    def __init__(self, root, image, tile_size=DEFAULT_TILE_SIZE):
+        self.root = root
+        self.tile_size = tile_size
+        self.width, self.height = image.size
+        self.tiles = []
+        self.tile_ms = []
+        self._image = image
+        self._pending = deque(tile_rects(self.width, self.height, tile_size))
+        self._total = len(self._pending)
+        self._listeners = []
+        self._after_id = None
+        self._cancelled = False
+        self.error = None
+
+    @property
+    def complete(self):
+        return not self._pending and self.error is None
+
+    def start(self):
+        """开始（或继续）在空闲回调中转换图块"""
+        if self._after_id is None and self._pending and not self._cancelled:
+            self._after_id = self.root.after_idle(self._step)
+
+    def subscribe(self, on_tile, on_complete=None, on_error=None):
+        """
+        on_tile(x, y, photo)：已转换的图块立即回调，之后每转换一块回调一次
+        on_complete()：全部图块转换完成时回调（已完成则立即回调）
+        on_error(error)：某一块转换失败时回调（已失败则立即回调），此时已转换的图块均已释放
+        """
+        if self.error is not None:
+            if on_error is not None:
+                on_error(self.error)
+            return
+        for x, y, photo in self.tiles:
+            on_tile(x, y, photo)
+        if self.complete:
+            if on_complete is not None:
+                on_complete()
+            return
+        self._listeners.append((on_tile, on_complete, on_error))
+        self.start()
+
+    def cancel(self):
+        """不再显示：停止转换并释放源图像（已转换的图块保留，由持有者决定何时释放）"""
+        self._cancelled = True
+        self._listeners = []
+        self._image = None
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def stats(self):
+        converted = len(self.tile_ms)
+        return {
+            "tile_size": self.tile_size,
+            "tiles": self._total,
+            "converted": converted,
+            "convert_ms_total": round(sum(self.tile_ms), 3),
+            "convert_ms_mean": round(sum(self.tile_ms) / converted, 3) if converted else None,
+            "convert_ms_max": round(max(self.tile_ms), 3) if converted else None,
+        }
+
+    def _step(self):
+        self._after_id = None
+        if self._cancelled:
+            return
+        from PIL import ImageTk
+        started = startup_profile.now()
+        while self._pending:
+            rect = self._pending.popleft()
+            t0 = startup_profile.now()
+            try:
+                photo = ImageTk.PhotoImage(self._image.crop(rect))
+            except Exception as e:
+                self._fail(e)
+                return
+            self.tile_ms.append((startup_profile.now() - t0) * 1000.0)
+            startup_profile.span("tile convert", t0, x=rect[0], y=rect[1])
+            self.tiles.append((rect[0], rect[1], photo))
+            for on_tile, _on_complete, _on_error in list(self._listeners):
+                on_tile(rect[0], rect[1], photo)
+            if (startup_profile.now() - started) * 1000.0 >= TILE_BUDGET_MS:
+                break
+        if self._pending:
+            # 让出主循环：本轮空闲回调结束后处理挂起的事件，再继续下一批
+            self._after_id = self.root.after_idle(self._step)
+            return
+        self._image = None
+        listeners, self._listeners = self._listeners, []
+        for _on_tile, on_complete, _on_error in listeners:
+            if on_complete is not None:
+                on_complete()
+
+    def _fail(self, error):
+        """转换失败：停止其余图块，释放源图像与已转换的图块（订阅者随即删除对应的画布项）"""
+        # 不保留 traceback：它引用的 _step 栈帧里还有最后一块已转换的图块
+        self.error = error.with_traceback(None)
+        listeners = self._listeners
+        self.cancel()
+        self._pending.clear()
+        self.tiles = []
+        for _on_tile, _on_complete, on_error in listeners:
+            if on_error is not None:
+                on_error(error)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+提示语柔和渐变闪烁（呼吸效果）
+- 两种颜色之间按余弦曲线往返，一个来回为 2 × blink_interval_ms
+- 渐变色在配置加载时一次性算好放进查表数组，每帧只按当前时刻取下标，不做颜色插值
+- 帧率自适应：定时回调平均延迟超过半帧时帧率减半，持续准时后逐步恢复到上限
+- 颜色与上一帧相同时不调用 itemconfig；stats() 报告实际帧率与 CPU 占用
+"""
+
+import math
+import time
+
+# 帧率下限（fps）：再忙也保持可见的渐变，而不是退化为停顿
+MIN_FPS = 4
+# 平均延迟超过帧间隔的该比例时降帧
+BACKOFF_RATIO = 0.5
+# 平均延迟低于帧间隔的该比例、且连续 RECOVER_FRAMES 帧都如此时升帧
+RECOVER_RATIO = 0.15
+RECOVER_FRAMES = 48
+# 延迟的指数滑动平均系数
+LATENESS_SMOOTHING = 0.2
+
+
+def _parse_hex(color):
+    """#rgb / #rrggbb 转为 (r, g, b)；无法解析时抛出 ValueError（颜色名等需由调用方传入 resolve）"""
+    color = color.strip().lstrip("#")
+    if len(color) not in (3, 6):
+        raise ValueError(f"无法解析的颜色: {color!r}")
+    if len(color) == 3:
+        color = "".join(c * 2 for c in color)
+    return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+
+
+def gradient_table(color_a, color_b, steps, resolve=_parse_hex):
+    """
+    一个完整呼吸周期（a → b → a）的颜色表，共 steps 项，余弦缓动
+    resolve：颜色转为 0~255 的 (r, g, b)，缺省只支持 #rgb / #rrggbb
+    """
+    (r1, g1, b1), (r2, g2, b2) = resolve(color_a), resolve(color_b)
+    table = []
+    for i in range(steps):
+        t = (1.0 - math.cos(2.0 * math.pi * i / steps)) / 2.0
+        table.append("#%02x%02x%02x" % (
+            round(r1 + (r2 - r1) * t), round(g1 + (g2 - g1) * t), round(b1 + (b2 - b1) * t),
+        ))
+    return table
+
+
+class FadeBlink:
+    """渐变闪烁状态：颜色表 + 自适应帧率 + 统计"""
+
+    def __init__(self, color_a, color_b, interval_ms, max_fps, resolve=_parse_hex):
+        self.cycle_ms = max(2, int(interval_ms) * 2)
+        self.max_fps = max(MIN_FPS, int(max_fps))
+        # 按最高帧率生成颜色表；降帧时只是隔项取色，无需重算
+        self.table = gradient_table(color_a, color_b, max(2, self.cycle_ms * self.max_fps // 1000), resolve)
+        self.fps = self.max_fps
+        self.backoffs = 0
+        self._lateness_avg = 0.0
+        self._on_time_frames = 0
+        self._last_color = None
+        self.reset_stats()
+
+    @property
+    def period_ms(self):
+        return max(1, round(1000 / self.fps))
+
+    def color_at(self, now):
+        """now 时刻（秒）应显示的颜色：按周期内相位查表"""
+        phase = (now * 1000.0) % self.cycle_ms / self.cycle_ms
+        return self.table[int(phase * len(self.table)) % len(self.table)]
+
+    def tick(self, now, lateness_ms, apply):
+        """
+        每帧调用：颜色变化时 apply(color)，并按本帧延迟调整帧率
+        返回 True 表示帧率已改变，调用方需按 period_ms 重设定时周期
+        """
+        t_cpu = time.thread_time()
+        self.frames += 1
+        color = self.color_at(now)
+        if color != self._last_color:
+            self._last_color = color
+            apply(color)
+            self.repaints += 1
+        changed = self._adapt(lateness_ms)
+        self._cpu += time.thread_time() - t_cpu
+        return changed
+
+    def _adapt(self, lateness_ms):
+        self._lateness_avg += (lateness_ms - self._lateness_avg) * LATENESS_SMOOTHING
+        frame_ms = 1000.0 / self.fps
+        if self._lateness_avg > frame_ms * BACKOFF_RATIO and self.fps > MIN_FPS:
+            # 主循环忙不过来：帧率减半
+            self.fps = max(MIN_FPS, self.fps // 2)
+            self.backoffs += 1
+            self._lateness_avg = 0.0
+            self._on_time_frames = 0
+            return True
+        if self._lateness_avg < frame_ms * RECOVER_RATIO and self.fps < self.max_fps:
+            self._on_time_frames += 1
+            if self._on_time_frames >= RECOVER_FRAMES:
+                self.fps = min(self.max_fps, self.fps + max(1, self.fps // 4))
+                self._on_time_frames = 0
+                return True
+        else:
+            self._on_time_frames = 0
+        return False
+
+    def reset_stats(self):
+        """重新开始统计（窗口重新显示时调用，隐藏期间不计入）"""
+        self.frames = 0
+        self.repaints = 0
+        self._cpu = 0.0
+        self._stats_wall = time.monotonic()
+        self._stats_process = time.process_time()
+
+    def stats(self):
+        elapsed = max(1e-6, time.monotonic() - self._stats_wall)
+        return {
+            "fps_target": self.fps,
+            "fps_max": self.max_fps,
+            "fps_achieved": round(self.frames / elapsed, 2),
+            "repaints": self.repaints,
+            "backoffs": self.backoffs,
+            "lateness_avg_ms": round(self._lateness_avg, 2),
+            # 渐变回调本身的 CPU 占用，与整个进程的 CPU 占用（均为单核百分比）
+            "cpu_percent": round(self._cpu / elapsed * 100, 3),
+            "process_cpu_percent": round((time.process_time() - self._stats_process) / elapsed * 100, 3),
+        }
@@ -16,7 +16,12 @@ if errorlevel 1 (
     echo.
 )
 
-pyinstaller --clean build_exe.spec
+rem build_exe.bat fast：打包启动优化版（目录模式）
+if /i "%~1"=="fast" (
+    pyinstaller --clean build_exe_fast.spec
+) else (
+    pyinstaller --clean build_exe.spec
+)
 
 if errorlevel 1 (
     echo 打包失败
@@ -25,7 +30,12 @@ if errorlevel 1 (
 )
 
 echo.
-echo 打包完成！可执行文件位置：dist\FullScreenPromptTool.exe
-echo 可将 exe 和 config.json 复制到任意目录使用
+if /i "%~1"=="fast" (
+    echo 打包完成！程序目录：dist\FullScreenPromptTool_fast\，其中的 FullScreenPromptTool.exe 即主程序
+    echo 可将整个目录复制到任意位置使用，config.json 放在 exe 同目录
+) else (
+    echo 打包完成！可执行文件位置：dist\FullScreenPromptTool.exe
+    echo 可将 exe 和 config.json 复制到任意目录使用
+)
 echo.
 pause
@@ -0,0 +1,91 @@
+# -*- mode: python ; coding: utf-8 -*-
+# PyInstaller 打包配置 - 启动优化版（目录模式，无控制台窗口）
+# 与 build_exe.spec 的区别：
+#   - 目录模式（onedir）：启动时不必先把整个程序解压到临时目录
+#   - 不用 UPX 压缩：压缩过的 DLL 每次启动都要先解压到内存
+#   - 排除用不到的标准库模块、NumPy（仅在未安装 Pillow 时用于缩放 PPM）与 Pillow 中用不到的格式插件
+#   - 去掉 Tcl/Tk 自带的时区数据、演示程序与示例图片
+
+block_cipher = None
+
+# 背景图支持 JPG/PNG/BMP/GIF/WebP/TIFF/PPM，其余格式插件与 Qt、色彩管理、图像运算等模块用不到
+_PIL_EXCLUDES = [
+    'PIL.ImageQt', 'PIL.ImageShow', 'PIL.ImageCms', 'PIL.ImageMath', 'PIL.ImageMorph', 'PIL.PSDraw',
+    'PIL._avif', 'PIL.AvifImagePlugin', 'PIL.BlpImagePlugin', 'PIL.BufrStubImagePlugin', 'PIL.CurImagePlugin',
+    'PIL.DcxImagePlugin', 'PIL.DdsImagePlugin', 'PIL.EpsImagePlugin', 'PIL.FitsImagePlugin',
+    'PIL.FliImagePlugin', 'PIL.FpxImagePlugin', 'PIL.FtexImagePlugin', 'PIL.GbrImagePlugin',
+    'PIL.GribStubImagePlugin', 'PIL.Hdf5StubImagePlugin', 'PIL.IcnsImagePlugin', 'PIL.IcoImagePlugin',
+    'PIL.ImImagePlugin', 'PIL.ImtImagePlugin', 'PIL.IptcImagePlugin', 'PIL.McIdasImagePlugin',
+    'PIL.MicImagePlugin', 'PIL.MpegImagePlugin', 'PIL.MspImagePlugin', 'PIL.PalmImagePlugin',
+    'PIL.PcdImagePlugin', 'PIL.PcxImagePlugin', 'PIL.PdfImagePlugin', 'PIL.PdfParser',
+    'PIL.PixarImagePlugin', 'PIL.PsdImagePlugin', 'PIL.QoiImagePlugin', 'PIL.SgiImagePlugin',
+    'PIL.SpiderImagePlugin', 'PIL.SunImagePlugin', 'PIL.TgaImagePlugin', 'PIL.WmfImagePlugin',
+    'PIL.XbmImagePlugin', 'PIL.XpmImagePlugin', 'PIL.XVThumbImagePlugin',
+]
+
+_STDLIB_EXCLUDES = [
+    'unittest', 'doctest', 'pdb', 'pydoc', 'pydoc_data', 'lib2to3', 'distutils', 'setuptools', 'pkg_resources',
+    'sqlite3', 'asyncio', 'multiprocessing', 'concurrent', 'xmlrpc', 'http.server', 'turtle', 'turtledemo',
+    'idlelib', 'tkinter.test', 'tkinter.tix',
+]
+
+a = Analysis(
+    ['main.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=['PIL', 'PIL._tkinter_finder', 'PIL.Image', 'PIL.ImageTk'],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['numpy', 'ppm_resample'] + _PIL_EXCLUDES + _STDLIB_EXCLUDES,
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+)
+
+# Tcl/Tk 数据目录（PyInstaller 6 为 _tcl_data / _tk_data，旧版本为 tcl / tk）中用不到的部分：
+# 程序不调用 Tcl 的 clock 命令，时区数据用不到；demos、images 只是演示程序与示例图片
+_TK_DATA_DIRS = ('tcl', 'tk', '_tcl_data', '_tk_data')
+_TK_DATA_SKIP = ('tzdata', 'demos', 'images')
+
+
+def _keep_data(dest):
+    parts = dest.replace('\\', '/').split('/')
+    return not (len(parts) > 2 and parts[0] in _TK_DATA_DIRS and parts[1] in _TK_DATA_SKIP)
+
+
+a.datas = [entry for entry in a.datas if _keep_data(entry[0])]
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='FullScreenPromptTool',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,   # 无控制台窗口
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=None,       # 可设置 icon='icon.ico'
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='FullScreenPromptTool_fast',
+)
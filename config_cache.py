@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+config.json 解析结果缓存（加快全屏提示的启动）
+- 解析后的字典用 marshal 写入同目录的 config.cache，并记下 config.json 的修改时间与大小；
+  下次启动两者都没变时直接读缓存，不必导入 json 模块、也不必解析
+- config.json 被配置界面或手动修改后修改时间会变，缓存随之失效，下次读取时重新生成
+- 缓存只是加速手段：读写失败（目录只读、文件损坏、Python 版本不同导致格式不兼容）时按无缓存处理
+"""
+
+import marshal
+import os
+
+CACHE_NAME = "config.cache"
+# 缓存格式版本，格式变化时递增使旧缓存失效
+_VERSION = 1
+
+
+def _cache_path(config_path):
+    return os.path.join(os.path.dirname(config_path), CACHE_NAME)
+
+
+def load(config_path, strict=False):
+    """
+    读取 config.json 中保存的配置（字典）；文件不存在时返回 None
+    解析失败时：strict=True 抛出异常，否则返回 None
+    """
+    try:
+        st = os.stat(config_path)
+    except OSError:
+        return None
+    key = (_VERSION, st.st_mtime_ns, st.st_size)
+    cache_path = _cache_path(config_path)
+    try:
+        with open(cache_path, "rb") as f:
+            cached_key, saved = marshal.load(f)
+        if cached_key == key and isinstance(saved, dict):
+            return saved
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    import json
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if not isinstance(saved, dict):
+            raise ValueError("config.json 顶层不是对象")
+    except Exception:
+        if strict:
+            raise
+        return None
+    _store(cache_path, key, saved)
+    return saved
+
+
+def _store(cache_path, key, saved):
+    """写入临时文件再替换，避免另一个进程读到写了一半的缓存"""
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            marshal.dump((key, saved), f)
+        os.replace(tmp, cache_path)
+    except (OSError, ValueError):
+        # ValueError：配置中含 marshal 不支持的类型（JSON 解析结果不会出现，防御性处理）
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
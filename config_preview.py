@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+配置界面中的全屏效果预览
+- 按主屏比例缩小的画布；文字位置、自动适配字号与背景摆放都用 overlay_layout，与全屏窗口一致
+  （字号先按实际屏幕尺寸适配，再乘以缩放比例）
+- 字段变化经 DEBOUNCE_MS 去抖后重绘，只更新实际变化的部分：改文字只改文字项，不碰背景
+- 背景图在工作线程中用 bg_pipeline 加载并缩成缩略图，按 (路径, 修改时间, 适配方式) 缓存；
+  加载进行中路径又变化时不并发加载，完成后只按最新路径补加载一次
+- 预览不做闪烁、预渲染图层与毛玻璃（毛玻璃需在全屏出现前截取桌面）
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import tkinter as tk
+
+import bg_pipeline
+import bg_slideshow
+import overlay_layout
+from monitors import detect_monitors
+from text_layout import FixedWidthClock, TextMeasurer
+from tick_scheduler import TickScheduler
+from ui_dispatch import UiDispatcher
+
+# 预览画布宽度（像素），高度按主屏比例
+PREVIEW_WIDTH = 320
+# 字段变化后等待多久再重绘（毫秒）
+DEBOUNCE_MS = 150
+# 缩略图缓存张数
+THUMB_CACHE_SIZE = 8
+
+_TEXT_KEYS = {"message_text", "message_font_size", "message_color", "font_auto_fit"}
+_TIME_KEYS = {"time_font_size", "time_color", "font_auto_fit"}
+_BG_KEYS = {"background_image_path", "background_fit_mode", "background_frosted", "bg_memory_budget_mb"}
+
+
+def _fit_mode(config):
+    mode = config.get("background_fit_mode", "contain")
+    return mode if mode in bg_pipeline.FIT_MODES else "contain"
+
+
+def _preview_source(config):
+    """预览用的背景图文件：文件夹取轮播的第一张；无图、毛玻璃或文件不存在时返回 None"""
+    if config.get("background_frosted"):
+        return None
+    path = (config.get("background_image_path") or "").strip()
+    if not path:
+        return None
+    path = os.path.normpath(path)
+    if os.path.isdir(path):
+        images = bg_slideshow.list_images(path)
+        return images[0] if images else None
+    return path if os.path.isfile(path) else None
+
+
+class OverlayPreview:
+    """缩小的全屏效果预览；get_config() 返回界面上当前填写的配置"""
+
+    def __init__(self, parent, get_config, width=PREVIEW_WIDTH):
+        self.root = parent.winfo_toplevel()
+        self.get_config = get_config
+        monitor = detect_monitors(self.root)[0]
+        self.screen_size = (monitor.width, monitor.height)
+        self.scale = width / monitor.width
+        self.size = (width, max(1, round(monitor.height * self.scale)))
+        self.canvas = tk.Canvas(parent, width=self.size[0], height=self.size[1], highlightthickness=1,
+                                highlightbackground="#ccc")
+
+        self._measurer = TextMeasurer(self.root)
+        self._ui = UiDispatcher(self.root)
+        self._config = {}
+        self._after_id = None
+        self._message_item = None
+        self._clock = None
+        self._time_text = overlay_layout.format_time()
+        self._note_item = self.canvas.create_text(
+            6, self.size[1] - 4, text="", anchor="sw", fill="#999", font=("", 8), tags=("note",)
+        )
+        self._bg_items = []
+        self._thumbs = OrderedDict()
+        self._bg_key = None
+        self._loading = False
+
+        # 时间每秒刷新，与全屏窗口共用调度器
+        self.scheduler = TickScheduler(self.root)
+        self.scheduler.add("clock", 1000, self._update_time)
+
+    # ------------------------------------------------------------------ 重绘
+
+    def schedule(self):
+        """字段变化时调用：去抖后按最新配置重绘"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(DEBOUNCE_MS, self.refresh)
+
+    def refresh(self):
+        """立即按当前配置重绘变化的部分"""
+        self._after_id = None
+        config = self.get_config()
+        old, self._config = self._config, config
+        changed = {k for k in set(old) | set(config) if old.get(k) != config.get(k)}
+        if not changed:
+            return
+        if "background_color" in changed:
+            try:
+                self.canvas.configure(bg=config.get("background_color") or "#1a1a1a")
+            except tk.TclError:
+                pass
+        if changed & _TEXT_KEYS:
+            self._draw_message()
+        if changed & _TIME_KEYS:
+            self._draw_clock()
+        if changed & _BG_KEYS:
+            self._draw_background()
+
+    def start(self):
+        self.refresh()
+        self.scheduler.start()
+
+    def _scaled(self, size):
+        return max(1, round(size * self.scale))
+
+    def _draw_message(self):
+        config = self._config
+        size = self._scaled(overlay_layout.message_font_size(self._measurer, config, self.screen_size))
+        x, y = overlay_layout.message_position(self.size)
+        options = dict(text=config["message_text"], font=overlay_layout.message_font(size),
+                       fill=config["message_color"])
+        try:
+            if self._message_item is None:
+                self._message_item = self.canvas.create_text(
+                    x, y, anchor="center", justify="center", tags=("text",), **options
+                )
+            else:
+                self.canvas.itemconfig(self._message_item, **options)
+        except tk.TclError:
+            # 颜色还没输完整（如 "#ff"）：保留上一次的样子
+            pass
+
+    def _draw_clock(self):
+        config = self._config
+        size = self._scaled(overlay_layout.time_font_size(self._measurer, config, self.screen_size, self._time_text))
+        font = overlay_layout.time_font(size)
+        try:
+            if self._clock is None:
+                self._clock = FixedWidthClock(
+                    self.canvas, self._measurer, font, config["time_color"],
+                    overlay_layout.time_position(self.size), tags=("text",),
+                )
+                self._clock.set_text(self._time_text)
+            else:
+                self._clock.set_font(font)
+                self._clock.set_fill(config["time_color"])
+        except tk.TclError:
+            pass
+
+    def _update_time(self, now):
+        self._time_text = overlay_layout.format_time(now)
+        if self._clock is not None:
+            self._clock.set_text(self._time_text)
+
+    # ------------------------------------------------------------------ 背景
+
+    def _draw_background(self):
+        config = self._config
+        path = _preview_source(config)
+        note = "毛玻璃：显示时截取桌面" if config.get("background_frosted") else ""
+        if path is None:
+            self._bg_key = None
+            self._place_thumb(None)
+            self._set_note(note)
+            return
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        budget = max(0, int(config.get("bg_memory_budget_mb", 256))) * 1024 * 1024
+        self._bg_key = (path, mtime, _fit_mode(config), budget)
+        thumb = self._thumbs.get(self._bg_key)
+        if thumb is not None:
+            self._thumbs.move_to_end(self._bg_key)
+            self._place_thumb(thumb)
+            self._set_note("")
+            return
+        self._load_thumb()
+
+    def _load_thumb(self):
+        if self._loading:
+            # 上一张还在加载：完成后按最新的 _bg_key 再加载
+            return
+        self._loading = True
+        self._set_note("背景图加载中…")
+        self._ui.begin()
+        threading.Thread(target=self._thumb_worker, args=(self._bg_key,), name="preview-bg", daemon=True).start()
+
+    def _thumb_worker(self, key):
+        """
+        工作线程：与全屏窗口相同的加载流水线
+        contain / cover / stretch 与屏幕尺寸成比例，直接按预览尺寸加载（JPEG 可按 1/8 解码）；
+        center / tile 的可见区域取决于实际屏幕尺寸，按屏幕尺寸加载后再缩小
+        """
+        path, _mtime, mode, budget = key
+        try:
+            target = self.size if mode in ("contain", "cover", "stretch") else self.screen_size
+            result = bg_pipeline.load_background(path, target, mode, memory_budget=budget)
+            if result.kind == "pil" and target != self.size:
+                img = result.payload
+                result.payload = img.resize(
+                    (self._scaled(img.size[0]), self._scaled(img.size[1])), bg_pipeline.resample_filter("BILINEAR")
+                )
+            self._ui.post(self._on_thumb_loaded, key, result, None)
+        except Exception as e:
+            self._ui.post(self._on_thumb_loaded, key, None, str(e))
+        finally:
+            self._ui.post(self._ui.end)
+
+    def _on_thumb_loaded(self, key, result, error):
+        self._loading = False
+        thumb = None
+        if result is not None:
+            try:
+                thumb = self._photo_from_result(result, key[2])
+            except Exception as e:
+                error = str(e)
+        if thumb is not None:
+            self._thumbs[key] = thumb
+            while len(self._thumbs) > THUMB_CACHE_SIZE:
+                self._thumbs.popitem(last=False)
+        if key != self._bg_key:
+            if self._bg_key is not None and self._bg_key not in self._thumbs:
+                self._load_thumb()
+            return
+        self._place_thumb(thumb)
+        self._set_note("背景图加载失败" if error else "")
+
+    def _photo_from_result(self, result, mode):
+        """Tk 线程：缩略图转换为 PhotoImage；未安装 Pillow 时按整数倍缩小"""
+        if result.kind == "pil":
+            from PIL import ImageTk
+            return ImageTk.PhotoImage(result.payload)
+        if result.kind == "ppm":
+            photo = tk.PhotoImage(master=self.root, data=result.payload, format="PPM")
+        else:
+            photo = tk.PhotoImage(master=self.root, file=result.payload)
+        if mode in ("center", "tile"):
+            sub = max(1, round(1 / self.scale))
+        elif result.kind == "ppm":
+            # NumPy 已缩放到预览尺寸
+            return photo
+        else:
+            shown_w, _shown_h = bg_pipeline.scaled_size(photo.width(), photo.height(), self.size[0], self.size[1], mode)
+            sub = max(1, round(photo.width() / shown_w))
+        return photo.subsample(sub, sub) if sub > 1 else photo
+
+    def _place_thumb(self, photo):
+        if photo is None:
+            self.canvas.delete("bg_image")
+            self._bg_items = []
+            return
+        tiled = _fit_mode(self._config) == "tile"
+        positions = overlay_layout.background_positions(self.size, (photo.width(), photo.height()), tiled)
+        if len(positions) == len(self._bg_items):
+            for item, (x, y, anchor) in zip(self._bg_items, positions):
+                self.canvas.itemconfig(item, image=photo, anchor=anchor)
+                self.canvas.coords(item, x, y)
+            return
+        self.canvas.delete("bg_image")
+        self._bg_items = [
+            self.canvas.create_image(x, y, image=photo, anchor=anchor, tags=("bg_image",))
+            for x, y, anchor in positions
+        ]
+        self.canvas.tag_lower("bg_image")
+
+    def _set_note(self, text):
+        self.canvas.itemconfig(self._note_item, text=text)
+        self.canvas.tag_raise("note")
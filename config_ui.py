@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 """
 全屏离开提示工具 - 配置界面
-可视化修改配置项并保存，一键运行主程序
+可视化修改配置项并保存，一键运行主程序；右侧预览随填写内容实时更新
+顶部可切换 / 新建 / 删除预设：切换后下方各项显示该预设的生效配置，保存时预设中只记下与基础配置不同的项
 """
 
 import os
@@ -9,7 +10,12 @@ import json
 import subprocess
 import sys
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, colorchooser
+from tkinter import ttk, messagebox, filedialog, colorchooser, simpledialog
+
+import bg_pipeline
+import overlay_daemon
+import presets
+from config_preview import OverlayPreview
 
 # 配置文件路径：打包成 exe 时使用 exe 所在目录
 _SCRIPT_DIR = os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(os.path.abspath(__file__))
@@ -21,22 +27,59 @@ DEFAULT_CONFIG = {
     "message_text": "请勿长时间离开座位",
     "background_color": "#1a1a1a",
     "background_image_path": "",
+    "slideshow_interval_s": 30,
+    "background_fit_mode": "contain",
+    "background_frosted": False,
+    "frosted_blur_radius": 24,
+    "frosted_dim": 0.35,
     "message_color": "#f9f9f9",
     "message_color_alt": "#d9d9d9",
     "time_color": "#ffd700",
     "message_font_size": 60,
     "time_font_size": 40,
+    "font_auto_fit": True,
+    "message_prerender": False,
+    "message_effect": "shadow",
+    "message_font_file": "",
     "message_blink_enabled": True,
     "blink_interval_ms": 1000,
+    "blink_style": "fade",
+    "blink_fade_fps": 24,
+    "bg_cache_enabled": True,
+    "bg_cache_max_mb": 512,
+    "bg_memory_budget_mb": 256,
+    "bg_animation_enabled": True,
+    "bg_animation_budget_mb": 128,
+    "bg_tile_size": 512,
+    "daemon_port": overlay_daemon.DEFAULT_PORT,
+    "config_hot_reload": True,
+    "multi_monitor": True,
+    "eco_mode": True,
+    "session_log_enabled": True,
+    "session_log_max_kb": 1024,
+    "presets": {},
+    "active_preset": "",
+    "preset_prewarm": True,
+}
+
+# 预设下拉框中代表基础配置（不使用预设）的选项
+_BASE_LABEL = "（基础配置）"
+
+
+# 下拉选择项：配置值 -> 界面显示文字
+_CHOICES = {
+    "background_fit_mode": dict(zip(bg_pipeline.FIT_MODES, ("完整显示", "铺满裁剪", "拉伸填充", "原尺寸居中", "平铺"))),
 }
 
 
 def load_config():
-    """从 config.json 加载配置"""
+    """从 config.json 加载配置，缺失项用默认值（旧版本保存的文件没有新增的配置项）"""
     if os.path.isfile(_CONFIG_PATH):
         try:
             with open(_CONFIG_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
+                saved = json.load(f)
+            if isinstance(saved, dict):
+                return {**DEFAULT_CONFIG, **saved}
         except Exception:
             pass
     return DEFAULT_CONFIG.copy()
@@ -54,16 +97,18 @@ class ConfigUI:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("全屏离开提示工具 - 配置")
-        self.root.minsize(480, 520)
-        self.root.geometry("540x580")
+        self.root.minsize(820, 520)
+        self.root.geometry("900x580")
         self.root.resizable(True, True)
         self.root.configure(bg="#f5f5f5")
 
         self.config = load_config()
+        # 正在编辑的预设（"" 为基础配置）
+        self._preset = presets.resolve(self.config)["active_preset"]
         self._build_ui()
 
     def _build_ui(self):
-        """构建界面：上-配置区（可滚动） | 下-操作栏（固定）"""
+        """构建界面：上-配置区（可滚动）与右侧预览 | 下-操作栏（固定）"""
         main = ttk.Frame(self.root, padding=24)
         main.pack(fill=tk.BOTH, expand=True)
 
@@ -73,9 +118,32 @@ class ConfigUI:
         ttk.Label(header, text="全屏离开提示工具", font=("Microsoft YaHei UI", 18, "bold")).pack(anchor="w")
         ttk.Label(header, text="配置", font=("Microsoft YaHei UI", 12), foreground="#888").pack(anchor="w")
 
-        # ========== 2. 配置区（可滚动，占据中间弹性空间） ==========
-        config_container = ttk.Frame(main)
-        config_container.pack(fill=tk.BOTH, expand=True)
+        # 预设切换：选中的预设即保存后使用的预设
+        preset_bar = ttk.Frame(main)
+        preset_bar.pack(fill=tk.X, pady=(0, 12))
+        ttk.Label(preset_bar, text="预设：").pack(side=tk.LEFT)
+        self._preset_var = tk.StringVar()
+        self._preset_box = ttk.Combobox(preset_bar, textvariable=self._preset_var, state="readonly", width=18)
+        self._preset_box.pack(side=tk.LEFT)
+        self._preset_box.bind("<<ComboboxSelected>>", self._on_preset_selected)
+        ttk.Button(preset_bar, text="新建预设…", command=self._new_preset).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(preset_bar, text="删除预设", command=self._delete_preset).pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Label(preset_bar, text="(预设只保存与基础配置不同的项)", font=("", 9), foreground="#999").pack(side=tk.LEFT, padx=(8, 0))
+        self._refresh_presets()
+
+        # ========== 2. 配置区（可滚动，占据中间弹性空间）与预览 ==========
+        body = ttk.Frame(main)
+        body.pack(fill=tk.BOTH, expand=True)
+
+        # 预览：与全屏窗口相同的排版与背景加载，按主屏比例缩小
+        preview_frame = ttk.Frame(body)
+        preview_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=(16, 0))
+        ttk.Label(preview_frame, text="预览", font=("Microsoft YaHei UI", 10), foreground="#666").pack(anchor="w", pady=(0, 6))
+        self._preview = OverlayPreview(preview_frame, self._collect_config)
+        self._preview.canvas.pack(anchor="n")
+
+        config_container = ttk.Frame(body)
+        config_container.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         canvas = tk.Canvas(config_container, highlightthickness=0, bg="#f5f5f5")
         scrollbar = ttk.Scrollbar(config_container)
@@ -89,19 +157,29 @@ class ConfigUI:
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        # 配置项网格布局
+        # 配置项网格布局（显示正在编辑的预设的生效配置）
         self.entries = {}
+        shown = presets.resolve(self.config, self._preset)
         fields = [
             ("message_text", "提示语内容", "str", "离开时显示的标语"),
             ("background_color", "背景色", "color", "无图时使用"),
-            ("background_image_path", "背景图路径", "path", "留空用纯色背景"),
+            ("background_image_path", "背景图路径", "path", "留空用纯色背景，选文件夹则轮播"),
+            ("slideshow_interval_s", "轮播间隔", "int", "秒，背景为文件夹时生效"),
+            ("background_fit_mode", "背景适配方式", "choice", None),
+            ("background_frosted", "毛玻璃背景", "bool", "截取当前桌面并模糊，需 Pillow"),
             ("message_color", "提示语主色", "color", None),
             ("message_color_alt", "提示语闪烁交替色", "color", None),
             ("time_color", "时间文字颜色", "color", None),
             ("message_font_size", "提示语字号", "int", "磅"),
             ("time_font_size", "时间字号", "int", "磅"),
+            ("font_auto_fit", "字号自动适配", "bool", "放不下时自动缩小"),
+            ("message_prerender", "提示语预渲染", "bool", "需 Pillow，带阴影"),
             ("message_blink_enabled", "开启闪烁", "bool", None),
             ("blink_interval_ms", "闪烁间隔", "int", "毫秒，1秒=1000"),
+            ("multi_monitor", "覆盖所有显示器", "bool", "每块屏幕各一个全屏窗口"),
+            ("eco_mode", "节能模式", "bool", "窗口不可见或显示器关闭时降低刷新"),
+            ("session_log_enabled", "记录离开时段", "bool", "写入 session_log.txt，供考勤统计"),
+            ("preset_prewarm", "预加载预设背景", "bool", "运行中切换预设时背景立即出现，多占内存"),
         ]
 
         for i, (key, label, ftype, hint) in enumerate(fields):
@@ -112,21 +190,22 @@ class ConfigUI:
             lbl.pack(side=tk.LEFT, padx=(0, 10))
 
             if ftype == "str":
-                var = tk.StringVar(value=self.config.get(key, ""))
+                var = tk.StringVar(value=shown.get(key, ""))
                 e = ttk.Entry(row, textvariable=var)
                 e.pack(side=tk.LEFT, fill=tk.X, expand=True)
                 self.entries[key] = ("str", var)
 
             elif ftype == "path":
-                var = tk.StringVar(value=self.config.get(key, ""))
+                var = tk.StringVar(value=shown.get(key, ""))
                 frm = ttk.Frame(row)
                 frm.pack(side=tk.LEFT, fill=tk.X, expand=True)
                 ttk.Entry(frm, textvariable=var).pack(side=tk.LEFT, fill=tk.X, expand=True)
                 ttk.Button(frm, text="浏览…", width=7, command=lambda k=key: self._browse_file(k)).pack(side=tk.LEFT, padx=(6, 0))
+                ttk.Button(frm, text="文件夹…", width=7, command=lambda k=key: self._browse_folder(k)).pack(side=tk.LEFT, padx=(6, 0))
                 self.entries[key] = ("str", var)
 
             elif ftype == "color":
-                var = tk.StringVar(value=self.config.get(key, "#000000"))
+                var = tk.StringVar(value=shown.get(key, "#000000"))
                 color_frm = ttk.Frame(row)
                 color_frm.pack(side=tk.LEFT)
                 ttk.Entry(color_frm, textvariable=var, width=10).pack(side=tk.LEFT)
@@ -139,18 +218,29 @@ class ConfigUI:
                 self.entries[key] = ("color", var)
 
             elif ftype == "int":
-                var = tk.StringVar(value=str(self.config.get(key, 0)))
+                var = tk.StringVar(value=str(shown.get(key, DEFAULT_CONFIG[key])))
                 ttk.Entry(row, textvariable=var, width=8).pack(side=tk.LEFT)
                 self.entries[key] = ("int", var)
 
             elif ftype == "bool":
-                var = tk.BooleanVar(value=self.config.get(key, True))
+                var = tk.BooleanVar(value=shown.get(key, DEFAULT_CONFIG[key]))
                 ttk.Checkbutton(row, variable=var, text="是").pack(side=tk.LEFT)
                 self.entries[key] = ("bool", var)
 
+            elif ftype == "choice":
+                labels = _CHOICES[key]
+                current = shown.get(key, DEFAULT_CONFIG[key])
+                var = tk.StringVar(value=labels.get(current, labels[DEFAULT_CONFIG[key]]))
+                ttk.Combobox(row, textvariable=var, values=list(labels.values()), state="readonly", width=12).pack(side=tk.LEFT)
+                self.entries[key] = ("choice", var)
+
             if hint:
                 ttk.Label(row, text=f"({hint})", font=("", 9), foreground="#999").pack(side=tk.LEFT, padx=(8, 0))
 
+        # 任一字段变化都刷新预览（去抖，连续输入只重绘一次）
+        for _ftype, var in self.entries.values():
+            var.trace_add("write", lambda *_: self._preview.schedule())
+
         # 滚轮滚动
         def _on_mousewheel(event):
             canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
@@ -186,6 +276,8 @@ class ConfigUI:
         ttk.Button(btn_frame, text="运行全屏提示", command=self._run_main).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(btn_frame, text="恢复默认", command=self._reset_default).pack(side=tk.LEFT)
 
+        self._preview.start()
+
     def _draw_color_swatch(self, canvas, hex_color):
         """在 canvas 上绘制颜色色块"""
         try:
@@ -220,9 +312,88 @@ class ConfigUI:
         if path:
             self.entries[key][1].set(path)
 
+    def _browse_folder(self, key):
+        """浏览选择轮播图片所在文件夹"""
+        path = filedialog.askdirectory(title="选择轮播图片文件夹")
+        if path:
+            self.entries[key][1].set(path)
+
+    def _refresh_presets(self):
+        self._preset_box["values"] = [_BASE_LABEL] + presets.names(self.config)
+        self._preset_var.set(self._preset or _BASE_LABEL)
+
+    def _on_preset_selected(self, event=None):
+        """切换正在编辑的预设：先记下当前填写的内容，再显示所选预设的生效配置"""
+        self._store_fields()
+        name = self._preset_var.get()
+        self._preset = "" if name == _BASE_LABEL else name
+        self._set_fields(presets.resolve(self.config, self._preset))
+
+    def _new_preset(self):
+        """以当前显示的配置为起点新建预设"""
+        name = simpledialog.askstring("新建预设", "预设名称（如 午餐、会议）：", parent=self.root)
+        name = (name or "").strip()
+        if not name:
+            return
+        if name == _BASE_LABEL or name in presets.names(self.config):
+            messagebox.showerror("新建预设", f"预设“{name}”已存在")
+            return
+        self._store_fields()
+        all_presets = dict(self.config.get("presets") or {})
+        all_presets[name] = presets.overrides(self.config, self._preset)
+        self.config["presets"] = all_presets
+        self._preset = name
+        self._refresh_presets()
+
+    def _delete_preset(self):
+        """删除正在编辑的预设（保存后生效）"""
+        if not self._preset:
+            messagebox.showinfo("删除预设", "基础配置不能删除，请先选择一个预设")
+            return
+        if not messagebox.askyesno("确认", f"确定要删除预设“{self._preset}”吗？"):
+            return
+        all_presets = dict(self.config.get("presets") or {})
+        all_presets.pop(self._preset, None)
+        self.config["presets"] = all_presets
+        self._preset = ""
+        self._refresh_presets()
+        self._set_fields(presets.resolve(self.config, ""))
+
+    def _store_fields(self):
+        """
+        把界面上填写的内容记入 self.config：编辑基础配置时直接写入顶层各项；
+        编辑预设时只把与基础配置不同的项记为该预设的覆盖项（进程级设置仍写入基础配置）
+        """
+        shown = self._collect_config()
+        if not self._preset:
+            for key in self.entries:
+                self.config[key] = shown[key]
+            return
+        for key in self.entries:
+            if key in presets.GLOBAL_KEYS:
+                self.config[key] = shown[key]
+        # 界面上没有的覆盖项（手动写入 config.json 的）原样保留
+        values = {key: value for key, value in presets.overrides(self.config, self._preset).items()
+                  if key not in self.entries}
+        values.update(presets.diff(self.config, shown, self.entries))
+        all_presets = dict(self.config.get("presets") or {})
+        all_presets[self._preset] = values
+        self.config["presets"] = all_presets
+
+    def _set_fields(self, config):
+        """按 config 填写界面上的各项（缺失项用默认值）"""
+        for key, (ftype, var) in self.entries.items():
+            value = config.get(key, DEFAULT_CONFIG[key])
+            if ftype == "int":
+                var.set(str(value))
+            elif ftype == "choice":
+                var.set(_CHOICES[key].get(value, _CHOICES[key][DEFAULT_CONFIG[key]]))
+            else:
+                var.set(value)
+
     def _collect_config(self):
-        """从界面收集配置"""
-        cfg = {}
+        """从界面收集正在编辑的预设的生效配置（界面未展示的配置项原样保留）"""
+        cfg = presets.resolve(self.config, self._preset)
         for key, (ftype, var) in self.entries.items():
             if ftype == "str":
                 cfg[key] = var.get().strip()
@@ -235,20 +406,34 @@ class ConfigUI:
                     cfg[key] = DEFAULT_CONFIG.get(key, 0)
             elif ftype == "bool":
                 cfg[key] = var.get()
+            elif ftype == "choice":
+                values = {label: value for value, label in _CHOICES[key].items()}
+                cfg[key] = values.get(var.get(), DEFAULT_CONFIG[key])
         return cfg
 
     def _save(self):
-        """保存配置到文件"""
-        self.config = self._collect_config()
+        """保存配置到文件（正在编辑的预设同时设为当前使用的预设）"""
+        self._store_fields()
+        self.config["active_preset"] = self._preset
         save_config(self.config)
         messagebox.showinfo("保存成功", "配置已保存到 config.json")
 
     def _run_main(self):
         """运行全屏提示主程序"""
         # 先保存当前配置
-        self.config = self._collect_config()
+        self._store_fields()
+        self.config["active_preset"] = self._preset
         save_config(self.config)
 
+        # 已有常驻进程（main.py --daemon）时，直接让其切换到该预设（同时重新加载配置）并显示，几毫秒即可出现
+        port = self.config.get("daemon_port", overlay_daemon.DEFAULT_PORT)
+        try:
+            overlay_daemon.send_command(f"preset {self._preset}", port)
+            overlay_daemon.send_command("show", port)
+            return
+        except (OSError, ValueError):
+            pass
+
         try:
             kwargs = {"cwd": _SCRIPT_DIR}
             if sys.platform == "win32" and hasattr(subprocess, "CREATE_NO_WINDOW"):
@@ -264,18 +449,23 @@ class ConfigUI:
             messagebox.showerror("启动失败", str(e))
 
     def _reset_default(self):
-        """恢复默认配置"""
-        if messagebox.askyesno("确认", "确定要恢复为默认配置吗？"):
-            self.config = DEFAULT_CONFIG.copy()
-            save_config(self.config)
-            for key, (ftype, var) in self.entries.items():
-                if ftype == "bool":
-                    var.set(self.config.get(key, True))
-                elif ftype == "int":
-                    var.set(str(self.config.get(key, 0)))
-                else:
-                    var.set(self.config.get(key, ""))
-            messagebox.showinfo("已恢复", "已恢复为默认配置")
+        """恢复默认配置：编辑预设时清空该预设的覆盖项（即与基础配置相同），否则基础配置恢复默认、保留各预设"""
+        if self._preset:
+            if not messagebox.askyesno("确认", f"确定要清空预设“{self._preset}”，恢复为与基础配置相同吗？"):
+                return
+            all_presets = dict(self.config.get("presets") or {})
+            all_presets[self._preset] = {}
+            self.config["presets"] = all_presets
+        else:
+            if not messagebox.askyesno("确认", "确定要恢复为默认配置吗？"):
+                return
+            config = DEFAULT_CONFIG.copy()
+            config["presets"] = self.config.get("presets") or {}
+            config["active_preset"] = self.config.get("active_preset", "")
+            self.config = config
+        save_config(self.config)
+        self._set_fields(presets.resolve(self.config, self._preset))
+        messagebox.showinfo("已恢复", "已恢复为基础配置" if self._preset else "已恢复为默认配置")
 
     def run(self):
         self.root.mainloop()
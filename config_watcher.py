@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+config.json 变化监听
+- Linux：inotify 监听所在目录（兼容原地写入与先写临时文件再替换两种保存方式），事件在独立线程中等待
+- 其他平台或 inotify 不可用：挂在统一调度器上按秒检查 mtime/大小，与时钟共用同一次唤醒
+- 连续多次写入只触发一次：最后一次变化后 debounce_ms 毫秒才回调
+"""
+
+import os
+import select
+import struct
+import sys
+import threading
+import tkinter as tk
+
+# mtime 轮询周期（毫秒）；节能状态下由应用改为 eco_mode.POLL_MS
+POLL_MS = 1000
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_CLOEXEC = 0o2000000
+_IN_NONBLOCK = 0o4000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class _Inotify:
+    """极简 inotify 封装：只监听一个目录，在线程中阻塞等待"""
+
+    def __init__(self, directory):
+        import ctypes
+        # CDLL(None)：直接取进程中已加载的 libc 符号，不用 find_library（会启动 ldconfig 子进程）
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = libc.inotify_init1(_IN_CLOEXEC | _IN_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_MODIFY
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, "inotify_add_watch 失败")
+        # 自管道：close() 时写入一个字节以唤醒等待中的线程
+        self._wake_r, self._wake_w = os.pipe()
+
+    def wait(self):
+        """阻塞直到有事件，返回本批事件涉及的文件名列表；已关闭时返回 None"""
+        readable, _, _ = select.select([self._fd, self._wake_r], [], [])
+        if self._wake_r in readable:
+            return None
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            names.append(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+
+    def close(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    def release(self):
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class ConfigWatcher:
+    """监听配置文件，变化稳定后在 Tk 线程调用 on_change()"""
+
+    def __init__(self, root, path, on_change, scheduler, dispatcher, debounce_ms=300):
+        self.root = root
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.scheduler = scheduler
+        self.dispatcher = dispatcher
+        self.debounce_ms = debounce_ms
+        self.mode = None
+        self._signature = _file_signature(self.path)
+        self._debounce_id = None
+        self._inotify = None
+
+    def start(self):
+        """优先 inotify，失败时退回 mtime 轮询"""
+        if sys.platform.startswith("linux") and self.dispatcher.threaded:
+            try:
+                self._inotify = _Inotify(os.path.dirname(self.path))
+            except (OSError, AttributeError):
+                self._inotify = None
+        if self._inotify is not None:
+            self.mode = "inotify"
+            threading.Thread(target=self._inotify_loop, name="config-watcher", daemon=True).start()
+        else:
+            self.mode = "poll"
+            self.scheduler.add("config_poll", POLL_MS, self._poll)
+
+    def stop(self):
+        if self._inotify is not None:
+            self._inotify.close()
+        if self.mode == "poll":
+            self.scheduler.set_enabled("config_poll", False)
+        if self._debounce_id is not None:
+            try:
+                self.root.after_cancel(self._debounce_id)
+            except tk.TclError:
+                pass
+            self._debounce_id = None
+
+    def _inotify_loop(self):
+        name = os.path.basename(self.path)
+        inotify = self._inotify
+        try:
+            while True:
+                names = inotify.wait()
+                if names is None:
+                    return
+                if name in names:
+                    self.dispatcher.post(self._schedule)
+        finally:
+            inotify.release()
+
+    def _poll(self, now):
+        if _file_signature(self.path) != self._signature:
+            self._schedule()
+
+    def _schedule(self):
+        """Tk 线程：重置去抖定时器"""
+        if self._debounce_id is not None:
+            self.root.after_cancel(self._debounce_id)
+        self._debounce_id = self.root.after(self.debounce_ms, self._fire)
+
+    def _fire(self):
+        self._debounce_id = None
+        signature = _file_signature(self.path)
+        if signature == self._signature:
+            return
+        self._signature = signature
+        self.on_change()
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+节能模式：没人看得见全屏窗口时降低刷新频率
+- 判断依据：窗口被取消映射（Unmap）或被完全遮挡（Visibility），以及 X11 显示器已关闭（DPMS 待机/挂起/关闭）
+  或屏保正在运行
+- 进入节能状态后由应用停掉闪烁与轮播、时钟与配置文件轮询改为每分钟一次（时钟只显示到分钟）；
+  窗口重新可见或有键盘/鼠标输入时立即恢复全速刷新
+- DPMS/屏保状态按分钟在后台线程查询（与分钟时钟对齐，不额外唤醒）：优先用 ctypes 调用
+  libXss / libXext，不可用时解析 xset q 的输出；ctypes / subprocess 在首次查询时才导入，不拖慢启动
+- 统计节能期间实际唤醒次数，与正常状态下测得的唤醒频率对比，得出少唤醒的次数（折算为每小时）
+"""
+
+import os
+import sys
+import threading
+import time
+
+# DPMS/屏保状态查询周期（毫秒）：与分钟时钟落在同一次唤醒中
+POLL_MS = 60 * 1000
+
+# 节能原因
+UNMAPPED = "unmapped"
+OBSCURED = "obscured"
+BLANKED = "blanked"
+
+
+_SCREEN_SAVER_ON = 1
+_DPMS_MODE_ON = 0
+
+
+class _X11Query:
+    """用 ctypes 直接查询 X 服务器（独立连接，只在查询线程中使用）"""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        class XScreenSaverInfo(ctypes.Structure):
+            _fields_ = [
+                ("window", ctypes.c_ulong),
+                ("state", ctypes.c_int),
+                ("kind", ctypes.c_int),
+                ("til_or_since", ctypes.c_ulong),
+                ("idle", ctypes.c_ulong),
+                ("event_mask", ctypes.c_ulong),
+            ]
+
+        self._info_type = XScreenSaverInfo
+        x11 = ctypes.CDLL(ctypes.util.find_library("X11") or "libX11.so.6")
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self._display = x11.XOpenDisplay(None)
+        if not self._display:
+            raise OSError("无法连接 X 服务器")
+        self._root = x11.XDefaultRootWindow(self._display)
+        self._dpms = None
+        self._xss = None
+        # 先确认服务器支持相应扩展：向不支持的扩展发请求会触发 Xlib 默认错误处理，直接结束进程
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        name = ctypes.util.find_library("Xext")
+        if name:
+            xext = ctypes.CDLL(name)
+            xext.DPMSQueryExtension.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+            xext.DPMSCapable.argtypes = [ctypes.c_void_p]
+            xext.DPMSInfo.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_ushort), ctypes.POINTER(ctypes.c_ubyte)]
+            if xext.DPMSQueryExtension(self._display, ctypes.byref(event_base), ctypes.byref(error_base)):
+                if xext.DPMSCapable(self._display):
+                    self._dpms = xext.DPMSInfo
+        name = ctypes.util.find_library("Xss")
+        if name:
+            xss = ctypes.CDLL(name)
+            xss.XScreenSaverQueryExtension.argtypes = [
+                ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
+            ]
+            xss.XScreenSaverQueryInfo.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)]
+            if xss.XScreenSaverQueryExtension(self._display, ctypes.byref(event_base), ctypes.byref(error_base)):
+                self._xss = xss.XScreenSaverQueryInfo
+        if self._dpms is None and self._xss is None:
+            raise OSError("缺少 libXext / libXss")
+
+    def blanked(self):
+        import ctypes
+        if self._dpms is not None:
+            level, state = ctypes.c_ushort(), ctypes.c_ubyte()
+            if self._dpms(self._display, ctypes.byref(level), ctypes.byref(state)):
+                # state：DPMS 是否开启；level：DPMSModeOn / Standby / Suspend / Off
+                if state.value and level.value != _DPMS_MODE_ON:
+                    return True
+        if self._xss is not None:
+            info = self._info_type()
+            if self._xss(self._display, self._root, ctypes.byref(info)) and info.state == _SCREEN_SAVER_ON:
+                return True
+        return False
+
+
+def _xset_blanked():
+    """解析 xset q：DPMS 已开启且显示器处于 Standby / Suspend / Off"""
+    import subprocess
+    output = subprocess.run(["xset", "q"], capture_output=True, text=True, timeout=2).stdout
+    for line in output.splitlines():
+        line = line.strip()
+        if line.startswith("Monitor is"):
+            return line.split()[-1] != "On"
+    return False
+
+
+class DisplayStateProbe:
+    """查询显示器是否已关闭/屏保中；非 X11 或查询失败时始终返回 False"""
+
+    def __init__(self):
+        self.method = None
+        self._query = None
+        self._tried = False
+
+    def blanked(self):
+        if not sys.platform.startswith("linux") or not os.environ.get("DISPLAY"):
+            return False
+        import subprocess
+        if not self._tried:
+            self._tried = True
+            try:
+                self._query = _X11Query()
+                self.method = "xlib"
+            except (OSError, AttributeError):
+                self.method = "xset"
+        try:
+            if self._query is not None:
+                return self._query.blanked()
+            return _xset_blanked()
+        except (OSError, subprocess.SubprocessError):
+            return False
+
+
+class EcoMode:
+    """
+    节能状态机：所有窗口都不可见（取消映射或被完全遮挡），或显示器已关闭时进入节能状态
+    on_change(eco) 在状态切换时于 Tk 线程中调用
+    """
+
+    def __init__(self, root, scheduler, dispatcher, on_change, clock=time.monotonic):
+        self.root = root
+        self.scheduler = scheduler
+        self.dispatcher = dispatcher
+        self.on_change = on_change
+        self.clock = clock
+        self.reasons = set()
+        self.enters = 0
+        self._windows = {}
+        self._blanked = False
+        self._probe = DisplayStateProbe()
+        self._polling = False
+        self._since = clock()
+        self._since_wakeups = scheduler.wakeups
+        self._started = self._since
+        # 正常 / 节能状态下的累计时长（秒）与唤醒次数
+        self._normal = [0.0, 0]
+        self._eco = [0.0, 0]
+
+    @property
+    def active(self):
+        return bool(self.reasons)
+
+    def start(self, windows):
+        """监听各全屏窗口的映射/遮挡状态与全局输入，并注册按分钟查询显示器状态的任务"""
+        self._windows = {str(window): set() for window in windows}
+        for window in windows:
+            window.bind("<Unmap>", lambda e: self._window_event(e, UNMAPPED, True), add="+")
+            window.bind("<Map>", lambda e: self._window_event(e, UNMAPPED, False), add="+")
+            window.bind("<Visibility>", self._on_visibility, add="+")
+        # 任何输入都说明有人在看：绑定到 all，不影响各窗口上已有的按键绑定
+        for sequence in ("<KeyPress>", "<ButtonPress>", "<Motion>"):
+            self.root.bind_all(sequence, self._on_input, add="+")
+        self.scheduler.add("eco_poll", POLL_MS, self._poll)
+
+    def _on_visibility(self, event):
+        self._window_event(event, OBSCURED, str(event.state) == "VisibilityFullyObscured")
+
+    def _window_event(self, event, reason, present):
+        # 画布等子控件的事件也会触发窗口上的绑定，统一归到所在的顶层窗口
+        states = self._windows.get(str(event.widget.winfo_toplevel()))
+        if states is None:
+            return
+        if present:
+            states.add(reason)
+        else:
+            states.discard(reason)
+        self._refresh()
+
+    def _on_input(self, event):
+        # 有输入说明显示器已唤醒、窗口在最前，不等下一次查询
+        if self._blanked or any(OBSCURED in states for states in self._windows.values()):
+            self._blanked = False
+            for states in self._windows.values():
+                states.discard(OBSCURED)
+            self._refresh()
+
+    def _poll(self, now):
+        """调度器回调：在后台线程查询 DPMS/屏保状态，结果投递回 Tk 线程"""
+        if self._polling or not self.dispatcher.threaded:
+            return
+        self._polling = True
+        self.dispatcher.begin()
+        threading.Thread(target=self._poll_worker, name="eco-poll", daemon=True).start()
+
+    def _poll_worker(self):
+        blanked = False
+        try:
+            blanked = self._probe.blanked()
+        finally:
+            self.dispatcher.post(self._on_polled, blanked)
+            self.dispatcher.post(self.dispatcher.end)
+
+    def _on_polled(self, blanked):
+        self._polling = False
+        if blanked != self._blanked:
+            self._blanked = blanked
+            self._refresh()
+
+    def _refresh(self):
+        reasons = set()
+        if self._windows and all(self._windows.values()):
+            for states in self._windows.values():
+                reasons |= states
+        if self._blanked:
+            reasons.add(BLANKED)
+        if bool(reasons) == self.active:
+            self.reasons = reasons
+            return
+        self._account()
+        self.reasons = reasons
+        if self.active:
+            self.enters += 1
+        self.on_change(self.active)
+
+    def _account(self):
+        """把上次切换以来的时长与唤醒次数计入当前状态（只统计调度器运行期间）"""
+        now = self.clock()
+        wakeups = self.scheduler.wakeups
+        if self.scheduler.running:
+            bucket = self._eco if self.active else self._normal
+            bucket[0] += now - self._since
+            bucket[1] += wakeups - self._since_wakeups
+        self._since = now
+        self._since_wakeups = wakeups
+
+    def stats(self):
+        normal_s, normal_wakeups = self._normal
+        eco_s, eco_wakeups = self._eco
+        if self.scheduler.running:
+            elapsed = self.clock() - self._since
+            delta = self.scheduler.wakeups - self._since_wakeups
+            if self.active:
+                eco_s, eco_wakeups = eco_s + elapsed, eco_wakeups + delta
+            else:
+                normal_s, normal_wakeups = normal_s + elapsed, normal_wakeups + delta
+        normal_rate = normal_wakeups / normal_s if normal_s > 0 else 0.0
+        avoided = max(0.0, eco_s * normal_rate - eco_wakeups)
+        hours = (self.clock() - self._started) / 3600.0
+        return {
+            "active": self.active,
+            "reasons": sorted(self.reasons),
+            "enters": self.enters,
+            "display_probe": self._probe.method,
+            "eco_seconds": round(eco_s, 1),
+            "normal_wakeups_per_s": round(normal_rate, 3),
+            "eco_wakeups": eco_wakeups,
+            "wakeups_avoided": int(avoided),
+            "wakeups_avoided_per_hour": round(avoided / hours, 1) if hours > 0 else 0.0,
+            # 调度器上各任务当前的周期（毫秒，停用为 None）；唤醒次数包含所有任务
+            "task_periods_ms": self.scheduler.periods(),
+        }
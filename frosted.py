@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+毛玻璃背景：全屏窗口出现前截取当前桌面，模糊、压暗后作为背景（需要 Pillow）
+- 截屏：Pillow ImageGrab（X11 / Windows / macOS）；多显示器时截取整个虚拟桌面，再按显示器分别处理
+- 先整数倍缩小（Image.reduce，盒式平均，可直接指定显示器区域，不另行裁剪复制）再模糊：
+  模糊半径随之缩小，像素数降到约 1/64
+- 模糊用 GaussianBlur（Pillow 内部为多次可分离的盒式模糊，C 实现）；压暗用查找表（point）
+- 双线性放大到屏幕尺寸的 1/TK_ZOOM，转换为 PhotoImage 后由 Tk 整数倍放大（copy -zoom，C 实现）：
+  模糊半径远大于 TK_ZOOM 像素，看不出块状，而 Pillow 放大与 PhotoImage 转换的像素数都降到 1/4
+- 各阶段耗时（毫秒）累计到 timing，供 status 与 --profile 查看
+"""
+
+import sys
+
+import bg_pipeline
+import startup_profile
+
+# 模糊前的缩小倍数
+DOWNSAMPLE = 8
+# 最后一步由 Tk 完成的放大倍数
+TK_ZOOM = 2
+
+
+def grab_desktop():
+    """截取整个桌面（Tk 线程中、全屏窗口出现前调用）；失败时抛出异常"""
+    from PIL import ImageGrab
+    if sys.platform == "win32":
+        return ImageGrab.grab(all_screens=True)
+    return ImageGrab.grab()
+
+
+def _dim_table(dim):
+    scale = 1.0 - min(1.0, max(0.0, float(dim)))
+    return [int(v * scale + 0.5) for v in range(256)] * 3
+
+
+def frost(shot, box, size, radius, dim, timing):
+    """把截图中 box 区域处理为毛玻璃图像，尺寸为 size 的 1/TK_ZOOM（向上取整）"""
+    from PIL import ImageFilter
+    factor = max(1, min(DOWNSAMPLE, (box[2] - box[0]) // 64, (box[3] - box[1]) // 64))
+
+    t0 = startup_profile.now()
+    small = shot.reduce(factor, box=box) if factor > 1 else shot.crop(box)
+    if small.mode != "RGB":
+        small = small.convert("RGB")
+    t1 = startup_profile.now()
+    startup_profile.span("frosted downsample", t0, t1, factor=factor)
+
+    if radius > 0:
+        small = small.filter(ImageFilter.GaussianBlur(radius / factor))
+    if dim > 0:
+        small = small.point(_dim_table(dim))
+    t2 = startup_profile.now()
+    startup_profile.span("frosted blur", t1, t2)
+
+    out_size = (-(-size[0] // TK_ZOOM), -(-size[1] // TK_ZOOM))
+    img = small.resize(out_size, bg_pipeline.resample_filter("BILINEAR"))
+    t3 = startup_profile.now()
+    startup_profile.span("frosted upscale", t2, t3)
+
+    for key, start, end in (("downsample_ms", t0, t1), ("blur_ms", t1, t2), ("upscale_ms", t2, t3)):
+        timing[key] = timing.get(key, 0.0) + (end - start) * 1000.0
+    return img
+
+
+def frost_monitors(shot, monitors, radius, dim):
+    """
+    按显示器处理截图，返回 ({Monitor: PIL 图像}, timing)
+    截图左上角对应所有显示器的最小坐标（Windows 虚拟桌面可能从负坐标开始）
+    """
+    left = min(m.x for m in monitors)
+    top = min(m.y for m in monitors)
+    shot_w, shot_h = shot.size
+    images = {}
+    timing = {}
+    for m in monitors:
+        box = (
+            max(0, m.x - left),
+            max(0, m.y - top),
+            min(shot_w, m.x - left + m.width),
+            min(shot_h, m.y - top + m.height),
+        )
+        if box[2] <= box[0] or box[3] <= box[1]:
+            continue
+        images[m] = frost(shot, box, (m.width, m.height), radius, dim, timing)
+    return images, timing
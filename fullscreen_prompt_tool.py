@@ -7,13 +7,40 @@
 
 import os
 import sys
-import json
+import time
+import atexit
+import contextlib
+import threading
+
+import startup_profile
+
+_t_import = startup_profile.now()
 import tkinter as tk
 from tkinter import font as tkfont
-from datetime import datetime
+startup_profile.span("import tkinter", _t_import)
+
+import bg_cache
+import bg_pipeline
+import bg_slideshow
+import bg_tiles
+import config_cache
+import eco_mode
+from blink_fade import FadeBlink
+import memory_probe
+import overlay_layout
+import presets
+import session_log
+from monitors import Monitor, detect_monitors
+from text_layout import FixedWidthClock, TextLayerCache, TextMeasurer, find_font_file
+from tick_scheduler import TickScheduler
+from config_watcher import POLL_MS as CONFIG_POLL_MS, ConfigWatcher
+from ui_dispatch import UiDispatcher
 
-# 配置文件路径：打包成 exe 时使用 exe 所在目录
-_SCRIPT_DIR = os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(os.path.abspath(__file__))
+# 配置文件路径：打包成 exe 时使用 exe 所在目录；环境变量 FSP_CONFIG_DIR 可改用其他目录
+# （基准测试与长时间运行测试用临时目录，不读用户的 config.json，缓存与日志也不写进项目目录）
+_SCRIPT_DIR = os.environ.get("FSP_CONFIG_DIR") or (
+    os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(os.path.abspath(__file__))
+)
 _CONFIG_PATH = os.path.join(_SCRIPT_DIR, "config.json")
 
 # =============================================================================
@@ -26,7 +53,12 @@ DEFAULT_CONFIG = {
 
     # ② 背景设置
     "background_color": "#1a1a1a",        # 背景色（无背景图时使用）
-    "background_image_path": "",          # 背景图路径，留空则使用背景色；推荐 gif/ppm/pgm，部分环境支持 png
+    "background_image_path": "",          # 背景图路径，留空则使用背景色；推荐 gif/ppm/pgm，部分环境支持 png；填文件夹则轮播其中图片
+    "slideshow_interval_s": 30,           # 文件夹轮播时每张图片的显示时长（秒）
+    "background_fit_mode": "contain",     # 背景图适配："contain"=完整显示，"cover"=铺满裁剪，"stretch"=拉伸，"center"=原尺寸居中，"tile"=平铺
+    "background_frosted": False,          # 毛玻璃：显示前截取当前桌面，模糊并压暗后作为背景（需要 Pillow，优先于背景图）
+    "frosted_blur_radius": 24,            # 毛玻璃模糊半径（屏幕像素）
+    "frosted_dim": 0.35,                  # 毛玻璃压暗比例，0=不压暗，1=全黑
 
     # ③ 文字颜色
     "message_color": "#f9f9f9",           # 提示语颜色
@@ -37,235 +69,1273 @@ DEFAULT_CONFIG = {
     "message_font_size": 60,              # 提示语字体大小
     "time_font_size": 40,                 # 时间字体大小
 
+    # ④-2 文字排版
+    "font_auto_fit": True,                # 文字放不下时自动缩小字号（上面的字号为上限）
+    "message_prerender": False,           # 用 Pillow 把提示语预渲染为抗锯齿图层（需要 Pillow，失败时退回普通文字）
+    "message_effect": "shadow",           # 预渲染效果："shadow"=阴影，"outline"=描边，"none"=无
+    "message_font_file": "",              # 预渲染使用的字体文件，留空自动查找微软雅黑
+
     # ⑤ 闪烁开关
     "message_blink_enabled": True,        # True=开启闪烁，False=关闭闪烁
-    "blink_interval_ms": 1000,            # 闪烁间隔（毫秒），1秒=1000
+    "blink_interval_ms": 1000,            # 闪烁间隔（毫秒），1秒=1000；渐变模式下为单程渐变时长
+    "blink_style": "fade",                # "fade"=柔和渐变（呼吸效果），"toggle"=两色直接交替
+    "blink_fade_fps": 24,                 # 渐变最高帧率；主循环繁忙时自动降低
+
+    # ⑥ 背景图缓存（缩放结果保存在 config.json 同目录的 bg_cache/，二次启动免解码）
+    "bg_cache_enabled": True,             # True=启用缓存
+    "bg_cache_max_mb": 512,               # 缓存目录大小上限（MB），超出按最近使用淘汰
+    "bg_memory_budget_mb": 256,           # 单次背景图加载的峰值内存预算（MB），超出则放弃加载，0=不限制
+    "bg_animation_enabled": True,         # GIF/APNG 动图背景是否播放动画（False=只显示第一帧）
+    "bg_animation_budget_mb": 128,        # 动图已解码帧缓存上限（MB），超出按最久未用淘汰
+    "bg_tile_size": 512,                  # 超过约 4K 的背景图分块转换、由中心向外逐块显示的图块边长（像素），0=不分块
+
+    # ⑦ 常驻模式（main.py --daemon）：本机端口，配置界面通过该端口秒开全屏
+    "daemon_port": 47863,
+
+    # ⑧ 热加载：config.json 保存后自动应用到正在显示的全屏窗口，无需重启
+    "config_hot_reload": True,
+
+    # ⑨ 多显示器：每块屏幕各开一个全屏窗口（False=只覆盖 Tk 报告的整块屏幕区域）
+    "multi_monitor": True,
+
+    # ⑩ 节能模式：窗口被遮挡/最小化、显示器关闭或屏保运行时停止闪烁，时间改为每分钟刷新（只显示到分钟）
+    "eco_mode": True,
+
+    # ⑪ 离开时段记录：每次显示/退出追加一行到 config.json 同目录的 session_log.txt，
+    #    用 python main.py --sessions 按天/周统计
+    "session_log_enabled": True,
+    "session_log_max_kb": 1024,           # 单个记录文件大小上限（KB），超出后轮转为 session_log.<时间>.txt
+
+    # ⑫ 预设：presets 为 {名称: 与上面不同的项}，如 {"午餐": {"message_text": "午休中", "background_image_path": "..."}}；
+    #    active_preset 为当前使用的预设（空=不用预设），也可用 --preset 名称 启动，常驻模式下 --send "preset 名称" 即时切换
+    "presets": {},
+    "active_preset": "",
+    "preset_prewarm": True,               # 预先准备各预设的背景图，运行中切换预设时直接替换，无需等待解码缩放
 }
 
 
-def _load_config():
-    """加载配置：优先从 config.json 读取，缺失项用默认值"""
+def _load_base_config(strict=False):
+    """
+    加载基础配置（未应用预设）：优先从 config.json 读取，缺失项用默认值
+    strict=True 时读取/解析失败直接抛出异常（热加载时用，避免写到一半的文件把配置重置为默认）
+    """
     config = DEFAULT_CONFIG.copy()
-    if os.path.isfile(_CONFIG_PATH):
-        try:
-            with open(_CONFIG_PATH, "r", encoding="utf-8") as f:
-                saved = json.load(f)
-            config.update(saved)
-        except Exception:
-            pass
+    # config.json 未修改时直接读 config.cache 中的解析结果
+    saved = config_cache.load(_CONFIG_PATH, strict)
+    if saved:
+        config.update(saved)
     return config
 
 
+def _load_config(strict=False, preset=None):
+    """加载生效配置：preset 为预设名（"" 为基础配置），None 时使用 config.json 中的 active_preset"""
+    return presets.resolve(_load_base_config(strict), preset)
+
+
 # 当前使用的配置（程序启动时加载）
-CONFIG = _load_config()
+with startup_profile.measure("_load_config"):
+    CONFIG = _load_config()
 
 
 # =============================================================================
 # 主程序
 # =============================================================================
 
+class _Screen:
+    """一块显示器上的全屏窗口：画布、提示语/时间文字项与背景图项"""
+
+    def __init__(self, window, monitor):
+        self.window = window
+        self.monitor = monitor
+        self.size = (monitor.width, monitor.height)
+        self.canvas = None
+        self.message_item = None
+        # 提示语当前字号（磅）与是否为预渲染图层
+        self.message_size = None
+        self.message_layer = False
+        self.clock = None
+        # 背景图画布项：平铺或分块显示时为多个，其余模式只有一个
+        self.bg_items = []
+        # 正在（或已经）分块显示的 TiledImage
+        self.bg_tiles = None
+
+
 class FullScreenPromptApp:
-    """全屏离开提示主窗口"""
+    """全屏离开提示主窗口（每块显示器一个窗口，主屏使用 root，其余为 Toplevel）"""
+
+    def __init__(self, measure_memory=False, resident=False, exit_after_paint=False, preset=None):
+        # 预设：preset 为 None 时跟随 config.json 中的 active_preset，否则本进程固定使用该预设（热加载时保持）
+        self._preset = preset
+        self._base_config = _load_base_config()
+        if preset is not None:
+            CONFIG.clear()
+            CONFIG.update(presets.resolve(self._base_config, preset))
+        # 各预设预先准备好的背景：{背景键: {(宽, 高): PhotoImage 或 TiledImage}}，无法预先准备的键对应 None
+        self._preset_photos = {}
+        self._prewarm_key = None
+        self._prewarm_ready = False
+        self._preset_switches = 0
+        self._preset_hits = 0
 
-    def __init__(self):
-        self.root = tk.Tk()
+        with startup_profile.measure("tk.Tk()"):
+            self.root = tk.Tk()
         self.root.title("离开提示")
         self.root.configure(bg=CONFIG["background_color"])
 
-        # 存储背景图引用，防止被垃圾回收
+        # 常驻模式：启动时隐藏，ESC 只隐藏不退出，由守护进程 show/hide
+        self.resident = resident
+        self.visible = not resident
+        if resident:
+            self.root.withdraw()
+
+        # 存储背景图引用，防止被垃圾回收；_scaled_bg_photos 为 {(宽, 高): PhotoImage}
         self._bg_photo = None
-        self._scaled_bg_photo = None
+        self._scaled_bg_photos = None
+        self._animation = None
+        # 最近一次毛玻璃背景的各阶段耗时（毫秒）
+        self._frosted_stats = None
+        self._slideshow = None
+        # 后台加载任务编号：新任务开始后，旧任务的结果直接丢弃
+        self._bg_job = 0
+        # 测量模式：记录每次背景图加载的 RSS 峰值到 bg_load_stats.txt
+        self._measure_memory = measure_memory
 
-        # 闪烁状态
+        # 工作线程结果统一投递回 Tk 线程处理
+        self._ui = UiDispatcher(self.root)
+
+        # 闪烁状态；渐变模式的颜色表在 _configure_blink 中按配置预先算好
         self._blink_state = True
+        self._fade = None
+        # 节能状态机在窗口建好后创建；在此之前 _configure_blink / 轮播已需要判断是否处于节能状态
+        self._eco = None
+
+        # 时间刷新与闪烁共用一个按整秒对齐的定时器
+        self.scheduler = TickScheduler(self.root)
+        if startup_profile.enabled():
+            self.scheduler.on_tick = startup_profile.tick
+        self._bg_painted = False
+        # 基准测试/启动测量用：首次绘制完成后自动退出
+        self._exit_after_paint = exit_after_paint
+        # 文字测量/适配结果缓存、预渲染图层缓存；内容未变时跳过 itemconfig
+        self._measurer = TextMeasurer(self.root)
+        self._text_layers = TextLayerCache()
+        self._message_font_file = None
+        self._message_color = CONFIG["message_color"]
+        self._time_text = None
 
-        self._setup_window()
-        self._create_ui()
+        with startup_profile.measure("_setup_window"):
+            self._setup_window()
+        with startup_profile.measure("_create_ui"):
+            self._create_ui()
         self._bind_events()
         self._start_updates()
 
+        # 节能模式：没人看得见窗口时降低唤醒频率，窗口重新可见或有输入时立即恢复
+        if CONFIG.get("eco_mode", True):
+            self._eco = eco_mode.EcoMode(self.root, self.scheduler, self._ui, self._on_eco_change)
+            self._eco.start([screen.window for screen in self.screens])
+
+        # 离开时段记录（基准测试/启动测量不记录）
+        self._session = None
+        if CONFIG.get("session_log_enabled", True) and not exit_after_paint:
+            max_bytes = max(1, int(CONFIG.get("session_log_max_kb", 1024))) * 1024
+            self._session = session_log.SessionLog(os.path.join(_SCRIPT_DIR, session_log.LOG_NAME), max_bytes)
+            if self.visible:
+                self._session.start()
+            # 未经 _quit / run 的退出（如其他线程调用 sys.exit）也记下时段结束；
+            # 进程被强制结束时什么都不会执行，由统计时按孤立的 start 处理
+            atexit.register(self._end_session, "crash")
+
+        # 配置文件变化时增量更新画布
+        self._config_watcher = None
+        if CONFIG.get("config_hot_reload", True):
+            self._config_watcher = ConfigWatcher(
+                self.root, _CONFIG_PATH, self._on_config_file_changed, self.scheduler, self._ui
+            )
+            self._config_watcher.start()
+
+        # 预设背景：启动后稍等再开始预先准备（基准测试/启动测量不准备）
+        if not exit_after_paint:
+            self.root.after(presets.PREWARM_DELAY_MS, self._start_prewarm)
+
     def _setup_window(self):
-        """设置窗口：全屏无框、置顶"""
-        # 获取屏幕尺寸（需先显示才能正确获取，此处用 winfo_screen 即可）
-        self.screen_width = self.root.winfo_screenwidth()
-        self.screen_height = self.root.winfo_screenheight()
-        # 去除窗口边框和标题栏
-        self.root.overrideredirect(True)
-        # 全屏：overrideredirect 与 -fullscreen 冲突，故用 geometry 实现
-        self.root.geometry(f"{self.screen_width}x{self.screen_height}+0+0")
-        # 窗口置顶
-        self.root.attributes("-topmost", True)
+        """设置窗口：每块显示器一个全屏无框、置顶的窗口"""
+        if CONFIG.get("multi_monitor", True):
+            with startup_profile.measure("detect_monitors"):
+                monitors = detect_monitors(self.root)
+        else:
+            # 获取屏幕尺寸（需先显示才能正确获取，此处用 winfo_screen 即可）
+            monitors = [Monitor(0, 0, self.root.winfo_screenwidth(), self.root.winfo_screenheight(), True)]
+        self.screen_width = monitors[0].width
+        self.screen_height = monitors[0].height
+
+        self.screens = []
+        for monitor in monitors:
+            if self.screens:
+                window = tk.Toplevel(self.root, bg=CONFIG["background_color"])
+                if self.resident:
+                    window.withdraw()
+            else:
+                window = self.root
+            # 去除窗口边框和标题栏
+            window.overrideredirect(True)
+            # 全屏：overrideredirect 与 -fullscreen 冲突，故用 geometry 实现
+            window.geometry(f"{monitor.width}x{monitor.height}+{monitor.x}+{monitor.y}")
+            # 窗口置顶
+            window.attributes("-topmost", True)
+            self.screens.append(_Screen(window, monitor))
+
+    def _target_sizes(self):
+        """各屏幕的分辨率（去重，主屏在前）：背景图每种分辨率只缩放一次"""
+        sizes = []
+        for screen in self.screens:
+            if screen.size not in sizes:
+                sizes.append(screen.size)
+        return sizes
 
     def _create_ui(self):
-        """创建界面：背景图/色、提示语、时间"""
-        # 使用 Canvas 作为主容器，便于叠加背景图与文字
-        self.canvas = tk.Canvas(
-            self.root,
-            width=self.screen_width,
-            height=self.screen_height,
-            highlightthickness=0,
-            bg=CONFIG["background_color"],
-        )
-        self.canvas.pack(fill=tk.BOTH, expand=True)
-
-        # 1. 先创建提示语和时间（需在背景图之前，以便正确设置层级）
-        msg_font = ("Microsoft YaHei UI", CONFIG["message_font_size"], "bold")
-        self.message_id = self.canvas.create_text(
-            self.screen_width // 2,
-            int(self.screen_height * 0.40),
-            text=CONFIG["message_text"],
-            font=msg_font,
-            fill=CONFIG["message_color"],
-            anchor="center",
-            justify="center",
-        )
-        time_font = ("Microsoft YaHei UI", CONFIG["time_font_size"], "normal")
-        self.time_id = self.canvas.create_text(
-            self.screen_width // 2,
-            int(self.screen_height * 0.60),
-            text=self._get_time_str(),
-            font=time_font,
-            fill=CONFIG["time_color"],
-            anchor="center",
+        """创建界面：背景图/色、提示语、时间（每块屏幕各一份）"""
+        self._time_text = self._get_time_str()
+        for screen in self.screens:
+            width, height = screen.size
+            # 使用 Canvas 作为主容器，便于叠加背景图与文字
+            screen.canvas = tk.Canvas(
+                screen.window,
+                width=width,
+                height=height,
+                highlightthickness=0,
+                bg=CONFIG["background_color"],
+            )
+            screen.canvas.pack(fill=tk.BOTH, expand=True)
+
+            # 1. 先创建提示语和时间（需在背景图之前，以便正确设置层级）
+            self._create_message_item(screen)
+            screen.clock = FixedWidthClock(
+                screen.canvas,
+                self._measurer,
+                overlay_layout.time_font(overlay_layout.time_font_size(self._measurer, CONFIG, screen.size, self._time_text)),
+                CONFIG["time_color"],
+                overlay_layout.time_position(screen.size),
+                tags=("text",),
+            )
+            screen.clock.set_text(self._time_text)
+
+        # 2. 绘制背景图（若有路径且能加载）：解码与缩放在工作线程进行，不阻塞界面
+        #    毛玻璃需在窗口出现前截屏（此时主循环尚未开始，窗口还未映射）；常驻模式在 show() 时截屏
+        if CONFIG.get("background_frosted") and not self.resident:
+            self._draw_frosted()
+        elif CONFIG["background_image_path"]:
+            self._draw_background_image()
+
+    def _message_layer_photo(self, size, color):
+        """预渲染的提示语图层；未开启、缺少 Pillow 或字体时返回 None"""
+        if not CONFIG.get("message_prerender", False):
+            return None
+        if self._message_font_file is None:
+            self._message_font_file = (
+                CONFIG.get("message_font_file") or find_font_file(overlay_layout.FONT_FAMILY, bold=True) or ""
+            )
+        if not self._message_font_file:
+            return None
+        # Tk 字号单位为磅，Pillow 为像素
+        px_size = max(1, round(size * self.root.winfo_fpixels("1p")))
+        try:
+            return self._text_layers.get(
+                CONFIG["message_text"], self._message_font_file, px_size, color,
+                CONFIG.get("message_effect", "shadow"),
+            )
+        except Exception:
+            return None
+
+    def _create_message_item(self, screen):
+        """（重新）创建提示语画布项：预渲染图层或 Tk 文本，字号按屏幕自动适配"""
+        if screen.message_item is not None:
+            screen.canvas.delete(screen.message_item)
+        x, y = overlay_layout.message_position(screen.size)
+        size = overlay_layout.message_font_size(self._measurer, CONFIG, screen.size)
+        screen.message_size = size
+        layer = self._message_layer_photo(size, self._message_color)
+        screen.message_layer = layer is not None
+        if layer is not None:
+            screen.message_item = screen.canvas.create_image(x, y, image=layer, anchor="center", tags=("text",))
+        else:
+            screen.message_item = screen.canvas.create_text(
+                x,
+                y,
+                text=CONFIG["message_text"],
+                font=overlay_layout.message_font(size),
+                fill=self._message_color,
+                anchor="center",
+                justify="center",
+                tags=("text",),
+            )
+
+    def _layout_clock(self, screen):
+        size = overlay_layout.time_font_size(self._measurer, CONFIG, screen.size, self._time_text)
+        screen.clock.set_font(overlay_layout.time_font(size))
+
+    @staticmethod
+    def _log_error(msg):
+        """写入 bg_load_error.txt 便于排查（打包为无控制台的 exe 时看不到 stderr）"""
+        try:
+            with open(os.path.join(_SCRIPT_DIR, "bg_load_error.txt"), "w", encoding="utf-8") as f:
+                f.write(msg)
+        except Exception:
+            pass
+
+    def _log_bg_error(self, msg):
+        """背景图加载失败时记录错误；启动测量模式下首次绘制前失败则直接退出"""
+        self._log_error(msg)
+        if self._exit_after_paint and not self._bg_painted:
+            self.root.after_idle(self._quit)
+
+    def _log_bg_stats(self, path, sampler):
+        """测量模式：追加一行背景图加载的 RSS 统计到 bg_load_stats.txt"""
+        def mb(value):
+            return "n/a" if value is None else f"{value / (1024 * 1024):.1f}MB"
+        line = (
+            f"{time.strftime('%Y-%m-%d %H:%M:%S')}\t"
+            f"baseline={mb(sampler.baseline)}\tpeak={mb(sampler.peak)}\tdelta={mb(sampler.delta)}\t{path}\n"
         )
+        try:
+            with open(os.path.join(_SCRIPT_DIR, "bg_load_stats.txt"), "a", encoding="utf-8") as f:
+                f.write(line)
+        except Exception:
+            pass
 
-        # 2. 绘制背景图（若有路径且能加载），延后绘制确保窗口已显示
-        if CONFIG["background_image_path"]:
-            self.root.after(100, self._draw_background_image)
+    @staticmethod
+    def _fit_mode(config=None):
+        mode = (CONFIG if config is None else config).get("background_fit_mode", "contain")
+        return mode if mode in bg_pipeline.FIT_MODES else "contain"
 
-        # 3. 确保文字在背景之上
-        self.canvas.tag_raise(self.message_id)
-        self.canvas.tag_raise(self.time_id)
+    def _get_bg_cache(self):
+        """获取背景图磁盘缓存；未启用时返回 None"""
+        if not CONFIG.get("bg_cache_enabled", True):
+            return None
+        max_bytes = int(CONFIG.get("bg_cache_max_mb", 512)) * 1024 * 1024
+        if max_bytes <= 0:
+            return None
+        return bg_cache.BackgroundCache(os.path.join(_SCRIPT_DIR, bg_cache.CACHE_DIR_NAME), max_bytes)
 
     def _draw_background_image(self):
-        """绘制背景图，自动适配全屏（保持比例，不变形）"""
+        """启动背景图加载：工作线程解码/缩放，先显示低分辨率预览，完成后替换为高质量图"""
         path = (CONFIG.get("background_image_path") or "").strip()
         if not path:
             return
         path = os.path.normpath(path)
+        if os.path.isdir(path):
+            self._start_slideshow(path)
+            return
         if not os.path.isfile(path):
-            try:
-                with open(os.path.join(_SCRIPT_DIR, "bg_load_error.txt"), "w", encoding="utf-8") as f:
-                    f.write(f"文件不存在: {path}")
-            except Exception:
-                pass
+            self._clear_background()
+            self._log_bg_error(f"文件不存在: {path}")
+            return
+
+        self._bg_job += 1
+        self._stop_animation()
+        self._stop_slideshow()
+        photos = self._preset_photos.get(self._preset_bg_key(CONFIG)) if self._preset_photos else None
+        if photos is not None:
+            # 预设的背景已预先准备好：只替换画布上的图像
+            self._preset_hits += 1
+            self._bg_photo = photos
+            self._show_background(photos)
+            return
+        job = self._bg_job
+        sizes = self._target_sizes()
+        cache = self._get_bg_cache()
+        self._ui.begin()
+        threading.Thread(
+            target=self._bg_worker,
+            args=(job, path, sizes, cache),
+            name="bg-loader",
+            daemon=True,
+        ).start()
+
+    def _draw_frosted(self):
+        """毛玻璃背景：在 Tk 线程中同步截屏（须在全屏窗口出现前），缩小/模糊/放大交给工作线程"""
+        self._bg_job += 1
+        self._stop_animation()
+        self._stop_slideshow()
+        job = self._bg_job
+        started = startup_profile.now()
+        try:
+            import frosted
+            with startup_profile.measure("frosted grab"):
+                shot = frosted.grab_desktop()
+        except Exception as e:
+            self._log_bg_error(f"截屏失败，无法使用毛玻璃背景: {e}")
+            if (CONFIG.get("background_image_path") or "").strip():
+                self._draw_background_image()
+            elif self._exit_after_paint:
+                self.root.after_idle(self._quit)
+            return
+        timing = {"grab_ms": (startup_profile.now() - started) * 1000.0}
+        self._ui.begin()
+        threading.Thread(
+            target=self._frosted_worker,
+            args=(job, shot, [screen.monitor for screen in self.screens], timing, started),
+            name="bg-frosted",
+            daemon=True,
+        ).start()
+
+    def _frosted_worker(self, job, shot, monitors, timing, started):
+        """工作线程：不得调用任何 Tk 接口"""
+        import frosted
+        try:
+            images, stages = frosted.frost_monitors(
+                shot, monitors, CONFIG.get("frosted_blur_radius", 24), CONFIG.get("frosted_dim", 0.35)
+            )
+        except Exception as e:
+            self._ui.post(self._log_bg_error, f"毛玻璃背景处理失败: {e}")
+        else:
+            timing.update(stages)
+            self._ui.post(self._on_frosted_loaded, job, images, timing, started)
+        finally:
+            self._ui.post(self._ui.end)
+
+    def _on_frosted_loaded(self, job, images, timing, started):
+        """Tk 线程：每块显示器的截图各不相同，按显示器（而非分辨率）对应 PhotoImage"""
+        if job != self._bg_job:
+            return
+        t_convert = startup_profile.now()
+        try:
+            from PIL import ImageTk
+            import frosted
+            photos = {
+                monitor: self._zoom_photo(ImageTk.PhotoImage(img), frosted.TK_ZOOM)
+                for monitor, img in images.items()
+            }
+        except Exception as e:
+            self._log_bg_error(f"毛玻璃背景转换失败: {e}")
+            return
+        startup_profile.span("frosted convert", t_convert)
+        timing["convert_ms"] = (startup_profile.now() - t_convert) * 1000.0
+        self._bg_photo = photos
+        self._show_background(photos, on_painted=lambda: self._on_frosted_painted(timing, started))
+
+    def _on_frosted_painted(self, timing, started):
+        """记录从截屏开始到背景画到屏幕上的总耗时"""
+        timing["total_ms"] = (startup_profile.now() - started) * 1000.0
+        startup_profile.span("frosted total", started)
+        self._frosted_stats = {key: round(value, 3) for key, value in timing.items()}
+
+    def _bg_worker(self, job, path, sizes, cache):
+        """工作线程：不得调用任何 Tk 接口，结果通过 self._ui 投递回主线程"""
+        budget = max(0, int(CONFIG.get("bg_memory_budget_mb", 256))) * 1024 * 1024
+        sampler = memory_probe.PeakRssSampler() if self._measure_memory else None
+        if CONFIG.get("bg_animation_enabled", True) and bg_pipeline.is_animated(path):
+            self._ui.post(self._on_bg_animated, job, path, sizes)
+            self._ui.post(self._ui.end)
+            return
+        try:
+            with sampler or contextlib.nullcontext():
+                results = bg_pipeline.load_backgrounds(
+                    path, sizes, self._fit_mode(), cache,
+                    on_preview=lambda img: self._ui.post(self._on_bg_preview, job, img),
+                    memory_budget=budget,
+                )
+        except bg_pipeline.BackgroundLoadError as e:
+            self._ui.post(self._log_bg_error, str(e))
+        except Exception as e:
+            self._ui.post(self._log_bg_error, f"背景图加载异常: {e}\n路径: {path}")
+        else:
+            self._ui.post(self._on_bg_loaded, job, results, cache)
+        finally:
+            if sampler is not None:
+                self._ui.post(self._log_bg_stats, path, sampler)
+            self._ui.post(self._ui.end)
+
+    def _on_bg_animated(self, job, path, sizes):
+        """Tk 线程：动图背景，交给 AnimatedBackground 按帧播放"""
+        if job != self._bg_job:
+            return
+        from bg_animation import AnimatedBackground
+        budget = max(1, int(CONFIG.get("bg_animation_budget_mb", 128))) * 1024 * 1024
+        self._animation = AnimatedBackground(
+            self.root, path, sizes, self._on_animation_frame,
+            on_error=self._log_bg_error, memory_budget=budget, fit_mode=self._fit_mode(),
+        )
+        self._animation.start()
+        if not self.visible or self._eco_active():
+            self._animation.pause()
+
+    def _on_animation_frame(self, photos):
+        self._show_background(photos)
+
+    def _stop_animation(self):
+        if self._animation is not None:
+            self._animation.stop()
+            self._animation = None
+
+    def _slideshow_period_ms(self):
+        return max(1, int(CONFIG.get("slideshow_interval_s", 30))) * 1000
+
+    def _start_slideshow(self, folder):
+        """文件夹轮播：先加载第一张，显示后再预取下一张"""
+        paths = bg_slideshow.list_images(folder)
+        if not paths:
+            self._clear_background()
+            self._log_bg_error(f"文件夹中没有图片: {folder}")
+            return
+        self._bg_job += 1
+        self._stop_animation()
+        self._stop_slideshow()
+        self._slideshow = bg_slideshow.Slideshow(folder, paths)
+        self._load_slide(0, show=True)
+        self.scheduler.add("slideshow", self._slideshow_period_ms(), self._advance_slide,
+                           enabled=self._slideshow_enabled())
+
+    def _stop_slideshow(self):
+        if self._slideshow is not None:
+            if self._slideshow.prefetched is not None:
+                self._cancel_tiles(self._slideshow.prefetched[1], keep=self._scaled_bg_photos)
+            self._slideshow = None
+            self.scheduler.set_enabled("slideshow", False)
+
+    def _slideshow_enabled(self):
+        """轮播定时任务是否应开启：至少两张图，且不在节能状态（节能时停在当前这张）"""
+        return self._slideshow is not None and len(self._slideshow.paths) > 1 and not self._eco_active()
+
+    def _load_slide(self, index, show):
+        """在工作线程中解码/缩放第 index 张；show=False 时只预取，不显示"""
+        slideshow = self._slideshow
+        slideshow.pending = index
+        self._ui.begin()
+        threading.Thread(
+            target=self._slide_worker,
+            args=(self._bg_job, index, slideshow.paths[index], self._target_sizes(), self._get_bg_cache(), show),
+            name="bg-slideshow",
+            daemon=True,
+        ).start()
+
+    def _slide_worker(self, job, index, path, sizes, cache, show):
+        """工作线程：不得调用任何 Tk 接口"""
+        budget = max(0, int(CONFIG.get("bg_memory_budget_mb", 256))) * 1024 * 1024
+        on_preview = (lambda img: self._ui.post(self._on_bg_preview, job, img)) if show else None
+        try:
+            results = bg_pipeline.load_backgrounds(
+                path, sizes, self._fit_mode(), cache, on_preview=on_preview, memory_budget=budget,
+            )
+        except bg_pipeline.BackgroundLoadError as e:
+            self._ui.post(self._on_slide_failed, job, index, str(e), show)
+        except Exception as e:
+            self._ui.post(self._on_slide_failed, job, index, f"背景图加载异常: {e}\n路径: {path}", show)
+        else:
+            self._ui.post(self._on_slide_loaded, job, index, results, cache, show)
+        finally:
+            self._ui.post(self._ui.end)
+
+    def _on_slide_loaded(self, job, index, results, cache, show):
+        """Tk 线程：首张直接显示，其余作为下一张保存，等到点再切换"""
+        slideshow = self._slideshow
+        if job != self._bg_job or slideshow is None:
+            return
+        slideshow.pending = None
+        photos = self._photos_from_results(results, cache)
+        if photos is None:
+            self._on_slide_failed(job, index, None, show)
+            return
+        if show:
+            slideshow.index = index
+            self._bg_photo = photos
+            self._show_background(photos)
+        else:
+            slideshow.prefetched = (index, photos)
+            if slideshow.switch_when_ready:
+                slideshow.switch_when_ready = False
+                slideshow.late_switches += 1
+                self._advance_slide(None)
+                return
+        self._prefetch_slide()
+
+    def _on_slide_failed(self, job, index, message, show):
+        """
+        Tk 线程：跳过无法加载的图片
+        按失败的这次加载决定后续：要显示的一张失败时立即加载下一张来显示（屏幕上可能还是上一份配置的背景或低清预览）；
+        预取失败时改为预取下一张，到点后已在等待的切换随之进行
+        """
+        slideshow = self._slideshow
+        if job != self._bg_job or slideshow is None:
             return
+        slideshow.pending = None
+        if message:
+            self._log_bg_error(message)
+        del slideshow.paths[index]
+        if not slideshow.paths:
+            self._clear_background()
+            return
+        if index < slideshow.index:
+            slideshow.index -= 1
+        if len(slideshow.paths) < 2:
+            self.scheduler.set_enabled("slideshow", False)
+        if show:
+            self._load_slide(index % len(slideshow.paths), show=True)
+        elif slideshow.switch_when_ready:
+            # 到点时正等着这一张：跳过它，直接切换到下一张（预取完成后立即切换）
+            self._advance_slide(None)
+        else:
+            self._prefetch_slide()
+
+    def _prefetch_slide(self):
+        """后台预取下一张（内存中始终最多当前 + 下一张）"""
+        slideshow = self._slideshow
+        if slideshow is None or slideshow.pending is not None or slideshow.prefetched is not None:
+            return
+        index = slideshow.next_index()
+        if index == 0:
+            slideshow.refresh()
+            self.scheduler.set_enabled("slideshow", self._slideshow_enabled())
+        if len(slideshow.paths) < 2:
+            return
+        self._load_slide(index, show=False)
+
+    def _advance_slide(self, now):
+        """调度器回调：切换到已预取好的下一张，只需一次 itemconfig"""
+        slideshow = self._slideshow
+        if slideshow is None:
+            return
+        if slideshow.prefetched is None:
+            # 下一张还没准备好：不等待，预取完成后立即切换
+            slideshow.switch_when_ready = True
+            self._prefetch_slide()
+            return
+        index, photos = slideshow.prefetched
+        slideshow.prefetched = None
+        slideshow.index = index
+        slideshow.switches += 1
+        self._place_background(photos)
+        self._prefetch_slide()
 
-        use_pil = False
-        img = None
+    def _on_bg_preview(self, job, img):
+        """Tk 线程：在主屏分辨率的屏幕上显示低分辨率预览（高质量结果到达前的占位）"""
+        if job != self._bg_job or self._scaled_bg_photos is not None:
+            return
         try:
-            from PIL import Image, ImageTk
-            # 用二进制流打开，避免中文路径/文件名编码问题（Windows 常见）
-            with open(path, "rb") as f:
-                img = Image.open(f).copy().convert("RGB")
-            use_pil = True
-        except ImportError:
+            from PIL import ImageTk
+            small = ImageTk.PhotoImage(img)
+            self._bg_photo = small
+            zoomed = self._zoom_photo(small, bg_pipeline.PREVIEW_FACTOR)
+            self._place_background({self._target_sizes()[0]: zoomed})
+        except Exception:
+            pass
+
+    def _zoom_photo(self, photo, factor):
+        """PhotoImage 整数倍放大（ImageTk.PhotoImage 没有 zoom 方法，借助 Tk 的 copy -zoom）"""
+        zoomed = tk.PhotoImage(master=self.root)
+        zoomed.tk.call(zoomed, "copy", photo, "-zoom", factor, factor)
+        return zoomed
+
+    def _on_bg_loaded(self, job, results, cache):
+        """Tk 线程：把工作线程的结果转换为 PhotoImage 并显示"""
+        if job != self._bg_job:
+            return
+        photos = self._photos_from_results(results, cache)
+        if photos is not None:
+            self._bg_photo = photos
+            self._show_background(photos)
+            # 当前预设的背景也放进预先准备的背景中，切走再切回时无需重新加载
+            key = self._preset_bg_key(CONFIG)
+            if key is not None and key in self._wanted_preset_configs():
+                self._preset_photos[key] = photos
+        self._prewarm_presets()
+
+    def _photos_from_results(self, results, cache, config=None):
+        """
+        Tk 线程：{分辨率: LoadedBackground} 转为 {分辨率: PhotoImage}；任一失败返回 None
+        config：按哪份配置的适配方式与分块大小转换，缺省为当前配置（预先准备其他预设的背景时传入该预设的配置）
+        """
+        photos = {}
+        sources = {}
+        for size, result in results.items():
+            photo = self._photo_from_result(result, cache, size, sources, config)
+            if photo is None:
+                # 其他分辨率已开始的分块转换不再需要：停止剩余图块，已转换的部分随 photos 一起释放
+                self._cancel_tiles(photos)
+                return None
+            photos[size] = photo
+        return photos
+
+    def _photo_from_result(self, result, cache, size, sources=None, config=None):
+        """
+        Tk 线程：把 load_background 的结果转换为 size 尺寸的 PhotoImage；失败时记录错误并返回 None
+        sources：可选，tk 回退路径下按文件路径复用已解码的原图
+        """
+        t_convert = startup_profile.now()
+        tiled = self._tiled_photo(result, config)
+        if tiled is not None:
+            startup_profile.span("PhotoImage convert", t_convert, kind=result.kind, tiled=True)
+            return tiled
+        if result.kind == "ppm":
+            try:
+                photo = tk.PhotoImage(data=result.payload, format="PPM")
+            except tk.TclError as e:
+                if cache is not None:
+                    cache.discard(result.cache_key)
+                self._log_bg_error(f"缓存读取失败: {e}")
+                return None
+        elif result.kind == "pil":
             try:
-                self._bg_photo = tk.PhotoImage(file=path)
+                from PIL import ImageTk
+                photo = ImageTk.PhotoImage(result.payload)
             except Exception as e:
+                self._log_bg_error(f"PIL缩放/转换失败: {e}")
+                return None
+        else:
+            # 使用 tk.PhotoImage（GIF，或未装 NumPy 时的 PPM/PGM），需 zoom/subsample；只能整数倍缩放，适配模式按近似处理
+            source = sources.get(result.payload) if sources is not None else None
+            if source is None:
                 try:
-                    with open(os.path.join(_SCRIPT_DIR, "bg_load_error.txt"), "w", encoding="utf-8") as f:
-                        f.write(f"PIL未安装，tk加载失败: {e}\n路径: {path}")
-                except Exception:
-                    pass
-                return
-        except Exception as e:
+                    with startup_profile.measure("decode", engine="tk"):
+                        source = tk.PhotoImage(file=result.payload)
+                except Exception as e:
+                    self._log_bg_error(f"PIL未安装，tk加载失败: {e}\n路径: {result.payload}")
+                    return None
+                if sources is not None:
+                    sources[result.payload] = source
+            img_w = source.width()
+            img_h = source.height()
+            scale_w = size[0] / img_w
+            scale_h = size[1] / img_h
+            mode = self._fit_mode(config)
+            if mode == "cover":
+                scale = max(scale_w, scale_h)
+            elif mode in ("center", "tile"):
+                scale = 1
+            else:
+                scale = min(scale_w, scale_h)
+            with startup_profile.measure("resize", engine="tk"):
+                if scale == 1:
+                    photo = source
+                elif scale < 1:
+                    sub = max(1, int(1 / scale))
+                    photo = source.subsample(sub, sub)
+                else:
+                    zoom = max(1, int(scale))
+                    photo = source.zoom(zoom, zoom)
+        startup_profile.span("PhotoImage convert", t_convert, kind=result.kind)
+        return photo
+
+    def _tiled_photo(self, result, config=None):
+        """超大背景图改为分块转换，返回已开始转换的 TiledImage；不适用时返回 None"""
+        config = CONFIG if config is None else config
+        tile_size = int(config.get("bg_tile_size", bg_tiles.DEFAULT_TILE_SIZE))
+        if tile_size <= 0 or self._fit_mode(config) == "tile" or result.kind not in ("pil", "ppm"):
+            return None
+        if result.kind == "pil":
+            img = result.payload
+        else:
+            header = bg_cache.parse_ppm_header(result.payload)
+            if header is None or header[0] * header[1] < bg_tiles.TILED_MIN_PIXELS:
+                return None
             try:
-                with open(os.path.join(_SCRIPT_DIR, "bg_load_error.txt"), "w", encoding="utf-8") as f:
-                    f.write(f"PIL加载失败: {e}\n路径: {path}")
-            except Exception:
-                pass
+                from PIL import Image
+            except ImportError:
+                return None
+            width, height, offset = header
+            # 直接引用缓存数据，不复制
+            img = Image.frombuffer("RGB", (width, height), memoryview(result.payload)[offset:], "raw", "RGB", 0, 1)
+        if img.size[0] * img.size[1] < bg_tiles.TILED_MIN_PIXELS:
+            return None
+        tiled = bg_tiles.TiledImage(self.root, img, tile_size)
+        tiled.start()
+        return tiled
+
+    @staticmethod
+    def _cancel_tiles(photos, keep=None):
+        """停止 photos 中不再使用的分块背景的转换"""
+        if not photos:
             return
+        kept = list(keep.values()) if keep else []
+        for photo in photos.values():
+            if isinstance(photo, bg_tiles.TiledImage) and all(photo is not k for k in kept):
+                photo.cancel()
 
-        if use_pil and img is not None:
-            try:
-                img_w, img_h = img.size
-                if img_w <= 0 or img_h <= 0:
-                    return
+    def _after_tiles(self, photos, callback):
+        """所有分块背景转换完成后（在空闲回调中）调用 callback"""
+        pending = [photo for photo in set(photos.values())
+                   if isinstance(photo, bg_tiles.TiledImage) and not photo.complete]
+        remaining = len(pending)
 
-                # 计算缩放尺寸：适配全屏，保持比例（contain 模式）
-                scale_w = self.screen_width / img_w
-                scale_h = self.screen_height / img_h
-                scale = min(scale_w, scale_h)
-                new_w = max(1, int(img_w * scale))
-                new_h = max(1, int(img_h * scale))
-
-                # 使用 PIL 缩放（支持任意比例，质量更好）
-                resample = Image.Resampling.LANCZOS if hasattr(Image, "Resampling") else Image.LANCZOS
-                img_scaled = img.resize((new_w, new_h), resample)
-                self._bg_photo = ImageTk.PhotoImage(img_scaled)
-                self._scaled_bg_photo = self._bg_photo
-            except Exception as e:
-                try:
-                    with open(os.path.join(_SCRIPT_DIR, "bg_load_error.txt"), "w", encoding="utf-8") as f:
-                        f.write(f"PIL缩放/转换失败: {e}\n路径: {path}")
-                except Exception:
-                    pass
+        def done():
+            nonlocal remaining
+            remaining -= 1
+            if remaining == 0:
+                self.root.after_idle(callback)
+
+        if not pending:
+            self.root.after_idle(callback)
+        for tiled in pending:
+            tiled.subscribe(lambda x, y, photo: None, done, lambda error: done())
+
+    def _show_background(self, photos, on_painted=None):
+        """显示背景图；首次绘制时打点（基准测试模式下随后退出）；on_painted 在画到屏幕上之后调用"""
+        self._place_background(photos)
+        if on_painted is not None:
+            # 空闲回调排在画布重绘之后
+            self.root.after_idle(on_painted)
+        if not self._bg_painted:
+            # 空闲回调排在画布重绘之后，此时背景已画到屏幕上
+            self._bg_painted = True
+            self.root.after_idle(startup_profile.mark, "first_background_paint")
+            if self._exit_after_paint:
+                # 分块显示时等全部图块到齐再退出，便于与整幅转换对比
+                self._after_tiles(photos, self._quit)
+
+    def _place_background(self, photos):
+        """
+        将已缩放的背景图放到各屏幕画布最底层（居中；平铺模式下同一个图块重复摆满屏幕）
+        photos 为 {(宽, 高): PhotoImage 或 TiledImage}，同分辨率的屏幕共用同一个对象；
+        毛玻璃背景按显示器各不相同，键为 Monitor
+        已有数量相同的背景项时只替换图像与位置，不重建画布项
+        """
+        if not self._is_preset_photos(self._scaled_bg_photos):
+            self._cancel_tiles(self._scaled_bg_photos, keep=photos)
+        self._scaled_bg_photos = photos
+        tiled = self._fit_mode() == "tile"
+        for screen in self.screens:
+            photo = photos.get(screen.monitor)
+            if photo is None:
+                photo = photos.get(screen.size)
+            if photo is None:
+                continue
+            if isinstance(photo, bg_tiles.TiledImage):
+                self._place_tiles(screen, photo)
+                continue
+            if screen.bg_tiles is not None:
+                # 由分块背景换回单张图像：重建背景项
+                screen.bg_tiles = None
+                screen.bg_items = []
+            positions = overlay_layout.background_positions(screen.size, (photo.width(), photo.height()), tiled)
+
+            if len(positions) == len(screen.bg_items):
+                for item, (x, y, anchor) in zip(screen.bg_items, positions):
+                    screen.canvas.itemconfig(item, image=photo, anchor=anchor)
+                    screen.canvas.coords(item, x, y)
+                continue
+
+            screen.canvas.delete("bg_image")
+            screen.bg_items = [
+                screen.canvas.create_image(x, y, image=photo, anchor=anchor, tags=("bg_image",))
+                for x, y, anchor in positions
+            ]
+            screen.canvas.tag_lower("bg_image")
+            screen.canvas.tag_raise("text")
+
+    def _place_tiles(self, screen, tiled):
+        """分块背景：转换好一块摆放一块（中心先出现），叠在旧背景之上；图块到齐后删除旧背景项"""
+        if screen.bg_tiles is tiled:
+            return
+        screen.bg_tiles = tiled
+        stale = screen.canvas.find_withtag("bg_image")
+        screen.bg_items = []
+        left = (screen.size[0] - tiled.width) // 2
+        top = (screen.size[1] - tiled.height) // 2
+
+        def add(x, y, photo):
+            if screen.bg_tiles is not tiled:
                 return
-        else:
-            # 使用 tk.PhotoImage（仅 GIF 等），需 zoom/subsample
-            img_w = self._bg_photo.width()
-            img_h = self._bg_photo.height()
-            scale_w = self.screen_width / img_w
-            scale_h = self.screen_height / img_h
-            scale = min(scale_w, scale_h)
-            if scale < 1:
-                sub = max(1, int(1 / scale))
-                self._scaled_bg_photo = self._bg_photo.subsample(sub, sub)
-            else:
-                zoom = max(1, int(scale))
-                self._scaled_bg_photo = self._bg_photo.zoom(zoom, zoom)
-
-        x = self.screen_width // 2
-        y = self.screen_height // 2
-
-        self.canvas.create_image(x, y, image=self._scaled_bg_photo, anchor="center", tags=("bg_image",))
-        self.canvas.tag_lower("bg_image")
-        self.canvas.tag_raise(self.message_id)
-        self.canvas.tag_raise(self.time_id)
-
-    def _get_time_str(self):
-        """获取当前时间字符串：2025-01-01 星期一 12:00:00"""
-        weekdays = ("星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日")
-        now = datetime.now()
-        wd = weekdays[now.weekday()]
-        return now.strftime(f"%Y-%m-%d {wd} %H:%M:%S")
-
-    def _update_time(self):
-        """每秒刷新时间"""
-        self.canvas.itemconfig(self.time_id, text=self._get_time_str())
-        self.root.after(1000, self._update_time)
-
-    def _toggle_blink(self):
-        """提示语柔和闪烁（交替颜色）"""
-        if not CONFIG["message_blink_enabled"]:
-            self.root.after(CONFIG["blink_interval_ms"], self._toggle_blink)
+            item = screen.canvas.create_image(left + x, top + y, image=photo, anchor="nw", tags=("bg_image",))
+            screen.canvas.tag_lower(item, "text")
+            screen.bg_items.append(item)
+
+        def done():
+            if screen.bg_tiles is tiled:
+                screen.canvas.delete(*stale)
+
+        def failed(error):
+            # 删除已摆放的图块（图块本身已由 TiledImage 释放），保留旧背景
+            if screen.bg_tiles is not tiled:
+                return
+            screen.canvas.delete(*screen.bg_items)
+            screen.bg_tiles = None
+            screen.bg_items = list(stale)
+            self._log_bg_error(f"分块转换失败: {error}")
+
+        tiled.subscribe(add, done, failed)
+
+    def _eco_active(self):
+        return self._eco is not None and self._eco.active
+
+    def _get_time_str(self, now=None):
+        """获取当前时间字符串：2025-01-01 星期一 12:00:00（节能状态下只到分钟）"""
+        return overlay_layout.format_time(now, seconds=not self._eco_active())
+
+    def _update_time(self, now):
+        """刷新时间（由调度器在整秒/整分边界调用）：定宽布局下只更新变化的字符"""
+        text = self._get_time_str(now)
+        if text == self._time_text:
             return
+        self._time_text = text
+        for screen in self.screens:
+            screen.clock.set_text(text)
 
+    def _toggle_blink(self, now):
+        """提示语两色交替闪烁（toggle 模式）；关闭闪烁时该任务被停用，不产生唤醒"""
         self._blink_state = not self._blink_state
         color = CONFIG["message_color"] if self._blink_state else CONFIG["message_color_alt"]
-        self.canvas.itemconfig(self.message_id, fill=color)
-        self.root.after(CONFIG["blink_interval_ms"], self._toggle_blink)
+        self._set_message_color(color)
+
+    def _fade_blink(self, now):
+        """渐变闪烁一帧：查表取色；帧率因主循环繁忙而调整时重设定时周期"""
+        if self._fade.tick(now, self.scheduler.lateness("blink"), self._set_message_color):
+            self.scheduler.set_period("blink", self._fade.period_ms)
+
+    def _set_message_color(self, color):
+        """改变提示语颜色（颜色未变时不调用 itemconfig）；预渲染模式下切换为该颜色的缓存图层"""
+        if color == self._message_color:
+            return
+        self._message_color = color
+        for screen in self.screens:
+            if screen.message_layer:
+                layer = self._message_layer_photo(screen.message_size, color)
+                if layer is not None:
+                    screen.canvas.itemconfig(screen.message_item, image=layer)
+            else:
+                screen.canvas.itemconfig(screen.message_item, fill=color)
+
+    def _configure_blink(self):
+        """按配置（重新）注册闪烁任务；渐变模式在此一次性生成颜色表（节能状态下保持停用）"""
+        enabled = bool(CONFIG["message_blink_enabled"]) and not self._eco_active()
+        self._blink_state = True
+        self._fade = None
+        if CONFIG.get("blink_style", "fade") == "fade":
+            try:
+                self._fade = FadeBlink(
+                    CONFIG["message_color"], CONFIG["message_color_alt"],
+                    CONFIG["blink_interval_ms"], CONFIG.get("blink_fade_fps", 24),
+                    resolve=self._color_rgb,
+                )
+            except (tk.TclError, ValueError) as e:
+                # 颜色无法解析时退回两色交替，不因配置问题导致启动或热加载失败
+                self._log_error(
+                    f"渐变闪烁颜色无法解析，改用两色交替: {e}\n"
+                    f"message_color={CONFIG['message_color']!r} message_color_alt={CONFIG['message_color_alt']!r}"
+                )
+        if self._fade is not None:
+            self.scheduler.add("blink", self._fade.period_ms, self._fade_blink, enabled=enabled)
+        else:
+            self.scheduler.add("blink", CONFIG["blink_interval_ms"], self._toggle_blink, enabled=enabled)
+
+    def _color_rgb(self, color):
+        """Tk 颜色（颜色名、#rgb、#rrggbb、#rrrrggggbbbb 等）转为 0~255 的 (r, g, b)"""
+        return tuple(value >> 8 for value in self.root.winfo_rgb(color))
+
+    def _on_eco_change(self, eco):
+        """
+        进入节能状态：停掉闪烁、动画与轮播，时间与配置文件轮询（无 inotify 时）改为整分；离开时立即恢复全速刷新
+        提示语停在主色，避免停在渐变中途的颜色上
+        """
+        self.scheduler.set_enabled("slideshow", self._slideshow_enabled())
+        if eco:
+            self.scheduler.set_enabled("blink", False)
+            self.scheduler.set_period("clock", 60 * 1000)
+            self.scheduler.set_period("config_poll", eco_mode.POLL_MS)
+            self._blink_state = True
+            self._set_message_color(CONFIG["message_color"])
+            if self._animation is not None:
+                self._animation.pause()
+        else:
+            self.scheduler.set_period("clock", 1000)
+            self.scheduler.set_period("config_poll", CONFIG_POLL_MS)
+            self.scheduler.set_enabled("blink", bool(CONFIG["message_blink_enabled"]))
+            if self._fade is not None:
+                self._fade.reset_stats()
+            if self._animation is not None and self.visible:
+                self._animation.resume()
+        self._update_time(self.scheduler.clock())
 
     def _start_updates(self):
-        """启动定时更新：时间刷新、闪烁"""
-        self.root.after(1000, self._update_time)
-        if CONFIG["message_blink_enabled"]:
-            self.root.after(CONFIG["blink_interval_ms"], self._toggle_blink)
+        """启动定时更新：时间刷新、闪烁（窗口隐藏时不启动，不产生唤醒）"""
+        self.scheduler.add("clock", 1000, self._update_time)
+        self._configure_blink()
+        if self.visible:
+            self.scheduler.start()
 
     def _bind_events(self):
-        """绑定键盘事件：ESC 退出"""
-        self.root.bind("<Escape>", lambda e: self._quit())
-        self.root.bind("<KeyPress-Escape>", lambda e: self._quit())
+        """绑定键盘事件：任一屏幕上按 ESC 退出（常驻模式下为隐藏），所有屏幕一起关闭"""
+        for screen in self.screens:
+            screen.window.bind("<Escape>", lambda e: self._on_escape())
+            screen.window.bind("<KeyPress-Escape>", lambda e: self._on_escape())
+            # 无边框窗口不会自动获得焦点：点击哪块屏幕，ESC 就发给哪块屏幕
+            screen.window.bind("<Button-1>", lambda e, w=screen.window: w.focus_force())
+
+    def _on_escape(self):
+        if self.resident:
+            self.hide("escape")
+        else:
+            self._quit("escape")
+
+    def _end_session(self, reason):
+        if self._session is not None:
+            self._session.end(reason)
 
-    def _quit(self):
+    def show(self):
+        """显示全屏窗口：窗口与背景已预先建好，只需 deiconify（毛玻璃背景在此之前截屏）"""
+        if CONFIG.get("background_frosted") and not self.visible:
+            self._draw_frosted()
+        self._update_time(self.scheduler.clock())
+        for screen in self.screens:
+            screen.window.deiconify()
+            screen.window.attributes("-topmost", True)
+            screen.window.lift()
+        self.root.focus_force()
+        if self._fade is not None:
+            self._fade.reset_stats()
+        self.scheduler.start()
+        if self._animation is not None:
+            self._animation.resume()
+        self.visible = True
+        if self._session is not None:
+            self._session.start()
+
+    def hide(self, reason="hide"):
+        """隐藏全屏窗口，同时停掉定时刷新"""
+        self._end_session(reason)
+        self.scheduler.stop()
+        if self._animation is not None:
+            self._animation.pause()
+        for screen in self.screens:
+            screen.window.withdraw()
+        self.visible = False
+
+    def reload_config(self):
+        """重新读取 config.json 并应用到当前窗口"""
+        self._base_config = _load_base_config()
+        self.apply_config(presets.resolve(self._base_config, self._preset))
+
+    def _on_config_file_changed(self):
+        """config.json 变化（已去抖）：解析失败时保留当前配置"""
+        try:
+            base = _load_base_config(strict=True)
+        except Exception:
+            return
+        self._base_config = base
+        self.apply_config(presets.resolve(base, self._preset))
+
+    def switch_preset(self, name):
+        """
+        切换到预设 name（"" 为基础配置），之后热加载也保持该预设
+        背景已预先准备好时只替换画布上的图像，不重新解码缩放；预设不存在时抛出 ValueError
+        """
+        base = _load_base_config()
+        if name and name not in presets.names(base):
+            raise ValueError(f"未知预设: {name}")
+        self._preset = name
+        self._base_config = base
+        self._preset_switches += 1
+        self.apply_config(presets.resolve(base, name))
+
+    def _preset_bg_key(self, config):
+        """
+        config 的背景为可预先准备的单张图片时返回背景键 (路径, 修改时间, 大小, 适配方式, 分块大小, 动图)；
+        纯色、文件夹轮播、毛玻璃或文件不存在时返回 None
+        """
+        if config.get("background_frosted"):
+            return None
+        path = (config.get("background_image_path") or "").strip()
+        if not path:
+            return None
+        path = os.path.normpath(path)
+        if not os.path.isfile(path):
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (path, st.st_mtime_ns, st.st_size, self._fit_mode(config),
+                int(config.get("bg_tile_size", bg_tiles.DEFAULT_TILE_SIZE)), bool(config.get("bg_animation_enabled", True)))
+
+    def _wanted_preset_configs(self):
+        """需要预先准备的背景：{背景键: 对应预设的生效配置}（基础配置在前，其余按预设顺序）；未开启或没有预设时为空"""
+        names = presets.names(self._base_config)
+        if not names or not CONFIG.get("preset_prewarm", True):
+            return {}
+        wanted = {}
+        for name in [""] + names:
+            config = presets.resolve(self._base_config, name)
+            key = self._preset_bg_key(config)
+            if key is not None and key not in wanted:
+                wanted[key] = config
+        return wanted
+
+    def _is_preset_photos(self, photos):
+        return photos is not None and any(p is photos for p in self._preset_photos.values())
+
+    def _start_prewarm(self):
+        self._prewarm_ready = True
+        self._prewarm_presets()
+
+    def _prewarm_presets(self):
+        """预先准备各预设的背景：先丢掉不再需要的，再在工作线程中逐个加载缺少的（同一时间只加载一个）"""
+        wanted = self._wanted_preset_configs()
+        for key in [key for key in self._preset_photos if key not in wanted]:
+            photos = self._preset_photos.pop(key)
+            if photos is not None and photos is not self._scaled_bg_photos:
+                self._cancel_tiles(photos, keep=self._scaled_bg_photos)
+        if not self._prewarm_ready or self._prewarm_key is not None:
+            return
+        missing = [key for key in wanted if key not in self._preset_photos]
+        if not missing:
+            return
+        key = missing[0]
+        self._prewarm_key = key
+        self._ui.begin()
+        threading.Thread(
+            target=self._prewarm_worker,
+            args=(key, wanted[key], self._target_sizes(), self._get_bg_cache()),
+            name="bg-prewarm",
+            daemon=True,
+        ).start()
+
+    def _prewarm_worker(self, key, config, sizes, cache):
+        """工作线程：不得调用任何 Tk 接口；动图由 AnimatedBackground 逐帧播放，不预先准备"""
+        path, _mtime, _size, fit_mode, _tile_size, animation = key
+        budget = max(0, int(config.get("bg_memory_budget_mb", 256))) * 1024 * 1024
+        results = None
+        try:
+            if not (animation and bg_pipeline.is_animated(path)):
+                results = bg_pipeline.load_backgrounds(path, sizes, fit_mode, cache, memory_budget=budget)
+        except Exception:
+            # 加载失败：切换到该预设时按正常流程加载并记录错误
+            pass
+        finally:
+            self._ui.post(self._on_prewarmed, key, config, results, cache)
+            self._ui.post(self._ui.end)
+
+    def _on_prewarmed(self, key, config, results, cache):
+        """Tk 线程：转换为 PhotoImage 备用（配置已变化、不再需要时丢弃），再准备下一个"""
+        self._prewarm_key = None
+        if key in self._wanted_preset_configs():
+            self._preset_photos[key] = self._photos_from_results(results, cache, config) if results else None
+        self._prewarm_presets()
+
+    def apply_config(self, new_config):
+        """应用新配置：只更新实际变化的部分，背景图仅在路径变化时重新加载"""
+        old_config = dict(CONFIG)
+        CONFIG.clear()
+        CONFIG.update(new_config)
+        changed = {k for k in set(old_config) | set(CONFIG) if old_config.get(k) != CONFIG.get(k)}
+        if not changed:
+            return
+
+        if "background_color" in changed:
+            for screen in self.screens:
+                screen.window.configure(bg=CONFIG["background_color"])
+                screen.canvas.configure(bg=CONFIG["background_color"])
+        if "message_font_file" in changed:
+            self._message_font_file = None
+        if changed & {"message_text", "message_font_size", "font_auto_fit",
+                      "message_prerender", "message_effect", "message_font_file"}:
+            self._text_layers.clear()
+            for screen in self.screens:
+                self._create_message_item(screen)
+        if changed & {"time_font_size", "font_auto_fit"}:
+            for screen in self.screens:
+                self._layout_clock(screen)
+        if "time_color" in changed:
+            for screen in self.screens:
+                screen.clock.set_fill(CONFIG["time_color"])
+
+        blink_keys = {"message_blink_enabled", "blink_interval_ms", "blink_style", "blink_fade_fps"}
+        if changed & blink_keys or (self._fade is not None and changed & {"message_color", "message_color_alt"}):
+            self._configure_blink()
+        if changed & ({"message_color", "message_color_alt"} | blink_keys):
+            color = CONFIG["message_color"] if self._blink_state else CONFIG["message_color_alt"]
+            self._set_message_color(color)
+
+        if "slideshow_interval_s" in changed:
+            self.scheduler.set_period("slideshow", self._slideshow_period_ms())
+        frosted_keys = {"background_frosted", "frosted_blur_radius", "frosted_dim"}
+        if CONFIG.get("background_frosted"):
+            # 全屏窗口正盖在桌面上，无法重新截屏：毛玻璃设置在下次显示时生效
+            pass
+        elif changed & ({"background_image_path", "bg_animation_enabled", "background_fit_mode",
+                         "bg_tile_size"} | frosted_keys):
+            if (CONFIG.get("background_image_path") or "").strip():
+                self._draw_background_image()
+            else:
+                self._clear_background()
+        self._prewarm_presets()
+
+    def _clear_background(self):
+        """移除背景图，恢复纯色背景（同时作废进行中的加载任务）"""
+        self._bg_job += 1
+        self._stop_animation()
+        self._stop_slideshow()
+        if not self._is_preset_photos(self._scaled_bg_photos):
+            self._cancel_tiles(self._scaled_bg_photos)
+        for screen in self.screens:
+            screen.canvas.delete("bg_image")
+            screen.bg_items = []
+            screen.bg_tiles = None
+        self._bg_photo = None
+        self._scaled_bg_photos = None
+
+    def status(self):
+        """当前状态，供守护进程 status 命令返回"""
+        return {
+            "visible": self.visible,
+            "resident": self.resident,
+            "pid": os.getpid(),
+            "background_image_path": CONFIG.get("background_image_path", ""),
+            "background_loaded": self._scaled_bg_photos is not None,
+            "screens": [list(screen.monitor[:4]) for screen in self.screens],
+            "animation": self._animation.stats() if self._animation is not None else None,
+            "frosted": self._frosted_stats,
+            "tiles": [photo.stats() for photo in set((self._scaled_bg_photos or {}).values())
+                      if isinstance(photo, bg_tiles.TiledImage)],
+            "blink": self._fade.stats() if self._fade is not None else None,
+            "text": {
+                "measure_hits": self._measurer.hits,
+                "measure_misses": self._measurer.misses,
+                "message_sizes": [screen.message_size for screen in self.screens],
+                "prerendered": any(screen.message_layer for screen in self.screens),
+                "layer_renders": self._text_layers.renders,
+            },
+            "slideshow": self._slideshow.stats() if self._slideshow is not None else None,
+            "eco": self._eco.stats() if self._eco is not None else None,
+            "preset": {
+                "active": CONFIG.get("active_preset", ""),
+                "pinned": self._preset is not None,
+                "names": presets.names(self._base_config),
+                "prewarmed": sum(1 for photos in self._preset_photos.values() if photos is not None),
+                "prewarming": self._prewarm_key is not None,
+                "switches": self._preset_switches,
+                "instant_switches": self._preset_hits,
+            },
+            "message_text": CONFIG.get("message_text", ""),
+        }
+
+    def _quit(self, reason="quit"):
         """退出程序"""
+        self._end_session(reason)
+        if self._session is not None:
+            self._session.close()
+        self._bg_job += 1
+        self._stop_animation()
+        self._stop_slideshow()
+        if self._config_watcher is not None:
+            self._config_watcher.stop()
+        self.scheduler.stop()
+        self._ui.cancel()
         self.root.quit()
         self.root.destroy()
 
     def run(self):
         """运行主循环"""
-        self.root.mainloop()
+        self.root.after_idle(startup_profile.mark, "first_mainloop_idle")
+        has_background = (CONFIG.get("background_image_path") or "").strip() or CONFIG.get("background_frosted")
+        if self._exit_after_paint and not has_background:
+            # 无背景图时，主循环首次空闲即首次绘制完成
+            self.root.after_idle(self._quit)
+        try:
+            self.root.mainloop()
+        except BaseException:
+            # 崩溃（含 Ctrl+C）：先记下时段结束再抛出
+            self._end_session("crash")
+            raise
+        self._end_session("exit")
 
 
 # =============================================================================
@@ -3,14 +3,108 @@
 全屏离开提示工具 - 统一入口
 - 直接运行：打开配置界面
 - 带 --fullscreen 参数：直接运行全屏提示
+- 再加 --measure-memory：记录每次背景图加载的 RSS 峰值到 bg_load_stats.txt
+- 带 --daemon 参数：常驻后台（窗口预先建好并隐藏），通过本机端口接收命令
+- 带 --send 命令：向常驻进程发送 show / hide / reload / status / quit / "preset 名称"
+- 加 --preset 名称：--fullscreen / --daemon 使用 config.json 中的该预设；--send preset --preset 名称 切换常驻进程的预设
+- 加 --profile [文件]：记录启动各阶段与定时回调延迟，退出时写出 Chrome Trace（默认 profile_trace.json）
+- 加 --exit-after-paint：首次绘制（含背景图）完成后自动退出，用于测量启动耗时
+- 带 --sessions [day|week]：按天/周统计 session_log 中的离开时段，可加 --since / --until YYYY-MM-DD
 """
 
+import os
 import sys
 
+
+def _script_dir():
+    return os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(os.path.abspath(__file__))
+
+
+def _print_sessions():
+    """输出离开时段统计：周期、次数、总时长（制表符分隔）"""
+    import session_log
+    by = _arg_value("--sessions")
+    if by not in ("day", "week"):
+        by = "day"
+    try:
+        since = session_log.parse_date(_arg_value("--since")) if "--since" in sys.argv else None
+        # --until 当天也计入
+        until = session_log.parse_date(_arg_value("--until"), days=1) if "--until" in sys.argv else None
+    except (TypeError, ValueError):
+        print("日期格式应为 YYYY-MM-DD", file=sys.stderr)
+        sys.exit(1)
+    rows = session_log.aggregate(os.path.join(_script_dir(), session_log.LOG_NAME), by, since, until)
+    print("周期\t次数\t总时长")
+    for period, count, seconds in rows:
+        print(f"{period}\t{count}\t{session_log.format_duration(seconds)}")
+    print(f"合计\t{sum(r[1] for r in rows)}\t{session_log.format_duration(sum(r[2] for r in rows))}")
+
+
+def _preset_arg(config):
+    """读取 --preset 名称（未指定时返回 None）；预设不存在时报错退出"""
+    if "--preset" not in sys.argv:
+        return None
+    import presets
+    name = _arg_value("--preset") or ""
+    if name and name not in presets.names(config):
+        known = "、".join(presets.names(config)) or "无"
+        print(f"未知预设: {name}（已有预设：{known}）", file=sys.stderr)
+        sys.exit(1)
+    return name
+
+
+def _arg_value(name):
+    """读取形如 --name value 的参数值，缺省返回 None"""
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return None
+
+
 if __name__ == "__main__":
-    if "--fullscreen" in sys.argv:
-        from fullscreen_prompt_tool import FullScreenPromptApp
-        app = FullScreenPromptApp()
+    if "--profile" in sys.argv:
+        # 须在导入 tkinter / 主程序之前开启，才能记录导入耗时
+        import startup_profile
+        trace_path = _arg_value("--profile")
+        if not trace_path or trace_path.startswith("--"):
+            trace_path = os.path.join(_script_dir(), "profile_trace.json")
+        startup_profile.enable(trace_path)
+
+    if "--sessions" in sys.argv:
+        _print_sessions()
+    elif "--daemon" in sys.argv:
+        from fullscreen_prompt_tool import CONFIG, FullScreenPromptApp
+        from overlay_daemon import OverlayDaemon
+        app = FullScreenPromptApp(measure_memory="--measure-memory" in sys.argv, resident=True,
+                                  preset=_preset_arg(CONFIG))
+        try:
+            daemon = OverlayDaemon(app, CONFIG.get("daemon_port"))
+        except OSError as e:
+            print(f"常驻进程启动失败（端口可能已被占用）: {e}", file=sys.stderr)
+            sys.exit(1)
+        daemon.run()
+    elif "--send" in sys.argv:
+        import json
+        from fullscreen_prompt_tool import CONFIG
+        from overlay_daemon import send_command
+        command = _arg_value("--send") or "status"
+        preset = _preset_arg(CONFIG)
+        if command.strip().lower() == "preset" and preset is not None:
+            command = f"preset {preset}"
+        try:
+            reply = send_command(command, CONFIG.get("daemon_port"))
+        except (OSError, ValueError) as e:
+            print(f"无法连接常驻进程: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(reply, ensure_ascii=False))
+    elif "--fullscreen" in sys.argv:
+        from fullscreen_prompt_tool import CONFIG, FullScreenPromptApp
+        app = FullScreenPromptApp(
+            measure_memory="--measure-memory" in sys.argv,
+            exit_after_paint="--exit-after-paint" in sys.argv,
+            preset=_preset_arg(CONFIG),
+        )
         app.run()
     else:
         from config_ui import ConfigUI
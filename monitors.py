@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+显示器布局探测
+- Linux / X11：解析 `xrandr --query` 输出中已连接且已启用的输出
+- Windows：EnumDisplayMonitors + GetMonitorInfoW
+- 探测失败或只有一块屏幕时，退回 Tk 报告的整块屏幕尺寸
+"""
+
+import re
+import sys
+from collections import namedtuple
+
+# 坐标为虚拟桌面中的左上角位置，单位像素
+Monitor = namedtuple("Monitor", "x y width height primary")
+
+# 例：DP-1 connected primary 2560x1440+1920+0 (normal left inverted ...) 597mm x 336mm
+_XRANDR_LINE = re.compile(r"^\S+ connected (primary )?(\d+)x(\d+)\+(-?\d+)\+(-?\d+)")
+
+
+def parse_xrandr(output):
+    """从 xrandr --query 输出解析显示器列表（已连接但未启用的输出没有几何信息，自动跳过）"""
+    monitors = []
+    for line in output.splitlines():
+        m = _XRANDR_LINE.match(line)
+        if m:
+            primary, w, h, x, y = m.groups()
+            monitors.append(Monitor(int(x), int(y), int(w), int(h), bool(primary)))
+    return monitors
+
+
+def _monitors_xrandr():
+    import subprocess
+    try:
+        output = subprocess.run(
+            ["xrandr", "--query"], capture_output=True, text=True, timeout=2
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return []
+    return parse_xrandr(output)
+
+
+def _monitors_windows():
+    import ctypes
+    from ctypes import wintypes
+
+    class MONITORINFO(ctypes.Structure):
+        _fields_ = [
+            ("cbSize", wintypes.DWORD),
+            ("rcMonitor", wintypes.RECT),
+            ("rcWork", wintypes.RECT),
+            ("dwFlags", wintypes.DWORD),
+        ]
+
+    monitors = []
+    user32 = ctypes.windll.user32
+
+    def callback(hmonitor, _hdc, _rect, _data):
+        info = MONITORINFO()
+        info.cbSize = ctypes.sizeof(info)
+        if user32.GetMonitorInfoW(hmonitor, ctypes.byref(info)):
+            rc = info.rcMonitor
+            # MONITORINFOF_PRIMARY = 1
+            monitors.append(Monitor(rc.left, rc.top, rc.right - rc.left, rc.bottom - rc.top, bool(info.dwFlags & 1)))
+        return True
+
+    proc = ctypes.WINFUNCTYPE(
+        wintypes.BOOL, wintypes.HMONITOR, wintypes.HDC, ctypes.POINTER(wintypes.RECT), wintypes.LPARAM
+    )(callback)
+    user32.EnumDisplayMonitors(None, None, proc, 0)
+    return monitors
+
+
+def detect_monitors(root):
+    """返回显示器列表，主屏在前；至少包含一项"""
+    monitors = []
+    try:
+        if sys.platform == "win32":
+            monitors = _monitors_windows()
+        elif root.tk.call("tk", "windowingsystem") == "x11":
+            monitors = _monitors_xrandr()
+    except Exception:
+        monitors = []
+    monitors = [m for m in monitors if m.width > 0 and m.height > 0]
+    if not monitors:
+        return [Monitor(0, 0, root.winfo_screenwidth(), root.winfo_screenheight(), True)]
+    # 主屏排第一（无主屏标记时取左上角的一块），其余按位置排序
+    monitors.sort(key=lambda m: (not m.primary, m.x, m.y))
+    if not monitors[0].primary:
+        monitors[0] = monitors[0]._replace(primary=True)
+    return monitors
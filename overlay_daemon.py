@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+常驻守护模式
+- main.py --daemon：常驻一个已隐藏的全屏窗口（背景图已渲染好），监听本机端口
+- 命令（一行文本）：show / hide / reload / status / quit / preset 名称，回复一行 JSON
+- preset 名称：切换到该预设（只写 preset 则回到基础配置），背景已预先准备好时立即切换
+- show 只需 deiconify，几毫秒即可显示，省去解释器启动、导入与图片加载
+- 仅监听 127.0.0.1；本机其他用户（及浏览器里的网页）也能连上这个端口，因此每次启动生成随机令牌，
+  写入只有当前用户可读的令牌文件（见 token_path），每条命令须以令牌开头：“令牌 命令 [参数]”，
+  令牌不符直接拒绝；守护进程退出时删除令牌文件
+"""
+
+import hmac
+import json
+import os
+import secrets
+import socket
+import sys
+import threading
+
+from ui_dispatch import UiDispatcher
+
+DEFAULT_PORT = 47863
+COMMANDS = ("show", "hide", "reload", "status", "quit", "preset")
+
+_MAX_LINE = 1024
+_APP_DIR_NAME = "FullScreenPromptTool"
+
+
+def token_path(port=DEFAULT_PORT):
+    """
+    令牌文件路径（按端口区分）：放在当前用户自己的目录中
+    Windows 为 %LOCALAPPDATA%（默认只有本人可访问），其他系统为 $XDG_RUNTIME_DIR 或 ~/.cache
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA")
+    else:
+        base = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".cache")
+    folder = os.path.join(base or os.path.expanduser("~"), _APP_DIR_NAME)
+    return os.path.join(folder, f"daemon_{int(port)}.token")
+
+
+def _write_token(path, token):
+    """以仅本人可读写（0600，目录 0700）的权限写入令牌；先写临时文件再替换，读取方不会读到半个令牌"""
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    # 崩溃留下的同名临时文件可能权限更宽，O_CREAT 不会改已有文件的权限
+    try:
+        os.remove(tmp)
+    except OSError:
+        pass
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, "w", encoding="ascii") as f:
+            f.write(token)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def read_token(port=DEFAULT_PORT):
+    """读取守护进程的令牌；守护进程未运行（无令牌文件）时抛出 FileNotFoundError"""
+    with open(token_path(port), "r", encoding="ascii") as f:
+        return f.read().strip()
+
+
+def send_command(command, port=DEFAULT_PORT, timeout=2.0):
+    """
+    向守护进程发送命令并返回回复（dict）
+    守护进程未运行时抛出 OSError（令牌文件不存在、ConnectionRefusedError 等），调用方可据此回退为新开进程
+    """
+    token = read_token(port)
+    with socket.create_connection(("127.0.0.1", int(port)), timeout=timeout) as conn:
+        conn.sendall(f"{token} {command.strip()}\n".encode("utf-8"))
+        data = conn.makefile("rb").readline(_MAX_LINE * 64)
+    if not data:
+        raise ConnectionError("守护进程未返回数据")
+    return json.loads(data.decode("utf-8"))
+
+
+class OverlayDaemon:
+    """在后台线程监听命令，命令统一交回 Tk 线程执行"""
+
+    def __init__(self, app, port=DEFAULT_PORT, timeout=5.0):
+        self.app = app
+        self.port = int(port)
+        self.timeout = timeout
+        self._ui = UiDispatcher(app.root)
+        # 绑定失败（端口占用，通常是已有守护进程）或令牌文件写不进时直接抛出 OSError
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._token = secrets.token_hex(16)
+        self._token_path = token_path(self.port)
+        try:
+            self._server.bind(("127.0.0.1", self.port))
+            self._server.listen(8)
+            # 绑定成功后才写令牌，不会覆盖正在运行的守护进程的令牌
+            _write_token(self._token_path, self._token)
+        except OSError:
+            self._server.close()
+            raise
+        self._thread = threading.Thread(target=self._serve, name="overlay-daemon", daemon=True)
+
+    def run(self):
+        """启动监听并进入 Tk 主循环"""
+        if not self._ui.threaded:
+            # 非线程版 Tcl 无法跨线程唤醒主循环，改为常驻低频轮询
+            self._ui.begin()
+        self._thread.start()
+        try:
+            self.app.run()
+        finally:
+            self.close()
+
+    def close(self):
+        """停止监听；shutdown 可唤醒阻塞在 accept 上的线程（Linux）"""
+        try:
+            self._server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._server.close()
+        self._remove_token()
+
+    def _remove_token(self):
+        """删除令牌文件（仍是本进程写入的才删）"""
+        try:
+            if read_token(self.port) == self._token:
+                os.remove(self._token_path)
+        except OSError:
+            pass
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _addr = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            try:
+                conn.settimeout(self.timeout)
+                line = conn.makefile("rb").readline(_MAX_LINE)
+                token, _, line = line.decode("utf-8", "replace").strip().partition(" ")
+                if not hmac.compare_digest(token.encode("utf-8"), self._token.encode("ascii")):
+                    reply = {"ok": False, "error": "令牌无效"}
+                else:
+                    # 命令不区分大小写，参数（预设名）保持原样
+                    command, _, arg = line.strip().partition(" ")
+                    reply = self._call_on_tk(command.lower(), arg.strip())
+                conn.sendall((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+            except OSError:
+                pass
+
+    def _call_on_tk(self, command, arg=""):
+        """在 Tk 线程执行命令并等待结果"""
+        if command not in COMMANDS:
+            return {"ok": False, "error": f"未知命令: {command}", "commands": list(COMMANDS)}
+        done = threading.Event()
+        box = {}
+
+        def run():
+            try:
+                box["reply"] = self._dispatch(command, arg)
+            except Exception as e:
+                box["reply"] = {"ok": False, "error": str(e)}
+            finally:
+                done.set()
+
+        self._ui.post(run)
+        if not done.wait(self.timeout):
+            return {"ok": False, "error": "超时"}
+        return box["reply"]
+
+    def _dispatch(self, command, arg=""):
+        """Tk 线程：执行具体命令"""
+        app = self.app
+        if command == "show":
+            app.show()
+        elif command == "hide":
+            app.hide()
+        elif command == "reload":
+            app.reload_config()
+        elif command == "preset":
+            app.switch_preset(arg)
+        elif command == "quit":
+            # 先回复再退出
+            app.root.after(50, app._quit)
+        reply = {"ok": True}
+        reply.update(app.status())
+        return reply
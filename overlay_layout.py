@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+全屏提示的画面排版（全屏窗口与配置界面预览共用）
+- 提示语中心位于屏幕高度 40% 处，时间位于 60% 处，均水平居中
+- 开启自动适配时，字号缩小到放得进屏幕 MESSAGE_BOX / TIME_BOX 比例区域（配置中的字号为上限）
+- 背景图居中摆放；平铺模式下同一个图块从左上角起重复摆满屏幕
+"""
+
+import re
+import time
+
+FONT_FAMILY = "Microsoft YaHei UI"
+# 自动适配字号时文字可占用的区域（相对屏幕宽、高的比例）
+MESSAGE_BOX = (0.9, 0.3)
+TIME_BOX = (0.9, 0.1)
+# 提示语、时间中心的纵向位置（相对屏幕高度）
+MESSAGE_Y = 0.40
+TIME_Y = 0.60
+
+_WEEKDAYS = ("星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日")
+
+
+def message_font(size):
+    return (FONT_FAMILY, size, "bold")
+
+
+def time_font(size):
+    return (FONT_FAMILY, size, "normal")
+
+
+def format_time(now=None, seconds=True):
+    """时间字符串：2025-01-01 星期一 12:00:00；seconds=False 时只到分钟"""
+    t = time.localtime(now)
+    clock = "%H:%M:%S" if seconds else "%H:%M"
+    return f"{time.strftime('%Y-%m-%d', t)} {_WEEKDAYS[t.tm_wday]} {time.strftime(clock, t)}"
+
+
+def fit_font_size(measurer, config, screen_size, text, max_size, weight, box):
+    """自动适配：放得进屏幕 box 比例区域的最大字号（不超过 max_size）；关闭时直接用 max_size"""
+    if not config.get("font_auto_fit", True):
+        return max_size
+    width, height = screen_size
+    return measurer.fit_size(FONT_FAMILY, weight, text, int(width * box[0]), int(height * box[1]), max_size)
+
+
+def message_font_size(measurer, config, screen_size):
+    return fit_font_size(
+        measurer, config, screen_size, config["message_text"], config["message_font_size"], "bold", MESSAGE_BOX
+    )
+
+
+def time_font_size(measurer, config, screen_size, text):
+    # 数字统一按 0 测量：字号不随当前是几点几秒变化，重复排版命中测量缓存而不是每次新增条目
+    text = re.sub(r"\d", "0", text)
+    return fit_font_size(measurer, config, screen_size, text, config["time_font_size"], "normal", TIME_BOX)
+
+
+def message_position(screen_size):
+    return screen_size[0] // 2, int(screen_size[1] * MESSAGE_Y)
+
+
+def time_position(screen_size):
+    return screen_size[0] // 2, int(screen_size[1] * TIME_Y)
+
+
+def background_positions(screen_size, photo_size, tiled):
+    """背景图项的 (x, y, anchor) 列表：居中一项，或平铺摆满屏幕"""
+    width, height = screen_size
+    if tiled:
+        return [
+            (x, y, "nw")
+            for y in range(0, height, photo_size[1])
+            for x in range(0, width, photo_size[0])
+        ]
+    return [(width // 2, height // 2, "center")]
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+未安装 Pillow 时的 PPM/PGM 背景图缩放（需要 NumPy）
+- 源文件用 mmap 映射为 NumPy 数组视图，不整体读入内存；按适配模式裁剪只是切片
+- 两个方向分别处理：缩小按输出像素覆盖的源像素求面积平均，放大用双线性插值，
+  输出精确的目标尺寸，不再受 tk.PhotoImage zoom/subsample 只能整数倍缩放的限制
+- 按输出行分条计算，中间结果只占一条的内存；结果直接写入预先分配好的 PPM 缓冲区（含文件头）
+- 只支持 8 位（maxval 为 255）的二进制 P5/P6；灰度图输出时展开为 RGB
+"""
+
+import mmap
+
+import numpy as np
+
+import bg_cache
+import bg_pipeline
+
+# 每次处理的输出行数
+STRIP_ROWS = 64
+
+_MAGIC = {b"P5": 1, b"P6": 3}
+
+
+def is_netpbm(path):
+    """文件是否为二进制 PPM/PGM（P6/P5）"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(2) in _MAGIC
+    except OSError:
+        return False
+
+
+def _parse_header(buf):
+    """解析 P5/P6 文件头，返回 (通道数, 宽, 高, 像素数据偏移)"""
+    channels = _MAGIC.get(buf[:2])
+    if channels is None:
+        raise ValueError("不是 P5/P6 格式")
+    fields = []
+    pos = 2
+    while len(fields) < 3:
+        c = buf[pos:pos + 1]
+        if not c:
+            raise ValueError("文件头不完整")
+        if c.isspace():
+            pos += 1
+        elif c == b"#":
+            # 注释到行尾
+            pos = buf.find(b"\n", pos)
+            if pos < 0:
+                raise ValueError("文件头不完整")
+        elif c.isdigit():
+            end = pos
+            while buf[end:end + 1].isdigit():
+                end += 1
+            fields.append(int(buf[pos:end]))
+            pos = end
+        else:
+            raise ValueError("文件头格式错误")
+    width, height, maxval = fields
+    if maxval != 255:
+        raise ValueError(f"只支持 8 位 PPM/PGM（maxval={maxval}）")
+    if width <= 0 or height <= 0:
+        raise ValueError(f"图片尺寸无效: {width}x{height}")
+    # 文件头与像素数据之间只有一个空白字符
+    return channels, width, height, pos + 1
+
+
+def open_netpbm(path):
+    """映射 PPM/PGM 文件，返回 (高, 宽, 通道) 形状的只读 uint8 数组（直接引用映射内存）"""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    channels, width, height, offset = _parse_header(mapped)
+    count = width * height * channels
+    if len(mapped) < offset + count:
+        raise ValueError("像素数据不完整")
+    # 数组持有 mmap 的引用，数组释放后映射随之关闭
+    return np.frombuffer(mapped, np.uint8, count, offset).reshape(height, width, channels)
+
+
+def _axis_plan(src_len, dst_len):
+    """
+    单个方向的采样计划
+    缩小：("area", 各输出像素对应源像素段的起点, 段长)
+    放大：("linear", 左/上邻下标, 右/下邻下标, 权重)
+    """
+    if dst_len <= src_len:
+        starts = np.arange(dst_len, dtype=np.intp) * src_len // dst_len
+        counts = np.diff(np.append(starts, src_len)).astype(np.float32)
+        return ("area", starts, counts)
+    pos = (np.arange(dst_len, dtype=np.float64) + 0.5) * (src_len / dst_len) - 0.5
+    pos = np.clip(pos, 0, src_len - 1)
+    i0 = pos.astype(np.intp)
+    i1 = np.minimum(i0 + 1, src_len - 1)
+    return ("linear", i0, i1, (pos - i0).astype(np.float32))
+
+
+def _area_mean(arr, starts, counts, axis):
+    """
+    沿 axis 求各段均值，第 i 段为 starts[i] 起的 counts[i] 个像素，返回 float32 数组
+    段长只有 k、k+1 两种：按段内偏移逐次取出整批像素累加，比 np.add.reduceat 快一个数量级
+    """
+    shape = [1] * arr.ndim
+    shape[axis] = len(starts)
+    acc = np.take(arr, starts, axis=axis).astype(np.float32)
+    last = arr.shape[axis] - 1
+    for j in range(1, int(counts.max())):
+        part = np.take(arr, np.minimum(starts + j, last), axis=axis)
+        if j < counts.min():
+            acc += part
+        else:
+            # 只有 k+1 长的段才有这一列/行
+            acc += part * (counts > j).reshape(shape)
+    acc /= counts.reshape(shape)
+    return acc
+
+
+def _rows(src, plan, r0, r1):
+    """纵向：计算第 r0~r1 行输出（横向仍为源图宽度），返回 float32 数组"""
+    if plan[0] == "area":
+        _kind, starts, counts = plan
+        return _area_mean(src, starts[r0:r1], counts[r0:r1], 0)
+    _kind, i0, i1, frac = plan
+    top = src[i0[r0:r1]].astype(np.float32)
+    bottom = src[i1[r0:r1]].astype(np.float32)
+    bottom -= top
+    bottom *= frac[r0:r1, None, None]
+    top += bottom
+    return top
+
+
+def _columns(rows, plan):
+    """横向：对纵向结果按列采样"""
+    if plan[0] == "area":
+        _kind, starts, counts = plan
+        return _area_mean(rows, starts, counts, 1)
+    _kind, i0, i1, frac = plan
+    left = rows[:, i0]
+    right = rows[:, i1]
+    right -= left
+    right *= frac[None, :, None]
+    left += right
+    return left
+
+
+def resample_into(src, out):
+    """把 src（高, 宽, 通道）缩放到 out 的尺寸并写入 out；通道数为 1 时广播为 RGB"""
+    out_h, out_w = out.shape[:2]
+    row_plan = _axis_plan(src.shape[0], out_h)
+    col_plan = _axis_plan(src.shape[1], out_w)
+    for r0 in range(0, out_h, STRIP_ROWS):
+        r1 = min(out_h, r0 + STRIP_ROWS)
+        strip = _columns(_rows(src, row_plan, r0, r1), col_plan)
+        # +0.5 后截断即四舍五入；面积平均与双线性插值的结果不会超出 0~255
+        strip += 0.5
+        np.copyto(out[r0:r1], strip, casting="unsafe")
+
+
+def new_ppm(width, height):
+    """分配 PPM 缓冲区，返回 (bytearray, 指向像素区的 (高, 宽, 3) 可写数组)"""
+    header = bg_cache.ppm_header(width, height)
+    buf = bytearray(len(header) + width * height * 3)
+    buf[:len(header)] = header
+    pixels = np.frombuffer(buf, np.uint8, offset=len(header)).reshape(height, width, 3)
+    return buf, pixels
+
+
+def fit_netpbm(src, target_size, fit_mode):
+    """
+    按适配模式生成 target_size 的背景图，返回 PPM 数据（bytearray，含文件头）
+    与 bg_pipeline.fit_image 相同：先裁出可见区域，只对该区域重采样；tile 输出一个图块
+    """
+    src_h, src_w = src.shape[:2]
+    box, (out_w, out_h) = bg_pipeline.fit_geometry(src_w, src_h, target_size[0], target_size[1], fit_mode)
+    left, top = round(box[0] * src_w), round(box[1] * src_h)
+    right = max(left + 1, round(box[2] * src_w))
+    bottom = max(top + 1, round(box[3] * src_h))
+    region = src[top:bottom, left:right]
+
+    if region.shape[:2] != (out_h, out_w):
+        buf, pixels = new_ppm(out_w, out_h)
+        resample_into(region, pixels)
+        return buf
+
+    # 无需缩放（center / tile，或尺寸恰好相等）：只复制；平铺的小图块按整数倍拼大
+    nx, ny = 1, 1
+    if fit_mode == "tile":
+        nx = -(-bg_pipeline.MIN_TILE_SIZE // out_w)
+        ny = -(-bg_pipeline.MIN_TILE_SIZE // out_h)
+    buf, pixels = new_ppm(out_w * nx, out_h * ny)
+    for y in range(ny):
+        for x in range(nx):
+            pixels[y * out_h:(y + 1) * out_h, x * out_w:(x + 1) * out_w] = region
+    return buf
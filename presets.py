@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+命名预设（如“午餐”“会议”“下班”各用一套提示语与背景）
+- config.json 中 presets 为 {名称: 覆盖项}，每个预设只保存与基础配置（文件顶层各项）不同的项；
+  active_preset 为当前使用的预设，空字符串表示直接用基础配置
+- 生效配置 = 基础配置 ← 预设的覆盖项；没有 presets 的旧 config.json 照常使用
+- GLOBAL_KEYS 为进程级设置（窗口、端口、监听等启动时就已确定的部分），只在基础配置中生效，预设中的同名项被忽略
+"""
+
+# 启动后等待多久再开始预先准备各预设的背景（毫秒），不与首次绘制争抢 CPU
+PREWARM_DELAY_MS = 2000
+
+GLOBAL_KEYS = frozenset({
+    "presets", "active_preset", "preset_prewarm",
+    "daemon_port", "config_hot_reload", "multi_monitor", "eco_mode",
+    "session_log_enabled", "session_log_max_kb",
+})
+
+
+def names(config):
+    """预设名称列表（按 config.json 中的顺序）"""
+    presets = config.get("presets")
+    return list(presets) if isinstance(presets, dict) else []
+
+
+def overrides(config, name):
+    """预设 name 的覆盖项（不含 GLOBAL_KEYS）；不存在时返回空字典"""
+    presets = config.get("presets")
+    values = presets.get(name) if isinstance(presets, dict) and name else None
+    if not isinstance(values, dict):
+        return {}
+    return {key: value for key, value in values.items() if key not in GLOBAL_KEYS}
+
+
+def resolve(config, name=None):
+    """
+    返回预设 name 的生效配置（新字典，保留 presets 以便切换到其他预设）
+    name 为 None 时用 config 中的 active_preset；名称不存在时按基础配置处理
+    """
+    if name is None:
+        name = config.get("active_preset") or ""
+    if name not in names(config):
+        name = ""
+    resolved = dict(config)
+    resolved.update(overrides(config, name))
+    resolved["active_preset"] = name
+    return resolved
+
+
+def diff(base, config, keys):
+    """config 中 keys 各项与基础配置 base 不同的部分（用于把界面上编辑的结果存为预设的覆盖项）"""
+    return {key: config[key] for key in keys
+            if key in config and key not in GLOBAL_KEYS and config[key] != base.get(key)}
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+离开时段记录（考勤统计用）
+- 每次全屏提示出现记一条 start，消失（ESC、隐藏、退出、崩溃）记一条 end，只追加、一行一条，制表符分隔：
+    2025-01-01T12:00:00\tstart\t<开始时间戳>\t<pid>
+    2025-01-01T12:30:00\tend\t<结束时间戳>\t<pid>\t<开始时间戳>\t<时长秒>\t<原因>
+  end 记录自带开始时间与时长，统计时以 end 行为准
+- 进程被强制结束时没有 end：统计时这种孤立的 start 以日志中紧随其后的下一条记录的时间作为结束（原因 orphaned）；
+  其后没有任何记录的 start 可能是仍在显示的时段，不计入
+- 写入：文件以追加模式打开并带缓冲；start 只 flush 到系统（进程被强制结束时仍留有痕迹），
+  end 写入后才 fsync 一次，每个时段只落盘一次
+- 轮转：时段结束时文件超过大小上限，改名为 <文件名>.<轮转时间>.txt（默认 session_log.<轮转时间>.txt）；文件名按时间排序，
+  查询时可按文件名跳过整个早于起始日期的旧文件
+- 查询：逐行流式读取，按天或 ISO 周累计时长（跨零点的时段按实际时间拆到两天），内存只与统计周期数有关
+"""
+
+import os
+import re
+import time
+
+LOG_NAME = "session_log.txt"
+# 单个日志文件大小上限，时段结束时超出即轮转
+DEFAULT_MAX_BYTES = 1024 * 1024
+# 写缓冲大小
+BUFFER_SIZE = 64 * 1024
+# 读取时的缓冲大小
+READ_BUFFER_SIZE = 1024 * 1024
+
+
+
+def _rotated_pattern(path):
+    """path 轮转后的文件名：<主名>.<轮转时间>[-序号]<扩展名>"""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return re.compile(r"^%s\.(\d{8}-\d{6})(?:-\d+)?%s$" % (re.escape(stem), re.escape(ext)))
+
+
+def _stamp(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts))
+
+
+class SessionLog:
+    """时段记录写入器；写入失败（目录只读、磁盘满等）时静默放弃，不影响全屏提示"""
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.started = None
+        self._file = None
+
+    @property
+    def active(self):
+        return self.started is not None
+
+    def start(self):
+        """全屏提示出现时调用；已在时段中时忽略"""
+        if self.started is not None:
+            return
+        self.started = self.clock()
+        self._append(f"{_stamp(self.started)}\tstart\t{self.started:.3f}\t{os.getpid()}\n", sync=False)
+
+    def end(self, reason):
+        """全屏提示消失时调用：记录时长并落盘；不在时段中时忽略"""
+        if self.started is None:
+            return
+        started, self.started = self.started, None
+        now = self.clock()
+        self._append(
+            f"{_stamp(now)}\tend\t{now:.3f}\t{os.getpid()}\t{started:.3f}\t{max(0.0, now - started):.3f}\t{reason}\n",
+            sync=True,
+        )
+        self._rotate_if_full()
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _append(self, line, sync):
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8", newline="\n", buffering=BUFFER_SIZE)
+            self._file.write(line)
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+        except OSError:
+            self.close()
+
+    def _rotate_if_full(self):
+        if self._file is None:
+            return
+        try:
+            if self._file.tell() < self.max_bytes:
+                return
+        except OSError:
+            return
+        self.close()
+        stem, ext = os.path.splitext(self.path)
+        base = f"{stem}.{time.strftime('%Y%m%d-%H%M%S')}"
+        target = base + ext
+        n = 1
+        while os.path.exists(target):
+            target = f"{base}-{n}{ext}"
+            n += 1
+        try:
+            os.replace(self.path, target)
+        except OSError:
+            pass
+
+
+def log_files(path, since=None):
+    """
+    按时间顺序列出日志文件（已轮转的在前，当前文件最后）
+    since：时间戳；轮转时间早于 since 的文件只含更早的记录，直接跳过
+    """
+    folder = os.path.dirname(path) or "."
+    pattern = _rotated_pattern(path)
+    rotated = []
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        names = []
+    for name in names:
+        m = pattern.match(name)
+        if m is None:
+            continue
+        if since is not None:
+            rotated_at = time.mktime(time.strptime(m.group(1), "%Y%m%d-%H%M%S"))
+            if rotated_at < since:
+                continue
+        rotated.append(name)
+    rotated.sort()
+    files = [os.path.join(folder, name) for name in rotated]
+    if os.path.isfile(path):
+        files.append(path)
+    return files
+
+
+def iter_sessions(path, since=None, until=None):
+    """
+    流式读取已结束的时段，逐个产出 (开始时间戳, 结束时间戳, 原因)
+    since / until：只取与 [since, until) 有重叠的时段（时间戳，可为 None）
+    没有 end 的 start（进程被强制结束）以其后下一条记录的时间作为结束，在最后产出
+    """
+    def wanted(start, end):
+        return not (since is not None and end <= since) and not (until is not None and start >= until)
+
+    # 尚未遇到 end 的 start：{(pid, 开始时间戳字段): 其后下一条记录的时间戳（尚无时为 None）}
+    pending = {}
+    # 刚读到、还在等下一条记录的 start
+    waiting = []
+    for file_path in log_files(path, since):
+        try:
+            f = open(file_path, "rb", buffering=READ_BUFFER_SIZE)
+        except OSError:
+            continue
+        with f:
+            for line in f:
+                fields = line.rstrip(b"\r\n").split(b"\t")
+                # 损坏的行直接跳过
+                if len(fields) < 4 or fields[1] not in (b"start", b"end"):
+                    continue
+                try:
+                    stamp = float(fields[2])
+                except ValueError:
+                    continue
+                for key in waiting:
+                    if key in pending:
+                        pending[key] = stamp
+                waiting.clear()
+                if fields[1] == b"start":
+                    key = (fields[3], fields[2])
+                    pending[key] = None
+                    waiting.append(key)
+                    continue
+                if len(fields) < 7:
+                    continue
+                pending.pop((fields[3], fields[4]), None)
+                try:
+                    start = float(fields[4])
+                except ValueError:
+                    continue
+                if wanted(start, stamp):
+                    yield start, stamp, fields[6].decode("utf-8", "replace")
+    for (_pid, start_field), end in pending.items():
+        if end is None:
+            continue
+        start = float(start_field)
+        if wanted(start, end):
+            yield start, max(start, end), "orphaned"
+
+
+def _period_key(day, by):
+    if by == "week":
+        year, week, _weekday = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.isoformat()
+
+
+def aggregate(path, by="day", since=None, until=None):
+    """
+    按天（by="day"）或 ISO 周（by="week"）统计，返回按周期排序的
+    [(周期, 时段数, 总时长秒)]；时段数计入开始所在的周期，时长按实际时间拆分到各周期
+    """
+    from datetime import datetime, timedelta
+    totals = {}
+    for start, end, _reason in iter_sessions(path, since, until):
+        start_clip = max(start, since) if since is not None else start
+        end_clip = min(end, until) if until is not None else end
+        first = True
+        t = start_clip
+        while t < end_clip:
+            day = datetime.fromtimestamp(t).date()
+            midnight = datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+            part = min(end_clip, midnight) - t
+            entry = totals.setdefault(_period_key(day, by), [0, 0.0])
+            if first:
+                entry[0] += 1
+                first = False
+            entry[1] += part
+            t = midnight
+        if first:
+            # 时长为 0 的时段也计数
+            totals.setdefault(_period_key(datetime.fromtimestamp(start_clip).date(), by), [0, 0.0])[0] += 1
+    return [(key, count, seconds) for key, (count, seconds) in sorted(totals.items())]
+
+
+def parse_date(text, days=0):
+    """YYYY-MM-DD（再加 days 天）→ 当天零点的时间戳"""
+    from datetime import date, datetime, timedelta
+    return datetime.combine(date.fromisoformat(text) + timedelta(days=days), datetime.min.time()).timestamp()
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+启动与渲染性能追踪（main.py --profile）
+- 记录各阶段耗时（导入、读配置、建窗口、解码、缩放、转换、首次绘制等）与定时回调的实际延迟
+- 输出 Chrome Trace 格式 JSON（chrome://tracing 或 https://ui.perfetto.dev 打开），
+  metadata 中附带汇总，便于跨机器/跨版本对比
+- 未启用时所有接口都是空操作，开销可忽略
+- 时间戳以进程（解释器）启动时刻为 0，单位微秒
+"""
+
+import atexit
+import contextlib
+import os
+import sys
+import threading
+import time
+
+_BASE_PERF = time.perf_counter()
+_BASE_WALL = time.time()
+
+_events = None
+_ticks = {}
+_lock = threading.Lock()
+_path = None
+_process_start = None
+
+
+def _process_start_wall():
+    """进程创建时刻（墙上时间）；无法获取时返回本模块导入时刻"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/stat", "rb") as f:
+                fields = f.read().rsplit(b")", 1)[1].split()
+            start_ticks = int(fields[19])
+            with open("/proc/uptime", "rb") as f:
+                uptime = float(f.read().split()[0])
+            age = uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+            return time.time() - age
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+            creation, exit_, kernel, user = (wintypes.FILETIME() for _ in range(4))
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.kernel32.GetProcessTimes(
+                handle, ctypes.byref(creation), ctypes.byref(exit_), ctypes.byref(kernel), ctypes.byref(user)
+            ):
+                ticks = (creation.dwHighDateTime << 32) | creation.dwLowDateTime
+                # FILETIME：1601-01-01 起的 100ns 计数
+                return ticks / 1e7 - 11644473600
+    except Exception:
+        pass
+    return _BASE_WALL
+
+
+def enabled():
+    return _events is not None
+
+
+def now():
+    """当前时刻（perf_counter 秒），与 span() 配合使用"""
+    return time.perf_counter()
+
+
+def _ts(perf):
+    return (_BASE_WALL + (perf - _BASE_PERF) - _process_start) * 1e6
+
+
+def enable(path):
+    """开启追踪，进程退出时写入 path"""
+    global _events, _path, _process_start
+    if _events is not None:
+        return
+    _process_start = min(_process_start_wall(), _BASE_WALL)
+    _events = []
+    _path = path
+    _events.append({"name": "process_start", "ph": "i", "s": "p", "ts": 0,
+                    "pid": os.getpid(), "tid": threading.get_ident()})
+    span("interpreter_start_to_profile", _BASE_PERF - (_BASE_WALL - _process_start), _BASE_PERF)
+    atexit.register(dump)
+
+
+def mark(name, **args):
+    """瞬时事件"""
+    if _events is None:
+        return
+    event = {"name": name, "ph": "i", "s": "t", "ts": _ts(time.perf_counter()),
+             "pid": os.getpid(), "tid": threading.get_ident()}
+    if args:
+        event["args"] = args
+    with _lock:
+        _events.append(event)
+
+
+def span(name, start, end=None, **args):
+    """区间事件：start/end 为 now() 返回值，end 缺省为当前时刻"""
+    if _events is None:
+        return
+    if end is None:
+        end = time.perf_counter()
+    event = {"name": name, "ph": "X", "ts": _ts(start), "dur": max(0.0, (end - start) * 1e6),
+             "pid": os.getpid(), "tid": threading.get_ident()}
+    if args:
+        event["args"] = args
+    with _lock:
+        _events.append(event)
+
+
+@contextlib.contextmanager
+def measure(name, **args):
+    """with 块计时"""
+    if _events is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        span(name, start, **args)
+
+
+def tick(name, lateness_ms):
+    """定时回调实际触发时刻比计划晚了多少毫秒"""
+    if _events is None:
+        return
+    with _lock:
+        _ticks.setdefault(name, []).append(lateness_ms)
+        _events.append({"name": "tick_lateness", "ph": "C", "ts": _ts(time.perf_counter()),
+                        "pid": os.getpid(), "args": {name: round(lateness_ms, 3)}})
+
+
+def _summary():
+    """汇总：各阶段首次耗时、各标记首次出现时刻（距进程启动）、定时回调延迟统计"""
+    durations = {}
+    marks = {}
+    for event in _events:
+        if event["ph"] == "X":
+            durations.setdefault(event["name"], round(event["dur"] / 1000.0, 3))
+        elif event["ph"] == "i":
+            marks.setdefault(event["name"], round(event["ts"] / 1000.0, 3))
+    ticks = {}
+    for name, values in _ticks.items():
+        ordered = sorted(values)
+        count = len(ordered)
+        ticks[name] = {
+            "count": count,
+            "mean_ms": round(sum(ordered) / count, 3),
+            "p50_ms": round(ordered[count // 2], 3),
+            "p95_ms": round(ordered[min(count - 1, int(count * 0.95))], 3),
+            "max_ms": round(ordered[-1], 3),
+        }
+    return {"durations_ms": durations, "marks_ms": marks, "tick_lateness": ticks}
+
+
+def dump(path=None):
+    """写出追踪文件（Chrome Trace 格式）"""
+    path = path or _path
+    if _events is None or not path:
+        return
+    import json
+    with _lock:
+        data = {
+            "traceEvents": list(_events),
+            "displayTimeUnit": "ms",
+            "metadata": {
+                "python": sys.version.split()[0],
+                "platform": sys.platform,
+                "frozen": bool(getattr(sys, "frozen", False)),
+                # 进程启动时刻（墙上时间，秒）：外部测量从启动到首次绘制时用于换算
+                "process_start": _process_start,
+                "argv": sys.argv[1:],
+                "summary": _summary(),
+            },
+        }
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+    except OSError:
+        pass
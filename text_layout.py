@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+文字排版
+- TextMeasurer：用 tkfont 测量文字尺寸，二分查找放得进目标区域的最大字号；
+  测量结果与适配结果分别按 (字体, 字号, 文本) / (字体, 文本, 区域) 缓存，重复排版不再测量
+- FixedWidthClock：时间的定宽布局，日期/星期一个文本项，时分秒每个字符各占一格；
+  每秒只更新变化了的那一两个字符，不会让整行文字重新排版
+- TextLayerCache：可选，用 Pillow 把提示语（含阴影/描边）预渲染成抗锯齿图层，按颜色缓存
+"""
+
+import os
+import sys
+from collections import OrderedDict
+from tkinter import font as tkfont
+
+# 自动适配的字号下限（磅）
+MIN_FONT_SIZE = 8
+# 缓存条目上限，超出时整体清空（文本/字号组合通常只有几种）
+_CACHE_LIMIT = 4096
+# 预渲染图层缓存上限（张）：渐变闪烁的每种颜色各一张
+LAYER_CACHE_SIZE = 128
+
+
+class TextMeasurer:
+    """文字测量与自适应字号"""
+
+    def __init__(self, root):
+        self.root = root
+        self._fonts = {}
+        self._measure_cache = {}
+        self._fit_cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _font(self, family, weight):
+        # 每种字体族/粗细只建一个 Font 对象，测量时改字号复用
+        key = (family, weight)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = tkfont.Font(root=self.root, family=family, weight=weight)
+        return font
+
+    def measure(self, family, size, weight, text):
+        """返回 (宽, 高) 像素；多行文本取最宽一行，高度按行距累加"""
+        key = (family, size, weight, text)
+        cached = self._measure_cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        font = self._font(family, weight)
+        font.configure(size=size)
+        lines = text.split("\n") or [""]
+        result = (max(font.measure(line) for line in lines), font.metrics("linespace") * len(lines))
+        if len(self._measure_cache) >= _CACHE_LIMIT:
+            self._measure_cache.clear()
+        self._measure_cache[key] = result
+        return result
+
+    def fit_size(self, family, weight, text, max_width, max_height, max_size, min_size=MIN_FONT_SIZE):
+        """二分查找 [min_size, max_size] 内放得进 max_width × max_height 的最大字号"""
+        key = (family, weight, text, max_width, max_height, max_size, min_size)
+        cached = self._fit_cache.get(key)
+        if cached is not None:
+            return cached
+        lo, hi = min_size, max(min_size, max_size)
+        best = lo
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            width, height = self.measure(family, mid, weight, text)
+            if width <= max_width and height <= max_height:
+                best = mid
+                lo = mid + 1
+            else:
+                hi = mid - 1
+        if len(self._fit_cache) >= _CACHE_LIMIT:
+            self._fit_cache.clear()
+        self._fit_cache[key] = best
+        return best
+
+
+class FixedWidthClock:
+    """
+    定宽时钟：时间串按最后一个空格分为「日期 星期」与「时:分:秒」两段
+    数字格宽取 0~9 中最宽者，数字变化时各格位置不变，只改对应文本项
+    """
+
+    def __init__(self, canvas, measurer, font, fill, center, tags=()):
+        self.canvas = canvas
+        self.measurer = measurer
+        self.font = font
+        self.fill = fill
+        self.center = center
+        self.tags = tags
+        self._prefix = None
+        self._chars = []
+        self._prefix_item = canvas.create_text(0, 0, text="", font=font, fill=fill, anchor="w", tags=tags)
+        self._cell_items = []
+
+    def items(self):
+        return [self._prefix_item] + self._cell_items
+
+    def _cell_width(self, char):
+        family, size, weight = self.font
+        if char.isdigit():
+            return max(self.measurer.measure(family, size, weight, d)[0] for d in "0123456789")
+        return self.measurer.measure(family, size, weight, char)[0]
+
+    def _layout(self):
+        """按当前字体与日期段重新计算各项位置（只在日期、字体或位置变化时调用）"""
+        family, size, weight = self.font
+        prefix_w = self.measurer.measure(family, size, weight, self._prefix)[0]
+        widths = [self._cell_width(c) for c in self._chars]
+        x = self.center[0] - (prefix_w + sum(widths)) / 2
+        y = self.center[1]
+        self.canvas.coords(self._prefix_item, x, y)
+        x += prefix_w
+        for item, width in zip(self._cell_items, widths):
+            self.canvas.coords(item, x + width / 2, y)
+            x += width
+
+    def set_text(self, text):
+        prefix, _, clock = text.rpartition(" ")
+        prefix = prefix + " " if prefix else ""
+        relayout = False
+        if len(clock) != len(self._cell_items):
+            # 格数变化（首次或格式变化）：重建字符格
+            for item in self._cell_items:
+                self.canvas.delete(item)
+            self._cell_items = [
+                self.canvas.create_text(0, 0, text="", font=self.font, fill=self.fill, anchor="center", tags=self.tags)
+                for _ in clock
+            ]
+            self._chars = [""] * len(clock)
+            relayout = True
+        if prefix != self._prefix:
+            self._prefix = prefix
+            self.canvas.itemconfig(self._prefix_item, text=prefix)
+            relayout = True
+        for i, char in enumerate(clock):
+            if self._chars[i] != char:
+                if not char.isdigit() or not self._chars[i].isdigit():
+                    relayout = True
+                self._chars[i] = char
+                self.canvas.itemconfig(self._cell_items[i], text=char)
+        if relayout:
+            self._layout()
+
+    def set_fill(self, fill):
+        if fill == self.fill:
+            return
+        self.fill = fill
+        for item in self.items():
+            self.canvas.itemconfig(item, fill=fill)
+
+    def set_font(self, font, center=None):
+        moved = center is not None and center != self.center
+        if moved:
+            self.center = center
+        if font != self.font:
+            self.font = font
+            for item in self.items():
+                self.canvas.itemconfig(item, font=font)
+        elif not moved:
+            return
+        if self._prefix is not None:
+            self._layout()
+
+
+def find_font_file(family, bold):
+    """查找可供 Pillow 使用的字体文件；找不到返回 None"""
+    if sys.platform == "win32":
+        fonts_dir = os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts")
+        names = ("msyhbd.ttc", "msyh.ttc") if bold else ("msyh.ttc",)
+        for name in names:
+            path = os.path.join(fonts_dir, name)
+            if os.path.isfile(path):
+                return path
+        return None
+    import subprocess
+    pattern = f"{family}:bold" if bold else family
+    try:
+        path = subprocess.run(
+            ["fc-match", "-f", "%{file}", pattern], capture_output=True, text=True, timeout=2
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return path if path and os.path.isfile(path) else None
+
+
+def render_text_layer(text, font_file, px_size, fill, effect="shadow"):
+    """
+    用 Pillow 渲染抗锯齿文字图层（RGBA），effect 为 "none" / "shadow" / "outline"
+    未安装 Pillow 或字体无法加载时抛出异常，由调用方回退到 Tk 文本
+    """
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+    font = ImageFont.truetype(font_file, px_size)
+    stroke = max(1, px_size // 24) if effect == "outline" else 0
+    offset = max(2, px_size // 20) if effect == "shadow" else 0
+    pad = max(2, px_size // 10) + offset
+    probe = ImageDraw.Draw(Image.new("L", (1, 1)))
+    left, top, right, bottom = probe.multiline_textbbox(
+        (0, 0), text, font=font, align="center", stroke_width=stroke
+    )
+    size = (right - left + 2 * pad, bottom - top + 2 * pad)
+    origin = (pad - left, pad - top)
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+    if effect == "shadow":
+        shadow = Image.new("RGBA", size, (0, 0, 0, 0))
+        ImageDraw.Draw(shadow).multiline_text(
+            (origin[0] + offset, origin[1] + offset), text, font=font, fill=(0, 0, 0, 160), align="center"
+        )
+        layer = Image.alpha_composite(layer, shadow.filter(ImageFilter.GaussianBlur(offset)))
+    ImageDraw.Draw(layer).multiline_text(
+        origin, text, font=font, fill=fill, align="center", stroke_width=stroke, stroke_fill="#000000"
+    )
+    return layer
+
+
+class TextLayerCache:
+    """预渲染文字图层的 LRU 缓存（PhotoImage），键为 (文本, 字体文件, 像素字号, 颜色, 效果)"""
+
+    def __init__(self, max_items=LAYER_CACHE_SIZE):
+        self.max_items = max_items
+        self._layers = OrderedDict()
+        self.renders = 0
+
+    def get(self, text, font_file, px_size, fill, effect):
+        key = (text, font_file, px_size, fill, effect)
+        photo = self._layers.get(key)
+        if photo is not None:
+            self._layers.move_to_end(key)
+            return photo
+        from PIL import ImageTk
+        photo = ImageTk.PhotoImage(render_text_layer(text, font_file, px_size, fill, effect))
+        self.renders += 1
+        self._layers[key] = photo
+        while len(self._layers) > self.max_items:
+            self._layers.popitem(last=False)
+        return photo
+
+    def clear(self):
+        self._layers.clear()
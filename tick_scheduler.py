@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+统一周期任务调度器
+- 所有周期任务共用一个 root.after 定时器，周期相同的任务在同一次唤醒中执行
+- 唤醒时间按墙上时钟对齐到周期边界（如整秒），不随回调耗时累积漂移
+- 关闭的任务不参与调度，所有任务都关闭时不保留任何定时器
+- 时钟可注入，便于测试时使用虚拟时钟
+"""
+
+import math
+import time
+import tkinter as tk
+
+# 定时器比边界晚 WAKE_MARGIN_MS 毫秒唤醒，避免提前触发导致显示上一秒
+WAKE_MARGIN_MS = 2
+
+
+class _Task:
+    def __init__(self, name, period_ms, callback, enabled):
+        self.name = name
+        self.period_ms = max(1, int(period_ms))
+        self.callback = callback
+        self.enabled = enabled
+        self.due_ms = None
+        self.last_lateness_ms = 0.0
+
+
+class TickScheduler:
+    """单定时器驱动的周期任务调度器；回调签名为 callback(now)，now 为 clock() 返回的秒数"""
+
+    def __init__(self, root, clock=time.time):
+        self.root = root
+        self.clock = clock
+        self.wakeups = 0
+        # 可选钩子 on_tick(name, lateness_ms)：每次任务执行时报告实际触发比计划晚了多少
+        self.on_tick = None
+        self._tasks = {}
+        self._after_id = None
+        self._running = False
+
+    def _now_ms(self):
+        return self.clock() * 1000.0
+
+    @staticmethod
+    def _next_boundary(period_ms, now_ms):
+        return (math.floor(now_ms / period_ms) + 1) * period_ms
+
+    def add(self, name, period_ms, callback, enabled=True):
+        """注册（或替换）一个周期任务"""
+        task = _Task(name, period_ms, callback, enabled)
+        self._tasks[name] = task
+        if enabled:
+            task.due_ms = self._next_boundary(task.period_ms, self._now_ms())
+        self._reschedule()
+
+    def set_enabled(self, name, enabled):
+        """开启/停用任务；停用后不再产生任何唤醒"""
+        task = self._tasks.get(name)
+        if task is None or task.enabled == enabled:
+            return
+        task.enabled = enabled
+        task.due_ms = self._next_boundary(task.period_ms, self._now_ms()) if enabled else None
+        self._reschedule()
+
+    def set_period(self, name, period_ms):
+        """修改任务周期，下一次唤醒按新周期重新对齐"""
+        task = self._tasks.get(name)
+        if task is None:
+            return
+        period_ms = max(1, int(period_ms))
+        if task.period_ms == period_ms:
+            return
+        task.period_ms = period_ms
+        if task.enabled:
+            task.due_ms = self._next_boundary(period_ms, self._now_ms())
+        self._reschedule()
+
+    def lateness(self, name):
+        """任务最近一次实际执行比计划晚了多少毫秒（含 WAKE_MARGIN_MS）"""
+        task = self._tasks.get(name)
+        return task.last_lateness_ms if task is not None else 0.0
+
+    def periods(self):
+        """{任务名: 周期毫秒}，停用的任务为 None"""
+        return {name: task.period_ms if task.enabled else None for name, task in self._tasks.items()}
+
+    def is_enabled(self, name):
+        task = self._tasks.get(name)
+        return task is not None and task.enabled
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        self._running = True
+        self._reschedule()
+
+    def stop(self):
+        self._running = False
+        self._cancel()
+
+    def _cancel(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def _reschedule(self):
+        self._cancel()
+        if not self._running:
+            return
+        dues = [t.due_ms for t in self._tasks.values() if t.enabled]
+        if not dues:
+            # 所有任务均已停用：不保留定时器
+            return
+        delay = max(1, int(math.ceil(min(dues) - self._now_ms())) + WAKE_MARGIN_MS)
+        self._after_id = self.root.after(delay, self._fire)
+
+    def _fire(self):
+        self._after_id = None
+        self.wakeups += 1
+        now = self.clock()
+        now_ms = now * 1000.0
+        try:
+            for task in list(self._tasks.values()):
+                if not task.enabled or task.due_ms is None or task.due_ms > now_ms:
+                    continue
+                task.last_lateness_ms = now_ms - task.due_ms
+                if self.on_tick is not None:
+                    self.on_tick(task.name, task.last_lateness_ms)
+                # 跳过错过的周期，直接对齐到下一个边界
+                task.due_ms = self._next_boundary(task.period_ms, now_ms)
+                task.callback(now)
+        finally:
+            # 单个回调出错也不能让整条定时链断掉
+            self._reschedule()
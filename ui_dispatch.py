@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+工作线程 → Tk 主线程 回调投递
+Tk 不是线程安全的：工作线程只负责解码/计算，结果通过本模块交回 Tk 线程处理
+- 线程版 Tcl（Windows/Linux 常见发行版）：post 时用 root.after(0, ...) 立即唤醒主循环
+- 非线程版 Tcl 或主循环未启动：由 begin()/end() 期间的低频轮询兜底
+"""
+
+import queue
+import threading
+import tkinter as tk
+
+
+class UiDispatcher:
+    """把任意线程中的回调排队，统一在 Tk 主线程执行"""
+
+    def __init__(self, root, poll_ms=30):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._queue = queue.Queue()
+        self._tk_thread = threading.current_thread()
+        self._jobs = 0
+        self._poll_id = None
+        try:
+            self.threaded = root.tk.eval("info exists tcl_platform(threaded)") == "1"
+        except tk.TclError:
+            self.threaded = False
+
+    def post(self, fn, *args):
+        """投递回调（任意线程可调用）"""
+        self._queue.put((fn, args))
+        if threading.current_thread() is self._tk_thread:
+            self.root.after(0, self.drain)
+        elif self.threaded:
+            try:
+                self.root.after(0, self.drain)
+            except (RuntimeError, tk.TclError):
+                # 主循环已退出或不可跨线程调用：留在队列中，由轮询处理
+                pass
+
+    def begin(self):
+        """登记一个后台任务（Tk 线程调用）；有任务未完成时保持轮询兜底"""
+        self._jobs += 1
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def end(self):
+        """后台任务完成（Tk 线程调用，通常由工作线程 post(dispatcher.end) 触发）"""
+        self._jobs = max(0, self._jobs - 1)
+
+    def _poll(self):
+        self._poll_id = None
+        self.drain()
+        if self._jobs > 0:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def drain(self):
+        """执行队列中全部回调（Tk 线程）"""
+        while True:
+            try:
+                fn, args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            fn(*args)
+
+    def cancel(self):
+        """停止轮询（窗口销毁前调用）"""
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except tk.TclError:
+                pass
+            self._poll_id = None